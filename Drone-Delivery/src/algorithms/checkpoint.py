@@ -0,0 +1,105 @@
+# checkpoint.py
+import os
+import math
+import time
+import zlib
+import pickle
+import random
+
+import numpy as np
+
+# Increased whenever the content of checkpoints changes, older checkpoints cannot be resumed
+CHECKPOINT_VERSION = 1
+
+# Every checkpoint file starts with this header followed by its version, both checked before anything is unpickled
+CHECKPOINT_HEADER = b"DRONE-DELIVERY-CHECKPOINT\n"
+
+# Longest graph data series kept in a checkpoint, longer ones are thinned out
+MAX_SAVED_POINTS = 10000
+
+class Checkpointer:
+    """
+    Periodic snapshots of a run (Hill Climbing, Simulated Annealing, Tabu Search and Genetic Algorithms) to a checkpoint file,
+    so it can be continued later (see simulation.resume_algorithm).
+    Algorithms save their whole state every save_interval seconds (see is_due) and once more when they end:
+    current and best solutions (encoded with solution_encoder), counters, their own memory and graph data.
+    Every checkpoint also holds the run's description (run_info), its Termination counters and the state of the random module.
+    Checkpoints are compressed pickles after a header (see CHECKPOINT_HEADER), written to a temporary file first,
+    so a crash never leaves a partial one.
+    resume_state is the state of the checkpoint being resumed (None for new runs) and without a path nothing is saved.
+    """
+    def __init__(self, path, save_interval, run_info, solution_encoder, solution_decoder, resume_state=None):
+        self.path = path
+        self.save_interval = save_interval
+        self.run_info = run_info
+        self.solution_encoder = solution_encoder
+        self.solution_decoder = solution_decoder
+        self.resume_state = resume_state
+        self.next_save = time.time() + save_interval if path is not None else float("inf")
+
+    def is_due(self, curr_time):
+        return curr_time >= self.next_save
+
+    def save(self, state, termination):
+        if self.path is None:
+            return
+
+        checkpoint = {
+            "run": self.run_info,
+            "state": state,
+            "termination": termination.get_state(time.time()),
+            "random_state": random.getstate()
+        }
+        content = zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+        # Written to a temporary file first, the previous checkpoint stays valid until it is replaced
+        temporary_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            file.write(CHECKPOINT_HEADER + CHECKPOINT_VERSION.to_bytes(4, "little"))
+            file.write(content)
+        os.replace(temporary_file, self.path)
+
+        self.next_save = time.time() + self.save_interval
+
+    def get_saved_solution(self, solution):
+        """
+        Current solution of the run, with the order of its unassigned products (see Solution.get_unassigned_order),
+        so a resumed run makes the same random moves as an uninterrupted one
+        """
+        return {"solution": self.solution_encoder(solution), "unassigned_order": solution.get_unassigned_order()}
+
+    def get_loaded_solution(self, saved_solution):
+        solution = self.solution_decoder(saved_solution["solution"])
+        solution.set_unassigned_order(saved_solution["unassigned_order"])
+        return solution
+
+    def get_saved_data(self, data):
+        """
+        Graph data as arrays, series (in (x, y) pairs) longer than MAX_SAVED_POINTS are thinned out
+        keeping their last point, so checkpoints of long runs stay small
+        """
+        saved_data = []
+        for x_values, y_values in zip(data[::2], data[1::2]):
+            indexes = np.arange(len(x_values))
+            if len(indexes) > MAX_SAVED_POINTS:
+                indexes = np.append(indexes[:-1:math.ceil(len(indexes) / MAX_SAVED_POINTS)], indexes[-1])
+            saved_data.append(np.asarray(x_values)[indexes])
+            saved_data.append(np.asarray(y_values)[indexes])
+        return saved_data
+
+    def get_loaded_data(self, saved_data):
+        return [series.tolist() for series in saved_data]
+
+def load_checkpoint(path):
+    """
+    Checkpoint saved by Checkpointer.save. Checkpoints are pickles, which can run arbitrary code when loaded,
+    so only files saved by this program should be loaded. Files without the checkpoint header or saved by another
+    version are rejected before unpickling.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(CHECKPOINT_HEADER)) != CHECKPOINT_HEADER:
+            raise ValueError(f"Error: {path} is not a checkpoint file")
+        if int.from_bytes(file.read(4), "little") != CHECKPOINT_VERSION:
+            raise ValueError(f"Error: Checkpoint {path} was written by an incompatible version")
+        return pickle.loads(zlib.decompress(file.read()))
+
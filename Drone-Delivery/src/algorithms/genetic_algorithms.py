@@ -1,227 +1,348 @@
 # genetic_algorithms.py
 import random
 import time
+import heapq
+from bisect import bisect_left
+from itertools import accumulate, count
 
 #######################
 # Algorithm Structure #
 #######################
 
-def get_ga_solution(max_time, pop_adjustment, solution_generator, solution_evaluator, crossover_generator, mutation_generator, update_visualization):
-    start_time = time.time()
-    generation_no = 0
-    improvement_counter = 0
-    population_size = 30
-    if pop_adjustment==0:
-        population_size = 20
-    elif pop_adjustment==1:
-        population_size = 30
-    elif pop_adjustment==2:
-        population_size = 50
+def get_ga_solution(max_time, pop_adjustment, solution_generator, solution_evaluator, crossover_generator, mutation_generator, update_visualization, logger, result_writer, termination, checkpointer = None, stats = None):
+    population_size = get_population_size(pop_adjustment)
+    termination.start(population_size)
+    resume_state = checkpointer.resume_state if checkpointer else None
 
-    # Generate initial population
-    population = generate_population(population_size, solution_generator)
-    
-    # Save the best solution found until the moment
-    best_solution, best_score, order_status = get_greatest_fit(population, solution_evaluator)
-    best_solution_generation = 0
+    if resume_state is None:
+        generation_no = 0
+        improvement_counter = 0
+
+        # Generate initial population
+        population = generate_population(population_size, solution_generator, solution_evaluator)
+        
+        # Save the best solution found until the moment
+        best_solution, best_score, order_status = get_greatest_fit(population)
+        best_solution_generation = 0
+        termination.record_improvement(best_score)
+
+        # Data for graph generation
+        data = [[0], [best_score], [0], [get_average(population)]]
+    else:
+        # Continue from the checkpoint
+        generation_no = resume_state["generation_no"]
+        improvement_counter = resume_state["improvement_counter"]
+
+        population = Population()
+        population.set_state(resume_state["population"], checkpointer.solution_decoder)
 
-    # Data for graph generation
-    data = [[0], [best_score], [0], [get_average(population, solution_evaluator)]]
+        best_solution = checkpointer.solution_decoder(resume_state["best_solution"])
+        best_score, order_status = solution_evaluator(best_solution, return_status = True)
+        best_solution_generation = resume_state["best_solution_generation"]
+
+        data = checkpointer.get_loaded_data(resume_state["data"])
 
     if update_visualization:
         # Pass both solution, score, order status, and is_initial=True
         update_visualization(best_solution, best_score, order_status, True)
 
-    with open("output.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'GENETIC ALGORITHM RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Initial Solution Score:':<30} {best_score}\n")
-        f.write(f"{'Population Size:':<30} {population_size}\n")
-        f.write(f"{'Mutation Rate:':<30} {'1% chance per child'}\n")
-        f.write("-" * 60 + "\n")
+    header_fields = [("Initial Solution Score:", best_score),
+                     ("Population Size:", population_size),
+                     ("Mutation Rate:", "1% chance per child")]
+    if resume_state is not None:
+        header_fields.append(("Resumed At Generation:", generation_no))
+    logger.log_header("GENETIC ALGORITHM RESULTS", header_fields)
     
     print(f"Initial solution score: {best_score}")
     
-    curr_time = time.time()
-    while (curr_time - start_time < max_time):
-        # Selected parents for crossover
-        tournment_winner_sol = tournament_select(population, 4, solution_evaluator)
-        roulette_winner_sol = roulette_select(population, solution_evaluator)
-
-        # Next generation Crossover and Mutation
-        child_1, child_2 = crossover_generator(tournment_winner_sol, roulette_winner_sol)
-
-        # Check if croosover was successful
-        if child_1 == -1 or child_2 == -1:
-            continue
-        
-        # Chance of mutation for child_1
-        if random.randint(1, 100) == 1:
-            child_1 = mutation_generator(child_1)
+    if stats:
+        stats.reset_clock()
 
-        # Chance of mutation for child_2
-        if random.randint(1, 100) == 1:
-            child_2 = mutation_generator(child_2)
-        
-        # Check if mutation was successful
-        if child_1 == -1 or child_2 == -1:
+    curr_time = time.time()
+    while not termination.should_stop(curr_time):
+        # Breed an offspring and add it to the population
+        if not advance_generation(population, solution_evaluator, crossover_generator, mutation_generator, stats):
+            curr_time = time.time()
             continue
 
-        # Advance iteration (Only if children solutions are feasible)
+        # Advance iteration (Only if children solutions are feasible, both of them are evaluated)
         generation_no += 1
+        termination.count_iteration(2)
 
-        # Pick best offspring
-        score_1 = solution_evaluator(child_1)
-        score_2 = solution_evaluator(child_2)
-
-        if score_1 > score_2:
-            offspring = child_1
-        else:
-            offspring = child_2
-
-        # Modify population
-        replace_least_fittest(population, offspring, solution_evaluator)
-
-        data[2].append(curr_time - start_time)
-        data[3].append(get_average(population, solution_evaluator))
+        data[2].append(curr_time - termination.start_time)
+        data[3].append(get_average(population))
 
         # Checking the greatest fit among the current population
-        greatest_fit, greatest_fit_score, order_status = get_greatest_fit(population, solution_evaluator)
+        greatest_fit, greatest_fit_score, order_status = get_greatest_fit(population)
         if greatest_fit_score > best_score:
             improvement = greatest_fit_score - best_score
             improvement_counter += 1
             best_solution = greatest_fit
             best_score = greatest_fit_score
             best_solution_generation = generation_no
+            termination.record_improvement(best_score)
 
-            data[0].append(curr_time - start_time)
+            data[0].append(curr_time - termination.start_time)
             data[1].append(best_score)
 
             if update_visualization:
                 # Pass solution, score and status to callback
                 update_visualization(best_solution, best_score, order_status)
+                if stats:
+                    stats.lap("callbacks")
 
-            with open("output.txt", "a") as f:
-                f.write(f"Generation {generation_no:>5}: New best solution found\n")
-                f.write(f"{'Score:':<30} {best_score}\n")
-                f.write(f"{'Improvement:':<30} +{improvement}\n")
-                f.write("-" * 60 + "\n")
+            logger.log_event(f"Generation {generation_no:>5}: New best solution found",
+                             [("Score:", best_score), ("Improvement:", improvement, "+")])
 
             print(f"Found better solution score: {best_score}")
             print(f"Generation: {generation_no}")
+            if stats:
+                stats.lap("io")
+
+        # Save the best solution periodically
+        if result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution)
+            if stats:
+                stats.lap("io")
+
+        # Save the run periodically
+        if checkpointer and checkpointer.is_due(curr_time):
+            checkpointer.save(get_checkpoint_state(checkpointer, population, best_solution, best_solution_generation,
+                                                   generation_no, improvement_counter, data), termination)
+            if stats:
+                stats.lap("io")
         
         curr_time = time.time()
 
-    data[0].append(max_time)
+    if stats:
+        stats.end_loop()
+
+    if checkpointer:
+        checkpointer.save(get_checkpoint_state(checkpointer, population, best_solution, best_solution_generation,
+                                               generation_no, improvement_counter, data), termination)
+
+    data[0].append(min(curr_time - termination.start_time, max_time))
     data[1].append(best_score)
 
-    with open("output.txt", "a") as f:
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'FINAL RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Total Generations:':<30} {generation_no:>16}\n")
-        f.write(f"{'Improvements Found:':<30} {improvement_counter:>16}\n")
-        f.write(f"{'Best Generation:':<30} {best_solution_generation:>16}\n")
-        f.write(f"{'Final Solution Score:':<30} {best_score:>16}\n")
-        f.write("=" * 60 + "\n")
+    logger.log_final([("Total Generations:", generation_no),
+                      ("Improvements Found:", improvement_counter),
+                      ("Best Generation:", best_solution_generation),
+                      ("Stop Reason:", termination.reason),
+                      ("Final Solution Score:", best_score)])
 
     # Save solution to file
-    with open("solution.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'SOLUTION DETAILS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-
-        for drone_id, drone_products in enumerate(best_solution):
-            # Write drone details
-            f.write(f"Drone {drone_id + 1}:\n")
-            f.write(f"{'Products:':<15}")
-
-            # Wrap the product list into chunks of a fixed size
-            chunk_size = 1
-            for i in range(0, len(drone_products), chunk_size):
-                chunk = drone_products[i:i + chunk_size]
-                if i > 0:
-                    f.write(f"{'':<15}")  # Indent subsequent lines
-                f.write(f"{', '.join(map(str, chunk))}\n")
-
-            f.write("-" * 60 + "\n")
-
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'END OF SOLUTION':^60}\n")
-        f.write("=" * 60 + "\n")
+    result_writer.write(best_solution)
+
+    if stats:
+        stats.lap("io")
 
     print(f"Final solution score: {best_score}")
     print(f"Found on generation {best_solution_generation}")
 
     return data
 
+def get_population_size(pop_adjustment):
+    population_size = 30
+    if pop_adjustment==0:
+        population_size = 20
+    elif pop_adjustment==1:
+        population_size = 30
+    elif pop_adjustment==2:
+        population_size = 50
+    return population_size
+
+def advance_generation(population, solution_evaluator, crossover_generator, mutation_generator, stats = None):
+    """
+    Breeds the offspring of a tournament winner and a roulette winner (each child has a 1% chance of mutation)
+    and replaces the least fit individual with the best child.
+    Returns False, leaving the population untouched, if the crossover or a mutation failed.
+    """
+    # Selected parents for crossover
+    tournment_winner_sol = tournament_select(population, 4)
+    roulette_winner_sol = roulette_select(population)
+
+    # Next generation Crossover and Mutation
+    child_1, child_2 = crossover_generator(tournment_winner_sol, roulette_winner_sol)
+
+    # Check if croosover was successful
+    if child_1 == -1 or child_2 == -1:
+        if stats:
+            stats.count_generated("crossover", False)
+            stats.lap("generation")
+        return False
+    if stats:
+        stats.count_generated("crossover", True)
+    
+    # Chance of mutation for child_1
+    mutation_1 = None
+    if random.randint(1, 100) == 1:
+        mutation_1 = mutation_generator(child_1, stats)
+
+    # Chance of mutation for child_2
+    mutation_2 = None
+    if random.randint(1, 100) == 1:
+        mutation_2 = mutation_generator(child_2, stats)
+    
+    # Check if mutation was successful
+    if mutation_1 == -1 or mutation_2 == -1:
+        if stats:
+            stats.lap("generation")
+        return False
+
+    # Apply mutations in place (children are not shared with anything else)
+    if mutation_1 is not None:
+        mutation_1.apply(child_1)
+    if mutation_2 is not None:
+        mutation_2.apply(child_2)
+    if stats:
+        stats.lap("generation")
+
+    # Pick best offspring (evaluated once, its fitness is stored in the population)
+    score_1, order_status_1 = solution_evaluator(child_1, return_status = True)
+    score_2, order_status_2 = solution_evaluator(child_2, return_status = True)
+    if stats:
+        stats.lap("evaluation")
+
+    if score_1 > score_2:
+        offspring = (child_1, score_1, order_status_1)
+    else:
+        offspring = (child_2, score_2, order_status_2)
+
+    # The best child always takes the least fit individual's place, it only counts as accepted if it is fitter
+    if stats:
+        accepted = offspring[1] > population.individuals[0][0]
+        stats.count_evaluated(("crossover",), accepted)
+        for child, mutation in ((child_1, mutation_1), (child_2, mutation_2)):
+            if mutation is not None:
+                stats.count_evaluated(mutation.describe(), accepted and offspring[0] is child)
+
+    # Modify population
+    replace_least_fittest(population, *offspring)
+    if stats:
+        stats.lap("acceptance")
+
+    return True
+
 #########################
 # Population Generation #
 #########################
 
-def generate_population(population_size, solution_generator):
-    solutions = []
+class Population:
+    """
+    Individuals of the genetic algorithm, each one stored with the fitness and order status computed when it was created.
+    Individuals are kept in a min-heap of (score, insertion number, solution, order status) entries, so the least fit is always first.
+    The population also keeps its total fitness (for the average), its fittest individual and,
+    for roulette selection, the cumulative fitness of its individuals.
+    Every generation replaces an individual, so that list is rebuilt in O(n) by the first roulette selection of
+    each generation. Only the parent selections within a generation share it.
+    """
+    def __init__(self):
+        self.individuals = []
+        self.total_fitness = 0
+        self.best_individual = None
+        self.cumulative_fitness = None
+        self.insertion_counter = count()
+
+    def __len__(self):
+        return len(self.individuals)
+
+    def add(self, solution, score, order_status):
+        individual = (score, next(self.insertion_counter), solution, order_status)
+        heapq.heappush(self.individuals, individual)
+        self.total_fitness += score
+        self.cumulative_fitness = None
+
+        if self.best_individual is None or score > self.best_individual[0]:
+            self.best_individual = individual
+
+    def replace_least_fit(self, solution, score, order_status):
+        individual = (score, next(self.insertion_counter), solution, order_status)
+        removed_individual = heapq.heapreplace(self.individuals, individual)
+        self.total_fitness += score - removed_individual[0]
+        self.cumulative_fitness = None
+
+        if score > self.best_individual[0]:
+            self.best_individual = individual
+        elif removed_individual is self.best_individual:
+            # Only happens when every individual was as fit as the removed one
+            self.best_individual = max(self.individuals)
+
+    def get_state(self, solution_encoder):
+        """Individuals with encoded solutions, in heap order so set_state restores the same population"""
+        return [(score, insertion_number, solution_encoder(solution), order_status)
+                for score, insertion_number, solution, order_status in self.individuals]
+
+    def set_state(self, individuals, solution_decoder):
+        self.individuals = [(score, insertion_number, solution_decoder(encoded_solution), order_status)
+                            for score, insertion_number, encoded_solution, order_status in individuals]
+        self.total_fitness = sum(individual[0] for individual in self.individuals)
+        self.best_individual = max(self.individuals)
+        self.cumulative_fitness = None
+
+        # The latest insertion is always in the population, numbering continues after it
+        self.insertion_counter = count(max(individual[1] for individual in self.individuals) + 1)
+
+    def get_cumulative_fitness(self):
+        if self.cumulative_fitness is None:
+            self.cumulative_fitness = list(accumulate(individual[0] for individual in self.individuals))
+        return self.cumulative_fitness
+
+def get_checkpoint_state(checkpointer, population, best_solution, best_solution_generation, generation_no, improvement_counter, data):
+    """State of the run saved in checkpoints"""
+    return {
+        "population": population.get_state(checkpointer.solution_encoder),
+        "best_solution": checkpointer.solution_encoder(best_solution),
+        "best_solution_generation": best_solution_generation,
+        "generation_no": generation_no,
+        "improvement_counter": improvement_counter,
+        "data": checkpointer.get_saved_data(data)
+    }
+
+def generate_population(population_size, solution_generator, solution_evaluator):
+    population = Population()
     for i in range(population_size):
-        solutions.append(solution_generator())
-    return solutions
+        solution = solution_generator()
+        score, order_status = solution_evaluator(solution, return_status = True)
+        population.add(solution, score, order_status)
+    return population
 
 ####################
 # Parent Selection #
 ####################
 
-def tournament_select(population, tournament_size, solution_evaluator):
+def tournament_select(population, tournament_size):
     if tournament_size > len(population):
         raise ValueError("Error: Tournament size larger than population")
 
-    participants = random.sample(population, tournament_size)
+    participants = random.sample(population.individuals, tournament_size)
 
-    best_solution, _best_score, _order_status = get_greatest_fit(participants, solution_evaluator)
+    _best_score, _insertion_number, best_solution, _order_status = max(participants)
     
     return best_solution
 
-def roulette_select(population, solution_evaluator):
-    total_fitness = sum(solution_evaluator(individual) for individual in population)
+def roulette_select(population):
+    cumulative_fitness = population.get_cumulative_fitness()
 
-    random_value = random.uniform(0, total_fitness)
+    random_value = random.uniform(0, population.total_fitness)
 
-    accumulated_fitness = 0
-    for individual in population:
-        accumulated_fitness += solution_evaluator(individual)
-        if accumulated_fitness >= random_value:
-            return individual
+    # First individual whose accumulated fitness reaches the random value
+    index = min(bisect_left(cumulative_fitness, random_value), len(cumulative_fitness) - 1)
+    return population.individuals[index][2]
 
 ###########################
 # Population Modification #
 ###########################
 
-def replace_least_fittest(population, offspring, solution_evaluator):
-    least_fittest_index = 0
-    least_fittest_value = solution_evaluator(population[0])
-    for i in range(1, len(population)):
-        score = solution_evaluator(population[i])
-        if score < least_fittest_value:
-            least_fittest_value = score
-            least_fittest_index = i
-    population[least_fittest_index] = offspring
+def replace_least_fittest(population, offspring, score, order_status):
+    population.replace_least_fit(offspring, score, order_status)
 
 #######################
 # Auxiliary Functions #
 #######################
 
-def get_greatest_fit(population, solution_evaluator):
-    best_solution = population[0]
-    best_score, order_status = solution_evaluator(population[0], return_status = True)
-    for i in range(1, len(population)):
-        score, temp_order_status = solution_evaluator(population[i], return_status = True)
-        if score > best_score:
-            best_score = score
-            best_solution = population[i]
-            order_status = temp_order_status
+def get_greatest_fit(population):
+    best_score, _insertion_number, best_solution, order_status = population.best_individual
     return best_solution, best_score, order_status
 
-def get_average(population, solution_evaluator):
-    total = 0
-    for i in range(len(population)):
-        total += solution_evaluator(population[i])
-    return total / len(population)
+def get_average(population):
+    return population.total_fitness / len(population)
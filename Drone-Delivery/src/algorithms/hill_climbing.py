@@ -1,106 +1,204 @@
 # hill_climbing.py
 import time
 
-def get_hc_solution(max_time, solution_generator, solution_evaluator, neighbor_generator, update_visualization):
-    start_time = time.time()
-    improvement_counter = 0
-    iteration = 0
-
-    # Get initial solution and its score
-    best_solution = solution_generator()
-    best_score, order_status = solution_evaluator(best_solution, return_status = True)
-
-    # Data for graph generation
-    data = [[0], [best_score]]
+def get_hc_solution(max_time, solution_generator, solution_evaluator, state_generator, move_generator, update_visualization, logger, result_writer, termination,
+                    restart_on_stagnation = False, checkpointer = None, stats = None):
+    """
+    Hill climbing, only improving moves are applied.
+    termination (see Termination) ends the run. With restart_on_stagnation, reaching its max_stagnation
+    starts a new climb from a new solution_generator solution instead, the best solution of every climb is kept.
+    checkpointer (see Checkpointer) saves the run periodically, or holds the state of the run it resumes.
+    result_writer (see SolutionWriter) writes the best solution, and snapshots of it while the run goes on.
+    """
+    termination.start()
+    resume_state = checkpointer.resume_state if checkpointer else None
+
+    if resume_state is None:
+        improvement_counter = 0
+        iteration = 0
+        restart_counter = 0
+
+        # Get initial solution and its score
+        solution = solution_generator()
+        score, order_status = solution_evaluator(solution, return_status = True)
+        termination.record_improvement(score)
+
+        # Best solution of every climb (the current solution itself until a restart)
+        best_solution = solution
+        best_score = score
+
+        # Data for graph generation
+        data = [[0], [best_score]]
+    else:
+        # Continue from the checkpoint
+        improvement_counter = resume_state["improvement_counter"]
+        iteration = resume_state["iteration"]
+        restart_counter = resume_state["restart_counter"]
+
+        solution = checkpointer.get_loaded_solution(resume_state["solution"])
+        score = resume_state["score"]
+
+        best_solution = solution
+        if resume_state["best_solution"] is not None:
+            best_solution = checkpointer.solution_decoder(resume_state["best_solution"])
+        best_score, order_status = solution_evaluator(best_solution, return_status = True)
+
+        data = checkpointer.get_loaded_data(resume_state["data"])
+
+    # Cached evaluation of the current solution, used to score moves incrementally
+    state = state_generator(solution)
 
     if update_visualization:
         # Pass both solution, score, order status, and is_initial=True
         update_visualization(best_solution, best_score, order_status, True)
     
     # Create a beautiful output file header
-    with open("output.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'HILL CLIMBING ALGORITHM RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Initial Solution Score:':<30} {best_score}\n")
-        f.write("-" * 60 + "\n")
+    header_fields = [("Initial Solution Score:", best_score)]
+    if resume_state is not None:
+        header_fields.append(("Resumed At Iteration:", iteration))
+    logger.log_header("HILL CLIMBING ALGORITHM RESULTS", header_fields)
 
     print(f"Initial Solution score: {best_score}")
 
+    if stats:
+        stats.reset_clock()
+
     curr_time = time.time()
-    while (curr_time - start_time < max_time):
-        # Generate Neighbor
-        neighbor = neighbor_generator(best_solution)
+    while not termination.should_stop(curr_time):
+        # Generate Neighbor move
+        move = move_generator(solution, stats)
+        if stats:
+            stats.lap("generation")
 
         # Check if neighbor was generated
-        if(neighbor == -1):
+        if(move == -1):
+            curr_time = time.time()
             continue
 
         # Advance Iteration (Only for feasible solutions)
         iteration += 1
-
-        neighbor_eval, order_status = solution_evaluator(neighbor, return_status = True)
-
-        if (neighbor_eval > best_score):
-            improvement = neighbor_eval - best_score
-            best_score = neighbor_eval
-            best_solution = neighbor
-            improvement_counter += 1
-
-            data[0].append(curr_time - start_time)
-            data[1].append(neighbor_eval)
-
-            if update_visualization:
-                # Pass solution, score and status to callback
-                update_visualization(best_solution, best_score, order_status)
-
-            with open("output.txt", "a") as f:
-                f.write(f"Iteration {iteration:>5}: New better solution found\n")
-                f.write(f"{'Score:':<30} {best_score}\n")
-                f.write(f"{'Improvement:':<30} +{improvement}\n")
-                f.write("-" * 60 + "\n")
-
-            print(f"Found better solution score: {best_score}")
+        termination.count_iteration()
+
+        # Score the move before applying it, rejected moves never touch the solution
+        move_info = move.describe()
+        neighbor_eval = state.evaluate_move(move_info)
+        if stats:
+            stats.lap("evaluation")
+            stats.count_evaluated(move_info, neighbor_eval > score)
+
+        if (neighbor_eval > score):
+            score = neighbor_eval
+            move.apply(solution)
+            state.apply_move(move_info)
+            termination.record_improvement(score)
+            if stats:
+                stats.lap("acceptance")
+
+            if score > best_score:
+                improvement = score - best_score
+                best_solution = solution
+                best_score = score
+                improvement_counter += 1
+
+                data[0].append(curr_time - termination.start_time)
+                data[1].append(best_score)
+
+                if update_visualization:
+                    # Pass solution, score and status to callback
+                    update_visualization(best_solution, best_score, state.get_orders_status())
+                    if stats:
+                        stats.lap("callbacks")
+
+                logger.log_event(f"Iteration {iteration:>5}: New better solution found",
+                                 [("Score:", best_score), ("Improvement:", improvement, "+")])
+
+                print(f"Found better solution score: {best_score}")
+                if stats:
+                    stats.lap("io")
+
+        # Start a new climb from a new solution, keeping the best one
+        elif restart_on_stagnation and termination.is_stagnated():
+            restart_counter += 1
+            logger.log_event(f"Iteration {iteration:>5}: Restarted from a new solution",
+                             [("Climb Score:", score), ("Best Score:", best_score)])
+
+            solution = solution_generator()
+            score = solution_evaluator(solution)
+            state = state_generator(solution)
+            termination.count_iteration()
+            termination.restart()
+
+            if score > best_score:
+                improvement = score - best_score
+                best_solution = solution
+                best_score = score
+                improvement_counter += 1
+                termination.record_improvement(score)
+
+                data[0].append(curr_time - termination.start_time)
+                data[1].append(best_score)
+
+                if update_visualization:
+                    update_visualization(best_solution, best_score, state.get_orders_status())
+
+                logger.log_event(f"Iteration {iteration:>5}: New better solution found",
+                                 [("Score:", best_score), ("Improvement:", improvement, "+")])
+
+                print(f"Found better solution score: {best_score}")
+            if stats:
+                stats.lap("acceptance")
+
+        # Save the best solution periodically
+        if result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution)
+            if stats:
+                stats.lap("io")
+
+        # Save the run periodically
+        if checkpointer and checkpointer.is_due(curr_time):
+            checkpointer.save(get_checkpoint_state(checkpointer, solution, score, best_solution, iteration,
+                                                   improvement_counter, restart_counter, data), termination)
+            if stats:
+                stats.lap("io")
         
         curr_time = time.time()
+
+    if stats:
+        stats.end_loop()
+
+    if checkpointer:
+        checkpointer.save(get_checkpoint_state(checkpointer, solution, score, best_solution, iteration,
+                                               improvement_counter, restart_counter, data), termination)
     
-    data[0].append(max_time)
+    data[0].append(min(curr_time - termination.start_time, max_time))
     data[1].append(best_score)
 
     # Write final results
-    with open("output.txt", "a") as f:
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'FINAL RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Total Iterations:':<30} {iteration:>16}\n")
-        f.write(f"{'Improvements Found:':<30} {improvement_counter:>16}\n")
-        f.write(f"{'Final Solution Score:':<30} {best_score:>16}\n")
-        f.write("=" * 60 + "\n")
+    final_fields = [("Total Iterations:", iteration),
+                    ("Improvements Found:", improvement_counter)]
+    if restart_on_stagnation:
+        final_fields.append(("Restarts:", restart_counter))
+    final_fields += [("Stop Reason:", termination.reason),
+                     ("Final Solution Score:", best_score)]
+    logger.log_final(final_fields)
 
     # Save solution to file
-    with open("solution.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'SOLUTION DETAILS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-
-        for drone_id, drone_products in enumerate(best_solution):
-            # Write drone details
-            f.write(f"Drone {drone_id + 1}:\n")
-            f.write(f"{'Products:':<15}")
-
-            # Wrap the product list into chunks of a fixed size
-            chunk_size = 1
-            for i in range(0, len(drone_products), chunk_size):
-                chunk = drone_products[i:i + chunk_size]
-                if i > 0:
-                    f.write(f"{'':<15}")  # Indent subsequent lines
-                f.write(f"{', '.join(map(str, chunk))}\n")
-
-            f.write("-" * 60 + "\n")
-
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'END OF SOLUTION':^60}\n")
-        f.write("=" * 60 + "\n")
+    result_writer.write(best_solution)
+
+    if stats:
+        stats.lap("io")
 
     print(f"Final Solution score: {best_score}")
-    return data
\ No newline at end of file
+    return data
+
+def get_checkpoint_state(checkpointer, solution, score, best_solution, iteration, improvement_counter, restart_counter, data):
+    """State of the run saved in checkpoints, the best solution is only saved when a restart left it behind"""
+    return {
+        "solution": checkpointer.get_saved_solution(solution),
+        "score": score,
+        "best_solution": checkpointer.solution_encoder(best_solution) if best_solution is not solution else None,
+        "iteration": iteration,
+        "improvement_counter": improvement_counter,
+        "restart_counter": restart_counter,
+        "data": checkpointer.get_saved_data(data)
+    }
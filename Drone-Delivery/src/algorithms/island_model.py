@@ -0,0 +1,231 @@
+# island_model.py
+import random
+import time
+import heapq
+import queue
+import multiprocessing
+
+from algorithms.genetic_algorithms import (get_population_size, advance_generation, generate_population,
+                                           replace_least_fittest, get_greatest_fit, get_average)
+
+TOPOLOGIES = ["Ring", "Fully Connected", "Random"]
+
+#######################
+# Algorithm Structure #
+#######################
+
+def get_island_ga_solution(max_time, pop_adjustment, island_number, migration_interval, migration_size, topology,
+                           solution_generator, solution_evaluator, crossover_generator, mutation_generator,
+                           solution_encoder, solution_decoder, update_visualization, logger, result_writer, stop_event):
+    """
+    Genetic algorithm split into island_number populations, each one evolved by its own process.
+    Every migration_interval generations an island takes in the migrants sent to it and sends copies of
+    its migration_size fittest individuals to its neighbours in the topology.
+    This process only keeps track of the global best solution, which islands report as they find it,
+    and has result_writer (see SolutionWriter) save it.
+    The solution functions are bound to the problem, so islands get it along with them.
+    Setting stop_event makes every island stop after its current generation.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Error: Unknown migration topology {topology}")
+
+    start_time = time.time()
+    deadline = start_time + max_time
+    population_size = get_population_size(pop_adjustment)
+
+    # Every island has its own inbox for migrants and all of them report to the progress queue
+    inboxes = [multiprocessing.Queue() for _ in range(island_number)]
+    progress_queue = multiprocessing.Queue()
+
+    # Stop requests are passed on to the islands through an event shared with their processes
+    stop_islands = multiprocessing.Event()
+
+    base_seed = random.randrange(2 ** 32)
+    islands = []
+    for island_index in range(island_number):
+        island = multiprocessing.Process(target=run_island, daemon=True,
+                                         args=(island_index, base_seed + island_index, deadline, stop_islands, population_size,
+                                               migration_interval, migration_size, topology, inboxes, progress_queue,
+                                               solution_generator, solution_evaluator,
+                                               crossover_generator, mutation_generator, solution_encoder, solution_decoder))
+        island.start()
+        islands.append(island)
+
+    best_solution = None
+    best_score = None
+    best_island = 0
+    best_solution_generation = 0
+    improvement_counter = 0
+    total_generations = 0
+    finished_islands = 0
+
+    # Latest average fitness of every island
+    island_averages = {}
+
+    # Data for graph generation
+    data = [[], [], [], []]
+
+    while finished_islands < island_number:
+        if stop_event.is_set():
+            stop_islands.set()
+
+        try:
+            message = progress_queue.get(timeout=0.1)
+        except queue.Empty:
+            # Stop waiting if every island died without finishing
+            if not any(island.is_alive() for island in islands):
+                break
+            continue
+
+        curr_time = time.time()
+        message_type, island_index = message[0], message[1]
+
+        # Save the best solution periodically
+        if best_solution is not None and result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution)
+
+        if message_type == "done":
+            finished_islands += 1
+            total_generations += message[2]
+
+        elif message_type == "average":
+            island_averages[island_index] = message[3]
+            data[2].append(curr_time - start_time)
+            data[3].append(sum(island_averages.values()) / len(island_averages))
+
+        elif message_type == "best":
+            _message_type, _island_index, generation_no, score, encoded_solution = message
+            if best_score is not None and score <= best_score:
+                continue
+
+            is_initial = best_score is None
+            improvement = 0 if is_initial else score - best_score
+
+            # Rebuild the solution in this process
+            best_solution = solution_decoder(encoded_solution)
+            best_score, order_status = solution_evaluator(best_solution, return_status = True)
+            best_island = island_index
+            best_solution_generation = generation_no
+
+            data[0].append(0 if is_initial else curr_time - start_time)
+            data[1].append(best_score)
+
+            if update_visualization:
+                # Pass solution, score and status to callback
+                update_visualization(best_solution, best_score, order_status, is_initial)
+
+            if is_initial:
+                logger.log_header("GENETIC ALGORITHM RESULTS", [("Initial Solution Score:", best_score),
+                                                              ("Islands:", island_number),
+                                                              ("Population Size:", f"{population_size} per island"),
+                                                              ("Mutation Rate:", "1% chance per child"),
+                                                              ("Migration Interval:", f"{migration_interval} generations"),
+                                                              ("Migration Size:", migration_size),
+                                                              ("Topology:", topology)])
+
+                print(f"Initial solution score: {best_score}")
+            else:
+                improvement_counter += 1
+
+                logger.log_event(f"Generation {generation_no:>5} (Island {island_index + 1}): New best solution found",
+                                 [("Score:", best_score), ("Improvement:", improvement, "+")])
+
+                print(f"Found better solution score: {best_score}")
+                print(f"Generation: {generation_no} (Island {island_index + 1})")
+
+    for island in islands:
+        island.join()
+
+    if best_solution is None:
+        raise RuntimeError("Error: No island produced a solution")
+
+    data[0].append(min(time.time() - start_time, max_time))
+    data[1].append(best_score)
+
+    logger.log_final([("Total Generations:", total_generations),
+                      ("Improvements Found:", improvement_counter),
+                      ("Best Island:", best_island + 1),
+                      ("Best Generation:", best_solution_generation),
+                      ("Final Solution Score:", best_score)])
+
+    # Save solution to file
+    result_writer.write(best_solution)
+
+    print(f"Final solution score: {best_score}")
+    print(f"Found on generation {best_solution_generation} of island {best_island + 1}")
+
+    return data
+
+##################
+# Island Process #
+##################
+
+def run_island(island_index, seed, deadline, stop_islands, population_size, migration_interval, migration_size, topology, inboxes, progress_queue,
+               solution_generator, solution_evaluator, crossover_generator, mutation_generator, solution_encoder, solution_decoder):
+    # Islands must not explore the same random sequence
+    random.seed(seed)
+
+    # Migrants still in transit when an island stops are simply dropped
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    generation_no = 0
+    population = generate_population(population_size, solution_generator, solution_evaluator)
+
+    best_solution, best_score, _order_status = get_greatest_fit(population)
+    progress_queue.put(("best", island_index, generation_no, best_score, solution_encoder(best_solution)))
+
+    while time.time() < deadline and not stop_islands.is_set():
+        if not advance_generation(population, solution_evaluator, crossover_generator, mutation_generator):
+            continue
+
+        generation_no += 1
+
+        # Report improvements of this island, the main process decides if they are a global best
+        greatest_fit, greatest_fit_score, _order_status = get_greatest_fit(population)
+        if greatest_fit_score > best_score:
+            best_score = greatest_fit_score
+            progress_queue.put(("best", island_index, generation_no, best_score, solution_encoder(greatest_fit)))
+
+        if generation_no % migration_interval == 0:
+            migrate(island_index, population, migration_size, topology, inboxes, solution_evaluator, solution_encoder, solution_decoder)
+            progress_queue.put(("average", island_index, generation_no, get_average(population)))
+
+    progress_queue.put(("done", island_index, generation_no))
+
+#############
+# Migration #
+#############
+
+def get_migration_targets(island_index, island_number, topology):
+    if island_number <= 1:
+        return []
+    if topology == "Ring":
+        return [(island_index + 1) % island_number]
+    if topology == "Fully Connected":
+        return [target for target in range(island_number) if target != island_index]
+    # Random topology picks a new neighbour at every migration
+    return [random.choice([target for target in range(island_number) if target != island_index])]
+
+def migrate(island_index, population, migration_size, topology, inboxes, solution_evaluator, solution_encoder, solution_decoder):
+    """Takes in the pending migrants (if fitter than the least fit individual) and sends out the fittest individuals"""
+    while True:
+        try:
+            migrant_score, encoded_migrant = inboxes[island_index].get_nowait()
+        except queue.Empty:
+            break
+
+        if migrant_score <= population.individuals[0][0]:
+            continue
+
+        migrant = solution_decoder(encoded_migrant)
+        score, order_status = solution_evaluator(migrant, return_status = True)
+        replace_least_fittest(population, migrant, score, order_status)
+
+    # Individuals are sent as copies, so the emigrants also stay in this island
+    emigrants = [(score, solution_encoder(solution)) for score, _insertion_number, solution, _order_status
+                 in heapq.nlargest(migration_size, population.individuals)]
+
+    for target in get_migration_targets(island_index, len(inboxes), topology):
+        for emigrant in emigrants:
+            inboxes[target].put(emigrant)
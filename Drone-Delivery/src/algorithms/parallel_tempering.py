@@ -0,0 +1,261 @@
+# parallel_tempering.py
+import math
+import random
+import time
+import queue
+import multiprocessing
+
+from algorithms.simulated_anealing import TEMPERATURE_TRACE_INTERVAL
+
+#######################
+# Algorithm Structure #
+#######################
+
+def get_pt_solution(max_time, replica_number, min_temperature, max_temperature, exchange_interval,
+                    solution_generator, solution_evaluator, state_generator, move_generator, solution_encoder, solution_decoder,
+                    update_visualization, logger, result_writer, stop_event):
+    """
+    Parallel tempering version of simulated annealing.
+    replica_number chains run in their own processes, each one at a fixed temperature of a geometric ladder
+    between min_temperature and max_temperature. Every exchange_interval iterations all replicas report their
+    score and replicas at neighbouring temperatures swap states (by swapping temperatures) with probability
+    min(1, exp((1/T_i - 1/T_j) * (score_j - score_i))).
+    This process only keeps track of the global best solution, written by result_writer (see SolutionWriter), and decides the exchanges.
+    The solution functions are bound to the problem, so replicas get it along with them.
+    Setting stop_event ends the run after the current exchange round.
+    """
+    start_time = time.time()
+    deadline = start_time + max_time
+    temperatures = get_temperature_ladder(replica_number, min_temperature, max_temperature)
+
+    # Every replica has its own inbox for instructions and all of them report to the progress queue
+    inboxes = [multiprocessing.Queue() for _ in range(replica_number)]
+    progress_queue = multiprocessing.Queue()
+
+    base_seed = random.randrange(2 ** 32)
+    replicas = []
+    for replica_index in range(replica_number):
+        replica = multiprocessing.Process(target=run_replica, daemon=True,
+                                          args=(replica_index, base_seed + replica_index, deadline, exchange_interval,
+                                                inboxes[replica_index], progress_queue, solution_generator,
+                                                solution_evaluator, state_generator, move_generator, solution_encoder))
+        replica.start()
+        replicas.append(replica)
+
+    # Temperature currently used by every replica (the ladder order at the start)
+    replica_temperatures = list(temperatures)
+
+    best_solution = None
+    best_score = None
+    best_temperature = 0
+    round_no = 0
+    iteration = 0
+    improvement_counter = 0
+    attempted_exchanges = 0
+    accepted_exchanges = 0
+
+    # Data for graph generation
+    data = [[], [], [], [], [], []]
+    next_trace_time = start_time
+
+    while True:
+        # Wait for the report of every replica
+        reports = [None] * replica_number
+        received_reports = 0
+        while received_reports < replica_number:
+            try:
+                _message_type, replica_index, score, replica_best_score, iterations, encoded_best = progress_queue.get(timeout=1)
+            except queue.Empty:
+                if not all(replica.is_alive() for replica in replicas):
+                    for replica in replicas:
+                        replica.terminate()
+                    raise RuntimeError("Error: A parallel tempering replica stopped unexpectedly")
+                continue
+
+            reports[replica_index] = (score, replica_best_score, encoded_best)
+            received_reports += 1
+            iteration += iterations
+
+        curr_time = time.time()
+        elapsed_time = curr_time - start_time
+
+        # Update the global best with the best replica that sent its solution
+        sent_reports = [replica_index for replica_index in range(replica_number) if reports[replica_index][2] is not None]
+        if sent_reports:
+            replica_index = max(sent_reports, key=lambda index: reports[index][1])
+            replica_best_score = reports[replica_index][1]
+
+            if best_score is None or replica_best_score > best_score:
+                is_initial = best_score is None
+                improvement = 0 if is_initial else replica_best_score - best_score
+
+                # Rebuild the solution in this process
+                best_solution = solution_decoder(reports[replica_index][2])
+                best_score, order_status = solution_evaluator(best_solution, return_status = True)
+                best_temperature = replica_temperatures[replica_index]
+
+                data[0].append(0 if is_initial else elapsed_time)
+                data[1].append(best_score)
+
+                if update_visualization:
+                    # Pass solution, score and status to callback
+                    update_visualization(best_solution, best_score, order_status, is_initial)
+
+                if is_initial:
+                    logger.log_header("PARALLEL TEMPERING RESULTS", [
+                        ("Initial Solution Score:", best_score),
+                        ("Replicas:", replica_number),
+                        ("Temperatures:", ", ".join(f"{temperature:.2f}" for temperature in temperatures)),
+                        ("Exchange Interval:", f"{exchange_interval} iterations")])
+
+                    print(f"Initial Solution score: {best_score}")
+                else:
+                    improvement_counter += 1
+
+                    logger.log_event(f"Round {round_no:>5}: New better solution found (temp: {best_temperature:.2f})",
+                                     [("Score:", best_score), ("Improvement:", improvement, "+"),
+                                      ("Temperature:", best_temperature, ".2f")])
+
+                    print(f"Found better solution score: {best_score}")
+
+        # Save the best solution periodically
+        if best_solution is not None and result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution)
+
+        if curr_time >= deadline or stop_event.is_set():
+            break
+
+        # Temperature of the replica with the best current state
+        scores = [report[0] for report in reports]
+        if curr_time >= next_trace_time:
+            data[4].append(elapsed_time)
+            data[5].append(replica_temperatures[scores.index(max(scores))])
+            next_trace_time = curr_time + TEMPERATURE_TRACE_INTERVAL
+
+        # Neighbouring temperatures exchange states, alternating between even and odd pairs every round
+        ladder = sorted(range(replica_number), key=lambda index: replica_temperatures[index])
+        for position in range(round_no % 2, replica_number - 1, 2):
+            colder_replica, hotter_replica = ladder[position], ladder[position + 1]
+            attempted_exchanges += 1
+
+            if accept_exchange(replica_temperatures[colder_replica], scores[colder_replica],
+                               replica_temperatures[hotter_replica], scores[hotter_replica]):
+                accepted_exchanges += 1
+                replica_temperatures[colder_replica], replica_temperatures[hotter_replica] = \
+                    replica_temperatures[hotter_replica], replica_temperatures[colder_replica]
+
+                # State moved down to the colder temperature
+                data[2].append(elapsed_time)
+                data[3].append(scores[hotter_replica])
+
+        round_no += 1
+        for replica_index in range(replica_number):
+            inboxes[replica_index].put((replica_temperatures[replica_index], best_score))
+
+    # Stop every replica
+    for inbox in inboxes:
+        inbox.put(None)
+    for replica in replicas:
+        replica.join()
+
+    data[0].append(min(elapsed_time, max_time))
+    data[1].append(best_score)
+
+    logger.log_final([("Total Iterations:", iteration),
+                      ("Exchange Rounds:", round_no),
+                      ("Accepted Exchanges:", f"{accepted_exchanges}/{attempted_exchanges}"),
+                      ("Improvements Found:", improvement_counter),
+                      ("Best Temperature:", best_temperature, ".2f"),
+                      ("Final Solution Score:", best_score)])
+
+    # Save solution to file
+    result_writer.write(best_solution)
+
+    print(f"Final Solution score: {best_score}")
+    return data
+
+def get_temperature_ladder(replica_number, min_temperature, max_temperature):
+    """Geometric ladder of replica_number temperatures, from min_temperature to max_temperature"""
+    if replica_number == 1:
+        return [min_temperature]
+    ratio = (max_temperature / min_temperature) ** (1 / (replica_number - 1))
+    return [min_temperature * ratio ** index for index in range(replica_number)]
+
+def accept_exchange(colder_temperature, colder_score, hotter_temperature, hotter_score):
+    # Always accepted if the hotter replica found a better state
+    exponent = (1 / colder_temperature - 1 / hotter_temperature) * (hotter_score - colder_score)
+    return exponent >= 0 or math.exp(exponent) > random.random()
+
+###################
+# Replica Process #
+###################
+
+def run_replica(replica_index, seed, deadline, exchange_interval, inbox, progress_queue,
+                solution_generator, solution_evaluator, state_generator, move_generator, solution_encoder):
+    # Replicas must not explore the same random sequence
+    random.seed(seed)
+
+    # Get initial solution and its score
+    solution = solution_generator()
+    score = solution_evaluator(solution)
+
+    # Cached evaluation of the current solution, used to score moves incrementally
+    state = state_generator(solution)
+
+    # While it is None, the best solution is the current one before the moves recorded in its journal
+    best_solution = None
+    best_score = score
+    max_journal_size = 10000
+
+    # Best score known by the main process (None until the first report)
+    global_best_score = None
+    iterations = 0
+
+    while True:
+        # Only send the best solution when it beats the global best
+        encoded_best = None
+        if global_best_score is None or best_score > global_best_score:
+            encoded_best = solution_encoder(best_solution if best_solution is not None else solution.copy_before_journal())
+        progress_queue.put(("exchange", replica_index, score, best_score, iterations, encoded_best))
+
+        instruction = inbox.get()
+        if instruction is None:
+            break
+        temperature, global_best_score = instruction
+
+        iterations = 0
+        while iterations < exchange_interval and time.time() < deadline:
+            # Generate neighbor move
+            move = move_generator(solution)
+
+            # Check if neighbor was generated
+            if move == -1:
+                continue
+
+            iterations += 1
+
+            move_info = move.describe()
+            neighbor_eval = state.evaluate_move(move_info)
+            delta = neighbor_eval - score
+
+            # Accept worse solutions according to this replica's temperature
+            if delta > 0 or (delta < 0 and math.exp(delta / temperature) > random.random()):
+                # Apply move in place, recording it while the best solution has not been snapshotted
+                if best_solution is None:
+                    solution.apply_move(move)
+                else:
+                    move.apply(solution)
+                score = neighbor_eval
+                state.apply_move(move_info)
+
+                if score > best_score:
+                    best_score = score
+
+                    # Current solution is the new best one
+                    solution.clear_journal()
+                    best_solution = None
+
+                # Snapshot the best solution instead of keeping an ever growing journal
+                elif best_solution is None and len(solution.journal) > max_journal_size:
+                    best_solution = solution.copy_before_journal()
+                    solution.clear_journal()
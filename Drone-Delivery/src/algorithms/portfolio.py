@@ -0,0 +1,205 @@
+# portfolio.py
+import os
+import sys
+import random
+import time
+import queue
+import signal
+import tempfile
+import contextlib
+import multiprocessing
+
+#######################
+# Algorithm Structure #
+#######################
+
+def get_portfolio_solution(max_time, variants, prune_margin, checkpoint_interval, algorithm_runner, solution_evaluator,
+                           solution_encoder, solution_decoder, update_visualization, logger, result_writer, stop_event):
+    """
+    Races several algorithm runs on the same problem, each one in its own process.
+    variants is a list of (algorithm, params) pairs, run through algorithm_runner (simulation.run_algorithm bound to the problem)
+    with max_time. Runs are daemonic processes, so they cannot have replicas or islands of their own.
+    Runs send a new best solution as soon as it beats the global best, which is passed on to update_visualization
+    and saved by result_writer (see SolutionWriter).
+    If prune_margin is set, every checkpoint_interval seconds the runs whose best score is more than prune_margin
+    (a fraction of the global best) behind it are stopped.
+    Setting stop_event stops every run, their best solutions were already sent as they found them.
+    """
+    start_time = time.time()
+    run_number = len(variants)
+    labels = [get_variant_label(algorithm, params) for algorithm, params in variants]
+
+    # Best score of every run and of the whole portfolio, shared so runs only send solutions that beat the global best
+    run_scores = multiprocessing.Array("q", [-1] * run_number)
+    global_best_score = multiprocessing.Value("q", -1)
+    progress_queue = multiprocessing.Queue()
+
+    base_seed = random.randrange(2 ** 32)
+    runs = []
+    for run_index, (algorithm, params) in enumerate(variants):
+        run = multiprocessing.Process(target=run_variant, daemon=True,
+                                      args=(run_index, base_seed + run_index, algorithm, dict(params, max_time=max_time),
+                                            run_scores, global_best_score, progress_queue, algorithm_runner, solution_encoder))
+        run.start()
+        runs.append(run)
+
+    best_solution = None
+    best_score = None
+    best_run = 0
+    improvement_counter = 0
+    finished_runs = set()
+    pruned_runs = set()
+    next_checkpoint = start_time + checkpoint_interval
+    stop_check_interval = 0.1
+
+    # Data for graph generation
+    data = [[], []]
+
+    while len(finished_runs | pruned_runs) < run_number:
+        # Wait for a message (or the next checkpoint) and take every other pending one
+        # (waking up at least every stop_check_interval to notice stop requests)
+        messages = []
+        try:
+            messages.append(progress_queue.get(timeout=min(max(next_checkpoint - time.time(), 0.01), stop_check_interval)))
+            while True:
+                messages.append(progress_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        curr_time = time.time()
+
+        finished_runs.update(message[1] for message in messages if message[0] == "done")
+
+        # Only the best of the pending solutions is rebuilt
+        best_messages = [message for message in messages if message[0] == "best"]
+        if best_messages:
+            _message_type, run_index, score, encoded_solution = max(best_messages, key=lambda message: message[2])
+            if best_score is None or score > best_score:
+                is_initial = best_score is None
+                improvement = 0 if is_initial else score - best_score
+
+                # Rebuild the solution in this process
+                best_solution = solution_decoder(encoded_solution)
+                best_score, order_status = solution_evaluator(best_solution, return_status = True)
+                best_run = run_index
+
+                data[0].append(0 if is_initial else curr_time - start_time)
+                data[1].append(best_score)
+
+                if update_visualization:
+                    # Pass solution, score and status to callback
+                    update_visualization(best_solution, best_score, order_status, is_initial)
+
+                if is_initial:
+                    header_fields = [("Initial Solution Score:", best_score)] + [("Run:", label) for label in labels]
+                    if prune_margin is not None:
+                        header_fields.append(("Pruning Margin:", f"{prune_margin:.0%} every {checkpoint_interval:.1f}s"))
+                    logger.log_header("PORTFOLIO RESULTS", header_fields)
+
+                    print(f"Initial Solution score: {best_score}")
+                else:
+                    improvement_counter += 1
+
+                    logger.log_event(f"Time {curr_time - start_time:>8.2f}s: New better solution found ({labels[run_index]})",
+                                     [("Score:", best_score), ("Improvement:", improvement, "+")])
+
+                    print(f"Found better solution score: {best_score} ({labels[run_index]})")
+
+        # Save the best solution periodically
+        if best_solution is not None and result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution)
+
+        # Runs that died without finishing are not waited for (once the queue is empty, all their messages were read)
+        if not messages:
+            for run_index, run in enumerate(runs):
+                if not run.is_alive() and run_index not in finished_runs and run_index not in pruned_runs:
+                    finished_runs.add(run_index)
+
+        if stop_event.is_set():
+            for run_index, run in enumerate(runs):
+                if run_index not in finished_runs and run_index not in pruned_runs:
+                    run.terminate()
+                    finished_runs.add(run_index)
+
+        if curr_time >= next_checkpoint:
+            next_checkpoint = curr_time + checkpoint_interval
+
+            # Stop the runs clearly behind the global best
+            if prune_margin is not None and best_score is not None:
+                threshold = best_score - prune_margin * abs(best_score)
+                for run_index in range(run_number):
+                    if run_index in finished_runs or run_index in pruned_runs or run_index == best_run:
+                        continue
+                    # Runs without an initial solution yet are left alone
+                    if 0 <= run_scores[run_index] < threshold:
+                        runs[run_index].terminate()
+                        pruned_runs.add(run_index)
+
+                        logger.log_event(f"Time {curr_time - start_time:>8.2f}s: Stopped {labels[run_index]}",
+                                         [("Run Best Score:", run_scores[run_index])])
+
+                        print(f"Stopped {labels[run_index]} with score {run_scores[run_index]}")
+
+    # Stopped runs may still be flushing their last messages
+    while any(run.is_alive() for run in runs):
+        with contextlib.suppress(queue.Empty):
+            progress_queue.get(timeout=0.1)
+
+    for run in runs:
+        run.join()
+
+    if best_solution is None:
+        raise RuntimeError("Error: No portfolio run produced a solution")
+
+    data[0].append(min(time.time() - start_time, max_time))
+    data[1].append(best_score)
+
+    final_fields = [(label + (" (stopped)" if run_index in pruned_runs else "") + ":", run_scores[run_index])
+                    for run_index, label in enumerate(labels)]
+    final_fields += [("Improvements Found:", improvement_counter),
+                     ("Best Run:", labels[best_run]),
+                     ("Final Solution Score:", best_score)]
+    logger.log_final(final_fields)
+
+    # Save solution to file
+    result_writer.write(best_solution)
+
+    print(f"Final Solution score: {best_score}")
+    print(f"Found by {labels[best_run]}")
+
+    return data
+
+def get_variant_label(algorithm, params):
+    if not params:
+        return algorithm
+    return f"{algorithm} ({', '.join(f'{name}={value}' for name, value in params.items())})"
+
+###############
+# Run Process #
+###############
+
+def run_variant(run_index, seed, algorithm, params, run_scores, global_best_score, progress_queue, algorithm_runner, solution_encoder):
+    # Runs must not explore the same random sequence
+    random.seed(seed)
+
+    # Stopping a run (see prune_margin) ends it cleanly, so the progress queue is not left half written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    def report_solution(solution, score, order_status, is_initial=False):
+        run_scores[run_index] = score
+
+        # Only solutions that beat the global best are sent
+        with global_best_score.get_lock():
+            if score <= global_best_score.value:
+                return
+            global_best_score.value = score
+
+        progress_queue.put(("best", run_index, score, solution_encoder(solution)))
+
+    # Every run writes its own output files and its progress messages are not printed
+    with tempfile.TemporaryDirectory() as working_directory, open(os.devnull, "w") as devnull:
+        os.chdir(working_directory)
+        with contextlib.redirect_stdout(devnull):
+            algorithm_runner(algorithm, update_callback=report_solution, **params)
+
+    progress_queue.put(("done", run_index))
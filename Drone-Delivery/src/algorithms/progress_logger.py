@@ -0,0 +1,148 @@
+# progress_logger.py
+import json
+import threading
+from collections import deque
+
+# Verbosity levels, each one logs everything the previous one does
+VERBOSITY_LEVELS = ["improvements", "sampled", "all"]
+LOG_FORMATS = ["pretty", "compact"]
+
+class ProgressLogger:
+    """
+    Buffered log of an algorithm's progress (output.txt).
+    Records are kept in memory and a background thread writes them every flush_interval seconds,
+    so logging in the main loop never waits for the file system.
+    Every record has a heading and a list of (label, value) or (label, value, format spec) fields:
+    - "pretty" format writes them in the original human-readable layout
+    - "compact" format writes one JSON object per line
+    Verbosity decides which accepted worse solutions are logged (see should_log_acceptance):
+    "improvements" logs none of them, "sampled" one in every sample_rate and "all" every one.
+    """
+    def __init__(self, path="output.txt", verbosity="all", log_format="pretty", flush_interval=0.5, sample_rate=100):
+        if verbosity not in VERBOSITY_LEVELS:
+            raise ValueError(f"Error: Unknown log verbosity {verbosity}")
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Error: Unknown log format {log_format}")
+
+        self.path = path
+        self.verbosity = verbosity
+        self.log_format = log_format
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.acceptance_counter = 0
+
+        # Records waiting to be written, as (record type, heading, fields)
+        self.records = deque()
+        self.file = None
+        self.file_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flush_thread = None
+
+    def open(self):
+        """Starts the background flushes, the log file is only truncated when the first records are written"""
+        self.stop_event.clear()
+        self.flush_thread = threading.Thread(target=self.flush_periodically, daemon=True)
+        self.flush_thread.start()
+
+    def close(self):
+        """Stops the background flushes and writes every pending record"""
+        if self.flush_thread is None:
+            return
+        self.stop_event.set()
+        self.flush_thread.join()
+        self.flush_thread = None
+        self.flush()
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    #############
+    # Recording #
+    #############
+
+    def log_header(self, title, fields):
+        self.records.append(("header", title, fields))
+
+    def log_event(self, heading, fields):
+        self.records.append(("event", heading, fields))
+
+    def log_final(self, fields):
+        self.records.append(("final", "FINAL RESULTS", fields))
+
+    def should_log_acceptance(self):
+        """Whether the accepted worse solution about to be logged passes the verbosity level"""
+        if self.verbosity == "all":
+            return True
+        if self.verbosity == "improvements":
+            return False
+        sampled = self.acceptance_counter % self.sample_rate == 0
+        self.acceptance_counter += 1
+        return sampled
+
+    ###########
+    # Writing #
+    ###########
+
+    def flush_periodically(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        lines = []
+        while self.records:
+            record_type, heading, fields = self.records.popleft()
+            if self.log_format == "pretty":
+                lines.append(format_pretty(record_type, heading, fields))
+            else:
+                lines.append(format_compact(record_type, heading, fields))
+
+        if lines:
+            with self.file_lock:
+                if self.file is None:
+                    self.file = open(self.path, "w")
+                self.file.write("".join(lines))
+                self.file.flush()
+
+##############
+# Formatting #
+##############
+
+def format_value(field):
+    if len(field) == 3:
+        return format(field[1], field[2])
+    return str(field[1])
+
+def format_pretty(record_type, heading, fields):
+    """Record in the original layout of output.txt"""
+    if record_type == "header":
+        lines = ["=" * 60, f"{heading:^60}", "=" * 60, ""]
+        lines += [f"{field[0]:<30} {format_value(field)}" for field in fields]
+        lines.append("-" * 60)
+    elif record_type == "final":
+        lines = ["", "=" * 60, f"{heading:^60}", "=" * 60, ""]
+        lines += [f"{field[0]:<30} {format_value(field):>16}" for field in fields]
+        lines.append("=" * 60)
+    else:
+        lines = [heading]
+        lines += [f"{field[0]:<30} {format_value(field)}" for field in fields]
+        lines.append("-" * 60)
+    return "\n".join(lines) + "\n"
+
+def format_compact(record_type, heading, fields):
+    """Record as a single JSON line, field labels become keys"""
+    record = {"type": record_type, "heading": heading}
+    for field in fields:
+        value = field[1]
+        # NumPy scalars are turned into Python numbers
+        if hasattr(value, "item"):
+            value = value.item()
+        record[field[0].rstrip(":").lower().replace(" ", "_")] = value
+    return json.dumps(record) + "\n"
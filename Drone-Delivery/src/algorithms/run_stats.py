@@ -0,0 +1,68 @@
+# run_stats.py
+import time
+
+class RunStats:
+    """
+    Counters and timers filled by the algorithms when a run is profiled (see run_algorithm's profile parameter).
+    Time is measured in laps: every call to lap adds the time since the previous one to the given phase,
+    so each phase only costs one clock read. loop_time is the time between reset_clock and end_loop (the main loop).
+    """
+    PHASES = ["generation", "evaluation", "acceptance", "callbacks", "io"]
+
+    def __init__(self):
+        self.phase_times = dict.fromkeys(self.PHASES, 0.0)
+        # Operator -> [valid moves, failed moves (-1)]
+        self.generated_moves = {}
+        # Operator -> [evaluated moves, accepted moves]
+        self.evaluated_moves = {}
+        self.tabu_hits = 0
+        self.aspiration_overrides = 0
+        self.clock = time.perf_counter()
+        self.loop_start = self.clock
+        self.loop_time = 0.0
+
+    def reset_clock(self):
+        """Time before this call is not counted in any phase (called before an algorithm's main loop)"""
+        self.clock = time.perf_counter()
+        self.loop_start = self.clock
+
+    def end_loop(self):
+        self.loop_time = time.perf_counter() - self.loop_start
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phase_times[phase] += now - self.clock
+        self.clock = now
+
+    def count_generated(self, operator, valid):
+        counts = self.generated_moves.setdefault(operator, [0, 0])
+        counts[0 if valid else 1] += 1
+
+    def count_evaluated(self, move_info, accepted):
+        counts = self.evaluated_moves.setdefault(move_info[0], [0, 0])
+        counts[0] += 1
+        if accepted:
+            counts[1] += 1
+
+    def get_summary(self):
+        """Compact dictionary with the time of every phase and the counts and rates of every operator"""
+        operators = {}
+        for operator in sorted(self.generated_moves.keys() | self.evaluated_moves.keys()):
+            valid, failed = self.generated_moves.get(operator, (0, 0))
+            evaluated, accepted = self.evaluated_moves.get(operator, (0, 0))
+            operators[operator] = {
+                "generated": valid + failed,
+                "failed": failed,
+                "failure_rate": round(failed / (valid + failed), 4) if valid + failed else 0,
+                "evaluated": evaluated,
+                "accepted": accepted,
+                "acceptance_rate": round(accepted / evaluated, 4) if evaluated else 0
+            }
+
+        return {
+            "phase_times": {phase: round(phase_time, 4) for phase, phase_time in self.phase_times.items()},
+            "loop_time": round(self.loop_time, 4),
+            "operators": operators,
+            "tabu_hits": self.tabu_hits,
+            "aspiration_overrides": self.aspiration_overrides
+        }
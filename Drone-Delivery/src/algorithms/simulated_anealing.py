@@ -3,8 +3,12 @@ import numpy as np
 import random
 import time
 
-def get_sa_solution(max_time, temp_adjustment, solution_generator, solution_evaluator, neighbor_generator, update_visualization):
-    start_time = time.time()
+# Seconds between the points of the temperature graph, so its size does not grow with the speed of the loop
+TEMPERATURE_TRACE_INTERVAL = 0.05
+
+def get_sa_solution(max_time, temp_adjustment, solution_generator, solution_evaluator, state_generator, move_generator, update_visualization, logger, result_writer, termination, checkpointer = None, stats = None):
+    termination.start()
+    resume_state = checkpointer.resume_state if checkpointer else None
     iteration = 0
     improvement_counter = 0
     temperature = 1000
@@ -17,145 +21,212 @@ def get_sa_solution(max_time, temp_adjustment, solution_generator, solution_eval
     elif temp_adjustment == 2:
         cooling_factor_string = "Logarithmic"
     
-    # Get initial solution and its score
-    solution = solution_generator() 
-    score, order_status = solution_evaluator(solution, return_status = True)
-    
     # Save the best solution found until the moment
-    best_solution = solution
-    best_score = score
-
-    # Data for graph generation
-    data = [[0], [best_score], [], [], [], []]
+    # While it is None, the best solution is the current one before the moves recorded in its journal
+    best_solution = None
+    max_journal_size = 10000
+
+    if resume_state is None:
+        # Get initial solution and its score
+        solution = solution_generator() 
+        score, order_status = solution_evaluator(solution, return_status = True)
+        termination.record_improvement(score)
+        best_score = score
+
+        # Data for graph generation
+        data = [[0], [best_score], [], [], [], []]
+    else:
+        # Continue from the checkpoint, the temperature follows from the restored time and evaluations (see Termination)
+        iteration = resume_state["iteration"]
+        improvement_counter = resume_state["improvement_counter"]
+        temperature = resume_state["temperature"]
+
+        solution = checkpointer.get_loaded_solution(resume_state["solution"])
+        score = resume_state["score"]
+        if resume_state["best_solution"] is not None:
+            best_solution = checkpointer.solution_decoder(resume_state["best_solution"])
+        best_score, order_status = solution_evaluator(best_solution if best_solution is not None else solution, return_status = True)
+
+        data = checkpointer.get_loaded_data(resume_state["data"])
+
+    # Cached evaluation of the current solution, used to score moves incrementally
+    state = state_generator(solution)
 
     if update_visualization:
         # Pass both solution, score, order status, and is_initial=True
-        update_visualization(best_solution, best_score, order_status, True)
+        update_visualization(best_solution if best_solution is not None else solution, best_score, order_status, True)
 
-    with open("output.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'SIMULATED ANNEALING ALGORITHM RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Initial Solution Score:':<30} {best_score}\n")
-        f.write(f"{'Initial Temperature:':<30} {temperature:.2f}\n")
-        f.write(f"{'Cooling Factor:':<30} {cooling_factor_string}\n")
-        f.write("-" * 60 + "\n")
+    header_fields = [("Initial Solution Score:", best_score),
+                     ("Initial Temperature:", temperature, ".2f"),
+                     ("Cooling Factor:", cooling_factor_string)]
+    if resume_state is not None:
+        header_fields.append(("Resumed At Iteration:", iteration))
+    logger.log_header("SIMULATED ANNEALING ALGORITHM RESULTS", header_fields)
 
     print(f"Initial Solution score: {best_score}")
 
+    if stats:
+        stats.reset_clock()
+
+    next_trace_time = termination.start_time
     curr_time = time.time()
-    while (curr_time - start_time < max_time):        
-        # Generate neighbor
-        neighbor = neighbor_generator(solution)
+    while not termination.should_stop(curr_time):
+        # Generate neighbor move
+        move = move_generator(solution, stats)
+        if stats:
+            stats.lap("generation")
         
         # Check if neighbor was generated
-        if neighbor == -1:
+        if move == -1:
+            curr_time = time.time()
             continue
 
+        move_info = move.describe()
+
         # Advance iteration (Only for feasible solutions)
-        temperature = cooling_schedule(temp_adjustment, max_time, start_time, curr_time)
+        temperature = cooling_schedule(temp_adjustment, max_time, termination.get_progress(curr_time))
         iteration += 1
+        termination.count_iteration()
         
-        data[4].append(curr_time - start_time)
-        data[5].append(temperature)
+        if curr_time >= next_trace_time:
+            data[4].append(curr_time - termination.start_time)
+            data[5].append(temperature)
+            next_trace_time = curr_time + TEMPERATURE_TRACE_INTERVAL
 
-        neighbor_eval,order_status = solution_evaluator(neighbor, return_status = True)
+        neighbor_eval = state.evaluate_move(move_info)
         delta = -(score - neighbor_eval)
+        if stats:
+            stats.lap("evaluation")
 
         
         accepted_due_to_temp = (delta < 0 and np.exp(delta/temperature) > random.random()) # Accept worse solution
+        if stats:
+            stats.count_evaluated(move_info, delta > 0 or accepted_due_to_temp)
 
         if (delta > 0 or accepted_due_to_temp):
-            solution = neighbor
+            # Apply move in place, recording it while the best solution has not been snapshotted
+            if best_solution is None:
+                solution.apply_move(move)
+            else:
+                move.apply(solution)
             score = neighbor_eval
+            state.apply_move(move_info)
 
-            data[0].append(curr_time - start_time)
+            data[0].append(curr_time - termination.start_time)
             data[1].append(score)
 
             if accepted_due_to_temp:
-                data[2].append(curr_time - start_time)
+                data[2].append(curr_time - termination.start_time)
                 data[3].append(score)
+            if stats:
+                stats.lap("acceptance")
 
             if score > best_score:
                 improvement = score - best_score
                 improvement_counter += 1
-                best_solution = solution
                 best_score = score
+                termination.record_improvement(best_score)
+
+                # Current solution is the new best one
+                solution.clear_journal()
+                best_solution = None
 
                 if update_visualization:
                     # Pass solution, score and status to callback
-                    update_visualization(best_solution, best_score, order_status)
+                    update_visualization(solution, best_score, state.get_orders_status())
+                    if stats:
+                        stats.lap("callbacks")
                 
-                with open("output.txt", "a") as f:
-                    f.write(f"Iteration {iteration:>5}: New better solution found (temp: {temperature:.2f})\n")
-                    f.write(f"{'Score:':<30} {best_score}\n")
-                    f.write(f"{'Improvement:':<30} +{improvement}\n")
-                    f.write(f"{'Temperature:':<30} {temperature:.2f}\n")
-                    f.write("-" * 60 + "\n")
+                logger.log_event(f"Iteration {iteration:>5}: New better solution found (temp: {temperature:.2f})",
+                                 [("Score:", best_score), ("Improvement:", improvement, "+"), ("Temperature:", temperature, ".2f")])
 
                 print(f"Found better solution score: {best_score}")
+                if stats:
+                    stats.lap("io")
 
-            elif accepted_due_to_temp:
+            elif accepted_due_to_temp and logger.should_log_acceptance():
                     # when a worse solution is accepted due to temperature
-                    with open("output.txt", "a") as f:
-                        f.write(f"Iteration {iteration:>5}: Accepted worse solution (temp: {temperature:.2f})\n")
-                        f.write(f"{'Score delta:':<30} {delta}\n")
-                        f.write(f"{'Acceptance probability:':<30} {np.exp(delta/temperature):.4f}\n")
-                        f.write("-" * 60 + "\n")
+                    logger.log_event(f"Iteration {iteration:>5}: Accepted worse solution (temp: {temperature:.2f})",
+                                     [("Score delta:", delta), ("Acceptance probability:", np.exp(delta/temperature), ".4f")])
+                    if stats:
+                        stats.lap("io")
+
+            # Snapshot the best solution instead of keeping an ever growing journal
+            if best_solution is None and len(solution.journal) > max_journal_size:
+                best_solution = solution.copy_before_journal()
+                solution.clear_journal()
+
+        # Save the best solution periodically
+        if result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution if best_solution is not None else solution.copy_before_journal())
+            if stats:
+                stats.lap("io")
+
+        # Save the run periodically
+        if checkpointer and checkpointer.is_due(curr_time):
+            checkpointer.save(get_checkpoint_state(checkpointer, solution, score, best_solution, iteration,
+                                                   improvement_counter, temperature, data), termination)
+            if stats:
+                stats.lap("io")
         
         # Update time for next loop
         curr_time = time.time()
 
-    data[0].append(max_time)
+    if stats:
+        stats.end_loop()
+
+    # Saved before the rollback, so a resumed run continues from the current solution
+    if checkpointer:
+        checkpointer.save(get_checkpoint_state(checkpointer, solution, score, best_solution, iteration,
+                                               improvement_counter, temperature, data), termination)
+
+    # Restore the best solution by undoing the moves applied since it was found
+    if best_solution is None:
+        solution.rollback()
+        best_solution = solution
+
+    data[0].append(min(curr_time - termination.start_time, max_time))
     data[1].append(best_score)
 
-    with open("output.txt", "a") as f:
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'FINAL RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Total Iterations:':<30} {iteration:>16}\n")
-        f.write(f"{'Improvements Found:':<30} {improvement_counter:>16}\n")
-        f.write(f"{'Final Temperature:':<30} {temperature:>16.2f}\n")
-        f.write(f"{'Final Solution Score:':<30} {best_score:>16}\n")
-        f.write("=" * 60 + "\n")
+    logger.log_final([("Total Iterations:", iteration),
+                      ("Improvements Found:", improvement_counter),
+                      ("Final Temperature:", temperature, ".2f"),
+                      ("Stop Reason:", termination.reason),
+                      ("Final Solution Score:", best_score)])
 
     # Save solution to file
-    with open("solution.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'SOLUTION DETAILS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-
-        for drone_id, drone_products in enumerate(best_solution):
-            # Write drone details
-            f.write(f"Drone {drone_id + 1}:\n")
-            f.write(f"{'Products:':<15}")
-
-            # Wrap the product list into chunks of a fixed size
-            chunk_size = 1
-            for i in range(0, len(drone_products), chunk_size):
-                chunk = drone_products[i:i + chunk_size]
-                if i > 0:
-                    f.write(f"{'':<15}")  # Indent subsequent lines
-                f.write(f"{', '.join(map(str, chunk))}\n")
-
-            f.write("-" * 60 + "\n")
-
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'END OF SOLUTION':^60}\n")
-        f.write("=" * 60 + "\n")
+    result_writer.write(best_solution)
+
+    if stats:
+        stats.lap("io")
                 
     print(f"Final Solution score: {best_score}")
     return data
 
-def cooling_schedule(temp_adjustment, max_time, start_time, curr_time):
+def get_checkpoint_state(checkpointer, solution, score, best_solution, iteration, improvement_counter, temperature, data):
+    """State of the run saved in checkpoints, the best solution is only saved when it differs from the current one"""
+    if best_solution is None and solution.journal:
+        best_solution = solution.copy_before_journal()
+
+    return {
+        "solution": checkpointer.get_saved_solution(solution),
+        "score": score,
+        "best_solution": checkpointer.solution_encoder(best_solution) if best_solution is not None else None,
+        "iteration": iteration,
+        "improvement_counter": improvement_counter,
+        "temperature": temperature,
+        "data": checkpointer.get_saved_data(data)
+    }
+
+def cooling_schedule(temp_adjustment, max_time, progress):
+    """Temperature once progress (see Termination.get_progress) of the run's budget is used"""
     # Temp_adjustment = 0 -> Constant cooling
     if (temp_adjustment == 0):
         return 500
     # Temp_adjustment = 1 -> Linear cooling
     if (temp_adjustment == 1):
-        return 1000 * (1 - ((curr_time - start_time) / max_time))
+        return 1000 * (1 - progress)
     # Temp_adjustment = 2 -> Logaritmic cooling
     if (temp_adjustment == 2):
-        elapsed_time = curr_time - start_time
-        temperature = (1000 / (max_time*0.1 + elapsed_time)) - (1000 / max_time)
+        temperature = (1000 / (max_time * (0.1 + progress))) - (1000 / max_time)
         return max(temperature, 0.0001)
@@ -1,174 +1,293 @@
 # tabu_search.py
 import time
 import math
+import numpy as np
 
-def get_ts_solution(max_time, tabu_adjustment, solution_generator, solution_evaluator, neighbor_generator, update_visualization, drone_number, orders):
-    start_time = time.time()    
+def get_ts_solution(max_time, tabu_adjustment, solution_generator, solution_evaluator, state_generator, move_info_generator, move_builder, update_visualization, logger, result_writer, termination, drone_number, orders, candidate_list_size = 5, checkpointer = None, stats = None):
+    """
+    Candidates are generated as move_info tuples by move_info_generator and scored together, only the picked one
+    is turned into a move by move_builder.
+    """
+    termination.start()
+    resume_state = checkpointer.resume_state if checkpointer else None
     iteration = 0
     improvement_counter = 0
-    tabu_size = 10
+    tabu_tenure = 10
 
-    # Tabu size is calculated according to problem size
+    # Tabu tenure (number of iterations a move stays tabu) is calculated according to problem size
     product_number = orders[-1].product_list[-1].id + 1
     # Problem Size approximates the maximum number of possible neighbor moves
     problem_size = product_number * drone_number + product_number//2 * product_number//2
     if tabu_adjustment==0:
-        tabu_size = math.ceil(0.00005 * problem_size)
+        tabu_tenure = math.ceil(0.00005 * problem_size)
     elif tabu_adjustment==1:
-        tabu_size = math.ceil(0.00025 * problem_size)
+        tabu_tenure = math.ceil(0.00025 * problem_size)
     elif tabu_adjustment==2:
-        tabu_size = math.ceil(0.00050 * problem_size)
-    
-    # Generate initial solution and evaluate it
-    current_solution = solution_generator()
-    current_score, order_status = solution_evaluator(current_solution, return_status = True)
+        tabu_tenure = math.ceil(0.00050 * problem_size)
+    # Moving a product at all is forbidden for a shorter time than moving it between the same drones
+    product_tenure = math.ceil(tabu_tenure / 10)
     
     # Set initial best solution
-    best_solution = current_solution
-    best_score = current_score
-    
-    # Data for graph generation
-    data = [[0], [best_score], [], []]
+    # While it is None, the best solution is the current one before the moves recorded in its journal
+    best_solution = None
+    max_journal_size = 10000
+
+    # Memory of tabu move attributes
+    tabu_memory = TabuMemory(product_number, drone_number, tabu_tenure, product_tenure)
+
+    if resume_state is None:
+        # Generate initial solution and evaluate it
+        current_solution = solution_generator()
+        current_score, order_status = solution_evaluator(current_solution, return_status = True)
+        termination.record_improvement(current_score)
+        best_score = current_score
+
+        # Data for graph generation
+        data = [[0], [best_score], [], []]
+    else:
+        # Continue from the checkpoint
+        iteration = resume_state["iteration"]
+        improvement_counter = resume_state["improvement_counter"]
+        tabu_memory.set_state(resume_state["tabu_memory"])
+
+        current_solution = checkpointer.get_loaded_solution(resume_state["solution"])
+        current_score = resume_state["score"]
+        if resume_state["best_solution"] is not None:
+            best_solution = checkpointer.solution_decoder(resume_state["best_solution"])
+        best_score, order_status = solution_evaluator(best_solution if best_solution is not None else current_solution, return_status = True)
+
+        data = checkpointer.get_loaded_data(resume_state["data"])
+
+    # Cached evaluation of the current solution, used to score moves incrementally
+    state = state_generator(current_solution)
 
     if update_visualization:
         # Pass both solution, score, order status, and is_initial=True
-        update_visualization(best_solution, best_score, order_status, True)
+        update_visualization(best_solution if best_solution is not None else current_solution, best_score, order_status, True)
 
-    # List of tabu moves
-    tabu_list = []
-
-    with open("output.txt", "w") as f:
-        f.write("=" *60 + "\n")
-        f.write(f"{'TABU SEARCH ALGORITHM RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Initial Solution Score:':<30} {best_score}\n")
-        f.write(f"{'Tabu List Size:':<30} {tabu_size}\n")
-        f.write("-" * 60 + "\n")
+    header_fields = [("Initial Solution Score:", best_score),
+                     ("Tabu Tenure:", tabu_tenure),
+                     ("Product Tabu Tenure:", product_tenure),
+                     ("Candidate List Size:", candidate_list_size)]
+    if resume_state is not None:
+        header_fields.append(("Resumed At Iteration:", iteration))
+    logger.log_header("TABU SEARCH ALGORITHM RESULTS", header_fields)
 
     print(f"Initial score: {best_score}\n")
     
+    if stats:
+        stats.reset_clock()
+
     # Main loop
     curr_time = time.time()
-    while (curr_time - start_time < max_time):        
-        # Generate up to 5 neighbors and store relevant information
-        neighbors_info = []
-        for _ in range(5):
-            generated_neighbor = neighbor_generator(current_solution, True)
+    while not termination.should_stop(curr_time):
+        # Generate up to candidate_list_size neighbor moves (nothing is applied yet)
+        moves_info = []
+        for _ in range(candidate_list_size):
+            move_info = move_info_generator(current_solution, stats)
 
-            if generated_neighbor == -1:
+            if move_info == -1:
                 continue
 
-            neighbor, move_info = generated_neighbor
-            neighbor_score, order_status = solution_evaluator(neighbor, return_status = True)
-            is_tabu = move_info in tabu_list
-            neighbors_info.append((neighbor_score, is_tabu, neighbor, move_info, order_status))
+            moves_info.append(move_info)
+        if stats:
+            stats.lap("generation")
         
         # No valid neighbors generated
-        if not neighbors_info:
+        if not moves_info:
+            curr_time = time.time()
             continue
 
         # Advance iteration (Only for feasible neighbors)
         iteration += 1
+        termination.count_iteration(len(moves_info))
+
+        # Score every candidate in one batched pass
+        neighbor_scores = state.evaluate_moves(moves_info)
+        is_tabu = np.array([tabu_memory.is_tabu(move_info, iteration) for move_info in moves_info])
+        if stats:
+            stats.lap("evaluation")
         
         # Neighbor selection
-        picked_neighbor = None
+        best_index = int(np.argmax(neighbor_scores))
+        picked_index = best_index
 
-        # Sort the neighbor list
-        neighbors_info.sort()
-        
         # Check if best element is not tabu or that it meets the aspiration criteria
-        best_neighbor_score, is_tabu, _neighbor, _move_info, _order_status = neighbors_info[-1]
+        if (is_tabu[best_index]):
+            data[2].append(curr_time - termination.start_time)
+            data[3].append(int(neighbor_scores[best_index]))
+            if stats:
+                stats.tabu_hits += 1
+                # The best tabu neighbor is kept because it beats the best solution
+                if neighbor_scores[best_index] > best_score:
+                    stats.aspiration_overrides += 1
 
-        if (is_tabu):
-            data[2].append(curr_time - start_time)
-            data[3].append(best_neighbor_score)
+            non_tabu_indexes = np.flatnonzero(~is_tabu)
 
-        if (not is_tabu or best_neighbor_score > best_score):
-            picked_neighbor = neighbors_info[-1]
+            # If there are non-tabu neighbors pick the best one, otherwise pick the best tabu one since they are all tabu
+            if (neighbor_scores[best_index] <= best_score and non_tabu_indexes.size > 0):
+                picked_index = int(non_tabu_indexes[np.argmax(neighbor_scores[non_tabu_indexes])])
 
+        # Process move in place, recording it while the best solution has not been snapshotted
+        picked_move_info = moves_info[picked_index]
+        picked_move = move_builder(picked_move_info)
+        if best_solution is None:
+            current_solution.apply_move(picked_move)
         else:
-            non_tabu_neighbors = [neighbor_info for neighbor_info in neighbors_info if neighbor_info[1] == False]
-
-            # If there are non-tabu neighbors pick the best one
-            if (non_tabu_neighbors):
-                picked_neighbor = non_tabu_neighbors[-1]
-                
-            else:
-                # Otherwise pick the best tabu solution since they are all tabu
-                picked_neighbor = neighbors_info[-1]
-
-        # Process move
-        current_solution = picked_neighbor[2]
-        current_score = picked_neighbor[0]
+            picked_move.apply(current_solution)
+        current_score = int(neighbor_scores[picked_index])
+        state.apply_move(picked_move_info)
+        if stats:
+            for move_index, move_info in enumerate(moves_info):
+                stats.count_evaluated(move_info, move_index == picked_index)
+            stats.lap("acceptance")
         
         # If this is a new best solution, update best solution
         if current_score > best_score:
             improvement = current_score - best_score
             improvement_counter += 1
-            best_solution = current_solution
             best_score = current_score
+            termination.record_improvement(best_score)
 
-            data[0].append(curr_time - start_time)
+            # Current solution is the new best one
+            current_solution.clear_journal()
+            best_solution = None
+
+            data[0].append(curr_time - termination.start_time)
             data[1].append(best_score)
 
             if update_visualization:
                 # Pass solution, score and status to callback
-                update_visualization(best_solution, best_score, picked_neighbor[4])
+                update_visualization(current_solution, best_score, state.get_orders_status())
+                if stats:
+                    stats.lap("callbacks")
 
-            with open("output.txt", "a") as f:
-                f.write(f"Iteration {iteration:>5}: New better solution found\n")
-                f.write(f"{'Score:':<30} {best_score}\n")
-                f.write(f"{'Improvement:':<30} +{improvement}\n")
-                f.write(f"{'Current tabu list size:':<30} {len(tabu_list)}/{tabu_size}\n")
-                f.write("-" * 60 + "\n")
+            logger.log_event(f"Iteration {iteration:>5}: New better solution found",
+                             [("Score:", best_score), ("Improvement:", improvement, "+")])
 
             print(f"Found better solution score: {best_score}")
+            if stats:
+                stats.lap("io")
+
+        # Snapshot the best solution instead of keeping an ever growing journal
+        elif best_solution is None and len(current_solution.journal) > max_journal_size:
+            best_solution = current_solution.copy_before_journal()
+            current_solution.clear_journal()
         
-        # If the move is not tabu then add it to tabu list
-        if not picked_neighbor[1]:
-            if (len(tabu_list) == tabu_size):
-                tabu_list.pop(0)
-            tabu_list.append(picked_neighbor[3])
+        # If the move is not tabu then make its attributes tabu
+        if not is_tabu[picked_index]:
+            tabu_memory.add(picked_move_info, iteration)
+
+        # Save the best solution periodically
+        if result_writer.is_due(curr_time):
+            result_writer.snapshot(best_solution if best_solution is not None else current_solution.copy_before_journal())
+            if stats:
+                stats.lap("io")
+
+        # Save the run periodically
+        if checkpointer and checkpointer.is_due(curr_time):
+            checkpointer.save(get_checkpoint_state(checkpointer, current_solution, current_score, best_solution, iteration,
+                                                   improvement_counter, tabu_memory, data), termination)
+            if stats:
+                stats.lap("io")
         
         curr_time = time.time()
+
+    if stats:
+        stats.end_loop()
+
+    # Saved before the rollback, so a resumed run continues from the current solution
+    if checkpointer:
+        checkpointer.save(get_checkpoint_state(checkpointer, current_solution, current_score, best_solution, iteration,
+                                               improvement_counter, tabu_memory, data), termination)
     
-    data[0].append(max_time)
+    # Restore the best solution by undoing the moves applied since it was found
+    if best_solution is None:
+        current_solution.rollback()
+        best_solution = current_solution
+
+    data[0].append(min(curr_time - termination.start_time, max_time))
     data[1].append(best_score)
 
-    with open("output.txt", "a") as f:
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'FINAL RESULTS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"{'Total Iterations:':<30} {iteration:>16}\n")
-        f.write(f"{'Improvements Found:':<30} {improvement_counter:>16}\n")
-        f.write(f"{'Final Tabu List Size:':<30} {len(tabu_list):>16}/{tabu_size}\n")
-        f.write(f"{'Final Solution Score:':<30} {best_score:>16}\n")
-        f.write("=" * 60 + "\n")
+    logger.log_final([("Total Iterations:", iteration),
+                      ("Improvements Found:", improvement_counter),
+                      ("Tabu Moves Recorded:", tabu_memory.recorded_moves),
+                      ("Stop Reason:", termination.reason),
+                      ("Final Solution Score:", best_score)])
 
     # Save solution to file
-    with open("solution.txt", "w") as f:
-        f.write("=" * 60 + "\n")
-        f.write(f"{'SOLUTION DETAILS':^60}\n")
-        f.write("=" * 60 + "\n\n")
-
-        for drone_id, drone_products in enumerate(best_solution):
-            # Write drone details
-            f.write(f"Drone {drone_id + 1}:\n")
-            f.write(f"{'Products:':<15}")
-
-            # Wrap the product list into chunks of a fixed size
-            chunk_size = 1
-            for i in range(0, len(drone_products), chunk_size):
-                chunk = drone_products[i:i + chunk_size]
-                if i > 0:
-                    f.write(f"{'':<15}")  # Indent subsequent lines
-                f.write(f"{', '.join(map(str, chunk))}\n")
-
-            f.write("-" * 60 + "\n")
-
-        f.write("\n" + "=" * 60 + "\n")
-        f.write(f"{'END OF SOLUTION':^60}\n")
-        f.write("=" * 60 + "\n")
+    result_writer.write(best_solution)
+
+    if stats:
+        stats.lap("io")
 
     print(f"Final Solution score: {best_score}")
-    return data
\ No newline at end of file
+    return data
+
+def get_checkpoint_state(checkpointer, solution, score, best_solution, iteration, improvement_counter, tabu_memory, data):
+    """State of the run saved in checkpoints, the best solution is only saved when it differs from the current one"""
+    if best_solution is None and solution.journal:
+        best_solution = solution.copy_before_journal()
+
+    return {
+        "solution": checkpointer.get_saved_solution(solution),
+        "score": score,
+        "best_solution": checkpointer.solution_encoder(best_solution) if best_solution is not None else None,
+        "iteration": iteration,
+        "improvement_counter": improvement_counter,
+        "tabu_memory": tabu_memory.get_state(),
+        "data": checkpointer.get_saved_data(data)
+    }
+
+class TabuMemory:
+    """
+    Attribute based tabu memory. Applying a move makes its attributes tabu until an expiry iteration:
+    - Every (product, drone) assignment it creates or destroys, for tabu_tenure iterations
+    - Every product it moves, for product_tenure iterations
+    A move is tabu while any of its attributes is, which forbids undoing recent moves.
+    Expiry iterations are kept in flat lists, so checks and insertions don't depend on the tenure.
+    """
+    def __init__(self, product_number, drone_number, tabu_tenure, product_tenure):
+        self.drone_number = drone_number
+        self.tabu_tenure = tabu_tenure
+        self.product_tenure = product_tenure
+        self.assignment_expiry = [0] * (product_number * drone_number)
+        self.product_expiry = [0] * product_number
+        self.recorded_moves = 0
+
+    def get_attributes(self, move_info):
+        """Returns the products moved and the (product, drone) assignments changed by a move, as flat indexes"""
+        if move_info[0] == "swap":
+            _move_type, product_1, drone_index_1, product_2, drone_index_2 = move_info
+            products = (product_1, product_2)
+            assignments = (product_1 * self.drone_number + drone_index_1, product_1 * self.drone_number + drone_index_2,
+                           product_2 * self.drone_number + drone_index_1, product_2 * self.drone_number + drone_index_2)
+        else:
+            _move_type, product, drone_index = move_info
+            products = (product,)
+            assignments = (product * self.drone_number + drone_index,)
+        return products, assignments
+
+    def is_tabu(self, move_info, iteration):
+        products, assignments = self.get_attributes(move_info)
+        return (any(self.product_expiry[product] > iteration for product in products) or
+                any(self.assignment_expiry[assignment] > iteration for assignment in assignments))
+
+    def add(self, move_info, iteration):
+        products, assignments = self.get_attributes(move_info)
+        for product in products:
+            self.product_expiry[product] = iteration + self.product_tenure
+        for assignment in assignments:
+            self.assignment_expiry[assignment] = iteration + self.tabu_tenure
+        self.recorded_moves += 1
+
+    def get_state(self):
+        """Expiry iterations as arrays, restored by set_state"""
+        return {"assignment_expiry": np.array(self.assignment_expiry, dtype=np.int64),
+                "product_expiry": np.array(self.product_expiry, dtype=np.int64),
+                "recorded_moves": self.recorded_moves}
+
+    def set_state(self, state):
+        self.assignment_expiry = state["assignment_expiry"].tolist()
+        self.product_expiry = state["product_expiry"].tolist()
+        self.recorded_moves = state["recorded_moves"]
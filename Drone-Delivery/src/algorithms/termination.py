@@ -0,0 +1,110 @@
+# termination.py
+import time
+
+class Termination:
+    """
+    Decides when the main loop of an algorithm (Hill Climbing, Simulated Annealing, Tabu Search and Genetic Algorithms) ends.
+    A run stops as soon as any of its criteria is met:
+    - max_time: seconds since the run started
+    - max_evaluations: number of solutions scored (every candidate move, child or initial solution counts as one),
+      which does not depend on the speed of the machine
+    - max_stagnation: iterations (generations for Genetic Algorithms) without improving the score
+    - target_score: best score to reach
+    - stop_event: set from another thread to stop the run early
+    Unset criteria (None) never stop the run. Algorithms call count_iteration for every iteration and
+    record_improvement whenever their score improves, should_stop then only compares counters.
+    While pause_event is set, should_stop blocks and the paused time does not count towards max_time.
+    """
+    def __init__(self, max_time, max_evaluations=None, max_stagnation=None, target_score=None, stop_event=None, pause_event=None):
+        self.max_time = max_time
+        self.max_evaluations = max_evaluations if max_evaluations is not None else float("inf")
+        self.max_stagnation = max_stagnation if max_stagnation is not None else float("inf")
+        self.target_score = target_score if target_score is not None else float("inf")
+        self.stop_event = stop_event
+        self.pause_event = pause_event
+
+        self.start_time = 0
+        self.evaluations = 0
+        self.stagnation = 0
+        self.best_score = None
+        self.reason = None
+
+        # Counters of a resumed run (see restore), used by the next start
+        self.restored_state = None
+
+    def start(self, evaluations=1):
+        """
+        Starts the clock and the counters, evaluations are the ones made before the main loop. Returns the start time.
+        Resumed runs continue from their restored counters instead, with the time they had already run.
+        """
+        self.start_time = time.time()
+        self.evaluations = evaluations
+        self.stagnation = 0
+        self.best_score = None
+        self.reason = None
+
+        if self.restored_state is not None:
+            self.start_time -= self.restored_state["elapsed_time"]
+            self.evaluations = self.restored_state["evaluations"]
+            self.stagnation = self.restored_state["stagnation"]
+            self.best_score = self.restored_state["best_score"]
+            self.restored_state = None
+        return self.start_time
+
+    def get_state(self, curr_time):
+        return {"elapsed_time": curr_time - self.start_time, "evaluations": self.evaluations,
+                "stagnation": self.stagnation, "best_score": self.best_score}
+
+    def restore(self, state):
+        """Counters saved by get_state, applied when the run starts"""
+        self.restored_state = state
+
+    def count_iteration(self, evaluations=1):
+        self.evaluations += evaluations
+        self.stagnation += 1
+
+    def record_improvement(self, score):
+        self.stagnation = 0
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+
+    def restart(self):
+        """Stagnation is counted again from zero (see Hill Climbing's restart_on_stagnation)"""
+        self.stagnation = 0
+
+    def is_stagnated(self):
+        return self.stagnation >= self.max_stagnation
+
+    def should_stop(self, curr_time):
+        if self.pause_event is not None and self.pause_event.is_set():
+            curr_time = self.wait_while_paused(curr_time)
+
+        if curr_time - self.start_time >= self.max_time:
+            self.reason = "Time limit"
+        elif self.stop_event is not None and self.stop_event.is_set():
+            self.reason = "Stop requested"
+        elif self.evaluations >= self.max_evaluations:
+            self.reason = "Evaluation budget"
+        elif self.stagnation >= self.max_stagnation:
+            self.reason = "No improvement"
+        elif self.best_score is not None and self.best_score >= self.target_score:
+            self.reason = "Target score"
+        else:
+            return False
+        return True
+
+    def wait_while_paused(self, curr_time, poll_interval=0.05):
+        """Blocks until the run is resumed or stopped, the clock is moved forward by the paused time. Returns the current time"""
+        while self.pause_event.is_set() and not (self.stop_event is not None and self.stop_event.is_set()):
+            time.sleep(poll_interval)
+
+        resume_time = time.time()
+        self.start_time += resume_time - curr_time
+        return resume_time
+
+    def get_progress(self, curr_time):
+        """Fraction of the run's budget already used, by time or by evaluations (whichever is further)"""
+        progress = (curr_time - self.start_time) / self.max_time
+        if self.evaluations / self.max_evaluations > progress:
+            progress = self.evaluations / self.max_evaluations
+        return min(progress, 1.0)
@@ -0,0 +1,315 @@
+# array_simulation.py
+
+# Built-in libraries
+import random
+from functools import partial
+from typing import List, Union
+
+# External libraries
+import numpy as np
+
+# Custom libraries
+import simulation
+from problem_model import ProblemInstance, MoveJournal
+
+"""-----------------------
+- Problem representation -
+-----------------------"""
+def get_solution_functions(problem: ProblemInstance) -> dict:
+    """Functions handed to the algorithms when running with the array representation, bound to the problem"""
+    return {
+        "solution_generator": partial(generate_random_solution, problem),
+        "solution_evaluator": partial(evaluate_solution, problem),
+        "state_generator": partial(ArrayEvaluationState, problem),
+        "move_generator": partial(get_random_move, problem),
+        "move_info_generator": partial(get_random_move_info, problem),
+        "move_builder": partial(simulation.get_move, problem),
+        "crossover_generator": partial(order_based_crossover, problem),
+        "solution_encoder": encode_solution,
+        "solution_decoder": partial(decode_solution, problem)
+    }
+
+class ArraySolution(MoveJournal):
+    """
+    Solution stored as a flat array mapping every product index to the drone delivering it (-1 if unassigned).
+    It also keeps the workload of every drone, so feasibility checks don't need to scan the assignment.
+    Iterating over it yields each drone's product list, just like the list representation (used for reporting).
+    """
+    def __init__(self, problem: ProblemInstance, assignment: np.ndarray, drone_costs: np.ndarray = None):
+        self.problem = problem
+        self.assignment = assignment
+
+        # Compute the drone workloads if they were not provided
+        if drone_costs is None:
+            drone_costs = get_drone_costs(problem, assignment)
+        self.drone_costs = drone_costs
+
+        # Moves applied in place
+        self.journal = []
+
+    def copy(self):
+        return ArraySolution(self.problem, self.assignment.copy(), self.drone_costs.copy())
+
+    def add_product(self, drone_index, product):
+        self.assignment[product.id] = drone_index
+        self.drone_costs[drone_index] += product.delivery_cost
+
+    def remove_product(self, drone_index, product):
+        self.assignment[product.id] = -1
+        self.drone_costs[drone_index] -= product.delivery_cost
+
+    def __len__(self):
+        return len(self.drone_costs)
+
+    def __iter__(self):
+        for drone_index in range(len(self.drone_costs)):
+            yield [self.problem.products[product_index] for product_index in np.flatnonzero(self.assignment == drone_index)]
+
+    def get_unassigned_order(self):
+        # Unassigned products are always found in id order (see get_add_move_info)
+        return None
+
+    def set_unassigned_order(self, product_ids):
+        pass
+
+"""--------------------
+- Solution Generation -
+--------------------"""
+def generate_random_solution(problem: ProblemInstance) -> ArraySolution:
+    # Initialize empty solution
+    assignment = np.full(len(problem.products), -1, dtype=np.int32)
+    drone_costs = [0] * problem.drone_number
+
+    # Randomize product listing
+    product_indexes = list(range(len(problem.products)))
+    random.shuffle(product_indexes)
+
+    # Round-robin assignment of products to drones
+    drone_index = 0
+    costs = problem.product_cost.tolist()
+
+    for product_index in product_indexes:
+        # Add item to drone if it is feasible otherwise skip item
+        if (drone_costs[drone_index] + costs[product_index] <= problem.max_turns):
+            assignment[product_index] = drone_index
+            drone_costs[drone_index] += costs[product_index]
+            drone_index = (drone_index + 1) % problem.drone_number
+
+    return ArraySolution(problem, assignment, np.array(drone_costs, dtype=np.int64))
+
+"""--------------------
+- Evaluation function -
+--------------------"""
+def get_drone_costs(problem: ProblemInstance, assignment: np.ndarray) -> np.ndarray:
+    assigned = assignment >= 0
+    drone_costs = np.bincount(assignment[assigned], weights=problem.product_cost[assigned], minlength=problem.drone_number)
+    return drone_costs.astype(np.int64)
+
+def get_delivered_counts(problem: ProblemInstance, assignment: np.ndarray) -> np.ndarray:
+    return np.bincount(problem.product_order[assignment >= 0], minlength=len(problem.orders))
+
+def evaluate_solution(problem: ProblemInstance, solution: ArraySolution, return_status: bool = False) -> int:
+    # Check turns taken and completed orders
+    turns_taken = int(get_drone_costs(problem, solution.assignment).max(initial=0))
+    order_status = get_delivered_counts(problem, solution.assignment) == problem.order_sizes
+    completed_orders = int(np.count_nonzero(order_status))
+
+    # Calculate solution score
+    solution_value = problem.get_score(completed_orders, turns_taken)
+
+    if return_status:
+        return solution_value, order_status.tolist()
+    return solution_value
+
+def get_orders_status(problem: ProblemInstance, solution: ArraySolution) -> List[bool]:
+    return (get_delivered_counts(problem, solution.assignment) == problem.order_sizes).tolist()
+
+def check_if_feasible(problem: ProblemInstance, solution: ArraySolution) -> bool:
+    # Check drone cost and ensure its smaller than max turns
+    return bool((get_drone_costs(problem, solution.assignment) <= problem.max_turns).all())
+
+class ArrayEvaluationState(simulation.EvaluationState):
+    """Cached evaluation of an array solution, moves are scored exactly like in simulation.EvaluationState"""
+    def __init__(self, problem: ProblemInstance, solution: ArraySolution):
+        self.problem = problem
+
+        # Workload of every drone
+        self.drone_costs: List[int] = solution.drone_costs.tolist()
+        self.turns_taken: int = max(self.drone_costs, default=0)
+
+        # Number of delivered products of every order
+        delivered_counts = get_delivered_counts(problem, solution.assignment)
+        self.delivered_counts: List[int] = delivered_counts.tolist()
+
+        self.completed_orders: int = int(np.count_nonzero(delivered_counts == problem.order_sizes))
+        self.score: int = problem.get_score(self.completed_orders, self.turns_taken)
+
+"""-----------------------
+- Neighboorhood/Mutation -
+-       Functions        -
+-----------------------"""
+def get_add_move_info(problem: ProblemInstance, solution: ArraySolution) -> Union[tuple, int]:
+    """Array version of simulation.get_add_move_info"""
+    # Choose a random drone index
+    drone_index = random.randrange(problem.drone_number)
+
+    # Get all unassigned products
+    unassigned_products = np.flatnonzero(solution.assignment < 0)
+
+    # Check if there are unassigned items
+    if unassigned_products.size == 0:
+        return -1
+
+    # Pick a random unassigned product
+    product = problem.products[unassigned_products[random.randrange(unassigned_products.size)]]
+
+    # Check if product can be added to drone
+    if (solution.drone_costs[drone_index] + product.delivery_cost > problem.max_turns):
+        return -1
+
+    return ("add", product.id, drone_index)
+
+def get_remove_move_info(problem: ProblemInstance, solution: ArraySolution) -> Union[tuple, int]:
+    """Array version of simulation.get_remove_move_info"""
+    # Find drones that have at least one product assigned (every product has a positive cost)
+    non_empty_drones = np.flatnonzero(solution.drone_costs > 0)
+    if non_empty_drones.size == 0:
+        # No items to remove
+        return -1
+
+    # Pick a random drone that is not empty
+    drone_index = int(non_empty_drones[random.randrange(non_empty_drones.size)])
+
+    # Pick a random product from that drone
+    drone_products = np.flatnonzero(solution.assignment == drone_index)
+    product = problem.products[drone_products[random.randrange(drone_products.size)]]
+
+    return ("remove", product.id, drone_index)
+
+def get_swap_move_info(problem: ProblemInstance, solution: ArraySolution) -> Union[tuple, int]:
+    """Array version of simulation.get_swap_move_info"""
+    # Check if there are more than 1 drone
+    if problem.drone_number <= 1:
+        return -1
+
+    # Pick two random drones
+    drone_index_1, drone_index_2 = random.sample(range(problem.drone_number), 2)
+
+    # Check if both drones have products assigned
+    if solution.drone_costs[drone_index_1] == 0 or solution.drone_costs[drone_index_2] == 0:
+        return -1
+
+    # Pick two random products
+    drone_products_1 = np.flatnonzero(solution.assignment == drone_index_1)
+    drone_products_2 = np.flatnonzero(solution.assignment == drone_index_2)
+    product_1 = problem.products[drone_products_1[random.randrange(drone_products_1.size)]]
+    product_2 = problem.products[drone_products_2[random.randrange(drone_products_2.size)]]
+
+    # Check if new products can be added
+    cost_change = product_2.delivery_cost - product_1.delivery_cost
+    if (solution.drone_costs[drone_index_1] + cost_change > problem.max_turns):
+        return -1
+    if (solution.drone_costs[drone_index_2] - cost_change > problem.max_turns):
+        return -1
+
+    return ("swap", product_1.id, drone_index_1, product_2.id, drone_index_2)
+
+def get_random_move(problem: ProblemInstance, solution, stats = None):
+    move_info = get_random_move_info(problem, solution, stats)
+    if move_info == -1:
+        return -1
+    return simulation.get_move(problem, move_info)
+
+def get_random_move_info(problem: ProblemInstance, solution, stats = None):
+    function_list = [("add", get_add_move_info), ("remove", get_remove_move_info), ("swap", get_swap_move_info)]
+    operator, choosen_function = random.choice(function_list)
+
+    move_info = choosen_function(problem, solution)
+    if stats:
+        stats.count_generated(operator, move_info != -1)
+
+    return move_info
+
+"""--------------------
+- Crossover Functions -
+--------------------"""
+def order_based_crossover(problem: ProblemInstance, parent1: ArraySolution, parent2: ArraySolution):
+    """
+    Array version of simulation.order_based_crossover.
+    Both parents' drones are shuffled, child 1 alternately inherits a drone from parent 2 and parent 1 and child 2 inherits the remaining drones.
+    Products inherited twice by the same child are excluded and later given to the least loaded drones of the other child.
+    """
+    drone_number = problem.drone_number
+
+    # Shuffle the drones of both parents
+    parent1_order = np.array(random.sample(range(drone_number), drone_number))
+    parent2_order = np.array(random.sample(range(drone_number), drone_number))
+
+    # Child drone slots filled by each parent's drones
+    half = drone_number // 2
+    slots = np.arange(drone_number)
+    even_slots, odd_slots = slots[0::2], slots[1::2]
+
+    # Child 1 takes the first drones of parent 2 (even slots) and parent 1 (odd slots)
+    child1, excluded_products_1 = make_child(problem, parent1, parent1_order[:odd_slots.size], odd_slots,
+                                                      parent2, parent2_order[:even_slots.size], even_slots)
+
+    # Child 2 takes the remaining ones, parent 1 fills its even slots and parent 2 the odd ones
+    child2, excluded_products_2 = make_child(problem, parent2, parent2_order[drone_number - half:], odd_slots,
+                                                      parent1, parent1_order[half:], even_slots)
+
+    # Apply Excluded products
+    apply_excluded(problem, child1, excluded_products_2)
+    apply_excluded(problem, child2, excluded_products_1)
+
+    return child1, child2
+
+def make_child(problem: ProblemInstance, parent1: ArraySolution, parent1_drones: np.ndarray, parent1_slots: np.ndarray,
+               parent2: ArraySolution, parent2_drones: np.ndarray, parent2_slots: np.ndarray):
+    drone_number = problem.drone_number
+
+    # Map each parent's drones to the child slot they fill (drone_number if not inherited)
+    slot_map_1 = np.full(drone_number + 1, drone_number, dtype=np.int32)
+    slot_map_1[parent1_drones] = parent1_slots
+    slot_map_2 = np.full(drone_number + 1, drone_number, dtype=np.int32)
+    slot_map_2[parent2_drones] = parent2_slots
+
+    # Unassigned products (-1) map to the last entry, which is never inherited
+    product_slots_1 = slot_map_1[parent1.assignment]
+    product_slots_2 = slot_map_2[parent2.assignment]
+
+    # Products keep the first slot that inherits them
+    child_slots = np.minimum(product_slots_1, product_slots_2)
+    assignment = np.where(child_slots < drone_number, child_slots, -1).astype(np.int32)
+
+    # Products inherited twice are excluded from the later slot, ordered by that slot
+    duplicated = np.flatnonzero((product_slots_1 < drone_number) & (product_slots_2 < drone_number))
+    excluded_slots = np.maximum(product_slots_1[duplicated], product_slots_2[duplicated])
+    excluded_products = duplicated[np.argsort(excluded_slots, kind="stable")]
+
+    return ArraySolution(problem, assignment), excluded_products
+
+def apply_excluded(problem: ProblemInstance, child: ArraySolution, excluded_products: np.ndarray):
+    drone_costs = child.drone_costs.tolist()
+
+    for product_index in excluded_products.tolist():
+        # Get drone with least cost
+        drone_cost = min(drone_costs)
+        drone_index = drone_costs.index(drone_cost)
+        # If possible, assign current product to it
+        if (drone_cost + problem.product_cost[product_index] <= problem.max_turns):
+            child.assignment[product_index] = drone_index
+            drone_costs[drone_index] += int(problem.product_cost[product_index])
+
+    child.drone_costs = np.array(drone_costs, dtype=np.int64)
+
+"""-------------------
+- Solution Encoding -
+-------------------"""
+def encode_solution(solution: ArraySolution) -> np.ndarray:
+    """Array version of simulation.encode_solution, the assignment array itself"""
+    return solution.assignment.copy()
+
+def decode_solution(problem: ProblemInstance, encoded_solution: np.ndarray) -> ArraySolution:
+    """Array version of simulation.decode_solution"""
+    return ArraySolution(problem, np.array(encoded_solution, dtype=np.int32))
@@ -0,0 +1,179 @@
+# benchmark.py
+
+# Built-in libraries
+import os
+import re
+import glob
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+from functools import partial
+
+# Custom libraries
+import simulation
+
+ALGORITHMS = ["Hill Climbing", "Simulated Annealing", "Tabu Search", "Genetic Algorithms"]
+
+"""------------
+- Measurement -
+------------"""
+def get_ops_per_second(operation, min_time):
+    """Calls operation repeatedly for at least min_time seconds and returns the calls per second"""
+    operation_count = 0
+    start_time = time.perf_counter()
+    elapsed_time = 0
+    while elapsed_time < min_time:
+        # Calls are timed in batches so the clock is not read after every one
+        for _ in range(10):
+            operation()
+        operation_count += 10
+        elapsed_time = time.perf_counter() - start_time
+    return operation_count / elapsed_time
+
+def get_move_operation(move_info_generator, move_builder, solution):
+    def operation():
+        # Valid moves are applied and undone, so the solution never changes
+        move_info = move_info_generator(solution)
+        if move_info != -1:
+            move = move_builder(move_info)
+            move.apply(solution)
+            move.undo(solution)
+    return operation
+
+def get_iterations_per_second(problem, algorithm, max_time, representation):
+    """
+    Runs an algorithm for max_time seconds and reads its iteration (or generation) count from output.txt.
+    Iterations are divided by the time of the main loop measured by the run (see RunStats), so setup such as
+    building the initial population is not counted.
+    """
+    initial_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as working_directory, open(os.devnull, "w") as devnull:
+        os.chdir(working_directory)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                _data, stats = simulation.run_algorithm(problem, algorithm, max_time=max_time, representation=representation, profile=True)
+            with open("output.txt") as f:
+                output = f.read()
+        finally:
+            os.chdir(initial_directory)
+
+    iterations = int(re.search(r"Total (?:Iterations|Generations):\s+(\d+)", output).group(1))
+    return iterations / stats["loop_time"]
+
+def benchmark_instance(instance, representation, min_time, algorithm_time, algorithms):
+    """Operations per second of the solution functions and iterations per second of every algorithm on one instance"""
+    random.seed(0)
+    problem = simulation.load_problem(instance)
+
+    functions = simulation.get_solution_functions(problem, representation)
+    if representation == "array":
+        import array_simulation
+        move_module = array_simulation
+    else:
+        move_module = simulation
+
+    solution = functions["solution_generator"]()
+    other_solution = functions["solution_generator"]()
+
+    results = {
+        "generate_random_solution": get_ops_per_second(functions["solution_generator"], min_time),
+        "evaluate_solution": get_ops_per_second(lambda: functions["solution_evaluator"](solution), min_time),
+        "add_move": get_ops_per_second(get_move_operation(partial(move_module.get_add_move_info, problem), functions["move_builder"], solution), min_time),
+        "remove_move": get_ops_per_second(get_move_operation(partial(move_module.get_remove_move_info, problem), functions["move_builder"], solution), min_time),
+        "swap_move": get_ops_per_second(get_move_operation(partial(move_module.get_swap_move_info, problem), functions["move_builder"], solution), min_time),
+        "order_based_crossover": get_ops_per_second(lambda: functions["crossover_generator"](solution, other_solution), min_time)
+    }
+
+    for algorithm in algorithms:
+        random.seed(0)
+        results[algorithm] = get_iterations_per_second(problem, algorithm, algorithm_time, representation)
+
+    return results
+
+"""-----------
+- Comparison -
+-----------"""
+def compare_results(results, baseline, threshold):
+    """
+    Returns the (instance, measurement, baseline value, current value, relative change) of every measurement
+    that got slower than the baseline by more than threshold (a fraction of the baseline).
+    """
+    regressions = []
+    for instance, measurements in results.items():
+        for measurement, value in measurements.items():
+            baseline_value = baseline.get(instance, {}).get(measurement)
+            if not baseline_value:
+                continue
+            change = value / baseline_value - 1
+            if change < -threshold:
+                regressions.append((instance, measurement, baseline_value, value, change))
+    return regressions
+
+def print_results(results, baseline):
+    for instance, measurements in results.items():
+        print(f"\n{instance}")
+        print("-" * 72)
+        for measurement, value in measurements.items():
+            line = f"{measurement + ':':<30} {value:>16.1f} /s"
+            baseline_value = baseline.get(instance, {}).get(measurement)
+            if baseline_value:
+                line += f"   ({value / baseline_value - 1:+.1%} vs baseline)"
+            print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the speed of the solution functions and algorithms on every input file.")
+    parser.add_argument("-i", "--instance", nargs="+", help="Input files to benchmark (default: every file in input/)")
+    parser.add_argument("-r", "--representation", default="lists", choices=["lists", "array"], help="Solution representation (default: lists)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds spent measuring every operation (default: 0.5)")
+    parser.add_argument("--algorithm-time", type=float, default=2, help="Seconds every algorithm runs (default: 2)")
+    parser.add_argument("--skip-algorithms", action="store_true", help="Only measure the solution functions")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON file receiving the results (default: benchmark.json)")
+    parser.add_argument("-b", "--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Slowdown, as a fraction of the baseline, reported as a regression (default: 0.1)")
+    arguments = parser.parse_args(argv)
+
+    instances = arguments.instance or sorted(glob.glob("input/*.in"))
+    algorithms = [] if arguments.skip_algorithms else ALGORITHMS
+
+    baseline = {}
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            baseline_file = json.load(f)
+        # Representations have very different speeds, comparing them would only report noise
+        if baseline_file["representation"] != arguments.representation:
+            parser.error(f"baseline {arguments.baseline} was measured with the {baseline_file['representation']} representation")
+        baseline = baseline_file["results"]
+
+    results = {}
+    for instance in instances:
+        print(f"Benchmarking {instance}...")
+        # Instances are stored by name so results from different directories can be compared
+        results[os.path.basename(instance)] = benchmark_instance(os.path.abspath(instance), arguments.representation,
+                                                                 arguments.min_time, arguments.algorithm_time, algorithms)
+
+    print_results(results, baseline)
+
+    with open(arguments.output, "w") as f:
+        json.dump({"representation": arguments.representation, "results": results}, f, indent=2)
+    print(f"\nResults saved to {arguments.output}")
+
+    if not arguments.baseline:
+        return 0
+
+    regressions = compare_results(results, baseline, arguments.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions over {arguments.threshold:.0%}:")
+        for instance, measurement, baseline_value, value, change in regressions:
+            print(f"{instance} | {measurement}: {baseline_value:.1f} -> {value:.1f} /s ({change:+.1%})")
+        return 1
+
+    print(f"\nNo regressions over {arguments.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
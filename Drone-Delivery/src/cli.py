@@ -0,0 +1,228 @@
+# cli.py
+
+# Built-in libraries
+import os
+import ast
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+from functools import lru_cache
+from itertools import product as cartesian_product
+
+# Short names accepted for every algorithm
+ALGORITHM_ALIASES = {
+    "hc": "Hill Climbing",
+    "sa": "Simulated Annealing",
+    "ts": "Tabu Search",
+    "ga": "Genetic Algorithms",
+    "portfolio": "Portfolio"
+}
+
+"""-----------------
+- Argument parsing -
+-----------------"""
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Run the drone delivery optimizer without the interface. "
+                                                 "Every combination of instance, algorithm and seed is run as a separate job.")
+    parser.add_argument("-i", "--instance", nargs="+",
+                        help="Input files (path ending in .in) or problem names such as \"busy_day\"")
+    parser.add_argument("-a", "--algorithm", nargs="+",
+                        help="Algorithms to run, by name or short name (hc, sa, ts, ga, portfolio)")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Algorithm parameter, e.g. temp_adjustment=2 (can be repeated)")
+    parser.add_argument("-s", "--seed", nargs="+", type=int, default=[0], help="Random seeds (default: 0)")
+    parser.add_argument("-t", "--time", type=float, help="Time budget of every job in seconds (default: 10, "
+                                                         "or the checkpoint's own budget when resuming)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of jobs run in parallel (default: 1)")
+    parser.add_argument("-o", "--output", default="results.json", help="JSON file receiving the results (default: results.json)")
+    parser.add_argument("--solution-dir", help="Directory receiving the solution file of every job (see -p solution_format), "
+                                               "and its binary export (.npy)")
+    parser.add_argument("--initial-solution", help="Solution file (in any solution format) of an earlier run "
+                                                   "every job starts from instead of a random solution")
+    parser.add_argument("--profile", action="store_true", help="Add the counters and timers of every run to the results")
+    parser.add_argument("--checkpoint-dir", help="Directory receiving the checkpoint of every job, saved periodically "
+                                                 "(Hill Climbing, Simulated Annealing, Tabu Search and Genetic Algorithms)")
+    parser.add_argument("--resume", metavar="CHECKPOINT", help="Continue the run saved in a checkpoint file instead of running jobs, "
+                                                               "parameters given with -p replace the saved ones")
+    arguments = parser.parse_args(argv)
+
+    if not arguments.resume and (not arguments.instance or not arguments.algorithm):
+        parser.error("the following arguments are required: -i/--instance, -a/--algorithm (unless --resume is used)")
+    return arguments
+
+def parse_params(param_strings):
+    """Turns NAME=VALUE strings into a dictionary, values are Python literals or plain strings"""
+    params = {}
+    for param_string in param_strings:
+        name, separator, value = param_string.partition("=")
+        if not separator:
+            raise ValueError(f"Error: Parameter {param_string} is not in NAME=VALUE form")
+        try:
+            params[name.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            params[name.strip()] = value.strip()
+    return params
+
+def get_instance(instance):
+    # Input files are resolved now since jobs run in their own directory
+    if instance.endswith(".in"):
+        return os.path.abspath(instance)
+    return instance
+
+"""------
+- Jobs -
+------"""
+@lru_cache(maxsize=8)
+def get_problem(instance):
+    """Problems are read-only, so every job of a worker process on the same instance shares it"""
+    # Only imported by the jobs (see run_job)
+    import simulation
+    return simulation.load_problem(instance)
+
+def run_job(instance, algorithm, params, seed, max_time, solution_dir, profile, checkpoint_dir=None):
+    """Runs one algorithm on one instance and returns its results as a dictionary"""
+    # Imported by the jobs only, so starting the CLI doesn't load numpy and the algorithms
+    import simulation
+    from solution_file import load_solution, write_solution, SOLUTION_FORMATS
+
+    random.seed(seed)
+    problem = get_problem(instance)
+
+    job_name = f"{os.path.splitext(os.path.basename(instance))[0]}_{algorithm.lower().replace(' ', '_')}_{seed}"
+    initial_directory = os.getcwd()
+    start_time = time.time()
+
+    if checkpoint_dir and simulation.is_single_process(algorithm, params):
+        params = dict(params, checkpoint_file=os.path.join(checkpoint_dir, f"{job_name}.ckpt"))
+
+    # Every job writes its own output files and its progress messages are not printed
+    with tempfile.TemporaryDirectory() as working_directory, open(os.devnull, "w") as devnull:
+        os.chdir(working_directory)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                data = simulation.run_algorithm(problem, algorithm, max_time=max_time, profile=profile, **params)
+
+            if solution_dir:
+                solution_format = params.get("solution_format", "pretty")
+                solution_file = params.get("solution_file", SOLUTION_FORMATS[solution_format])
+                shutil.copy(solution_file, os.path.join(solution_dir, job_name + os.path.splitext(solution_file)[1]))
+                if solution_format != "binary":
+                    write_solution(problem, load_solution(problem, solution_file), os.path.join(solution_dir, f"{job_name}.npy"), "binary")
+        finally:
+            os.chdir(initial_directory)
+
+    return get_result(instance, algorithm, params, seed, max_time, time.time() - start_time, data, profile)
+
+def get_result(instance, algorithm, params, seed, max_time, elapsed_time, data, profile):
+    """Results of a run as a dictionary, data is what simulation.run_algorithm returned"""
+    if isinstance(data, str):
+        raise ValueError(data)
+
+    stats = None
+    if profile:
+        data, stats = data
+
+    result = {
+        "instance": instance,
+        "algorithm": algorithm,
+        "params": params,
+        "seed": seed,
+        "max_time": max_time,
+        "elapsed_time": elapsed_time,
+        "score": int(data[1][-1]),
+        "improvement_times": [float(improvement_time) for improvement_time in data[0]],
+        "improvement_scores": [int(score) for score in data[1]]
+    }
+    if stats:
+        result["stats"] = stats
+    return result
+
+def resume_run(checkpoint_file, params, max_time, profile):
+    """Continues a checkpointed run in this process (its files are written to the working directory), returns its results"""
+    # Imported here, like in run_job, so only the runs load numpy and the algorithms
+    import simulation
+    from algorithms.checkpoint import load_checkpoint
+
+    checkpoint_file = os.path.abspath(checkpoint_file)
+    run_info = load_checkpoint(checkpoint_file)["run"]
+    problem = get_problem(run_info["problem"])
+
+    if max_time is not None:
+        params = dict(params, max_time=max_time)
+    start_time = time.time()
+    data = simulation.resume_algorithm(problem, checkpoint_file, profile=profile, **params)
+
+    resumed_params = dict(run_info["params"], **params)
+    return get_result(run_info["problem"], run_info["algorithm"], resumed_params, None,
+                      resumed_params.get("max_time"), time.time() - start_time, data, profile)
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    params = parse_params(arguments.param)
+
+    # Resolved now since jobs run in their own directory
+    if arguments.initial_solution:
+        params["initial_solution"] = os.path.abspath(arguments.initial_solution)
+
+    if arguments.resume:
+        result = resume_run(arguments.resume, params, arguments.time, arguments.profile)
+        print(f"{result['instance']} | {result['algorithm']} | resumed: {result['score']}")
+
+        with open(arguments.output, "w") as f:
+            json.dump([result], f, indent=2)
+
+        print(f"Results saved to {arguments.output}")
+        return 0
+
+    max_time = arguments.time if arguments.time is not None else 10
+    algorithms = [ALGORITHM_ALIASES.get(algorithm.lower(), algorithm) for algorithm in arguments.algorithm]
+    instances = [get_instance(instance) for instance in arguments.instance]
+
+    solution_dir = None
+    if arguments.solution_dir:
+        solution_dir = os.path.abspath(arguments.solution_dir)
+        os.makedirs(solution_dir, exist_ok=True)
+
+    checkpoint_dir = None
+    if arguments.checkpoint_dir:
+        checkpoint_dir = os.path.abspath(arguments.checkpoint_dir)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    jobs = list(cartesian_product(instances, algorithms, arguments.seed))
+    print(f"Running {len(jobs)} jobs, {arguments.jobs} at a time")
+
+    # The process pool (and multiprocessing) is only imported once there are jobs to run
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results = []
+    with ProcessPoolExecutor(max_workers=arguments.jobs) as executor:
+        futures = {executor.submit(run_job, instance, algorithm, params, seed, max_time, solution_dir, arguments.profile, checkpoint_dir): (instance, algorithm, seed)
+                   for instance, algorithm, seed in jobs}
+
+        for future in as_completed(futures):
+            instance, algorithm, seed = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"instance": instance, "algorithm": algorithm, "params": params, "seed": seed,
+                          "max_time": max_time, "error": str(e)}
+                print(f"{instance} | {algorithm} | seed {seed}: failed ({e})")
+            else:
+                print(f"{instance} | {algorithm} | seed {seed}: {result['score']}")
+            results.append(result)
+
+    # Results in the order the jobs were listed
+    job_order = {job: index for index, job in enumerate(jobs)}
+    results.sort(key=lambda result: job_order[(result["instance"], result["algorithm"], result["seed"])])
+
+    with open(arguments.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Results saved to {arguments.output}")
+
+    # Non zero exit status if any job failed
+    return int(any("error" in result for result in results))
@@ -1,24 +1,52 @@
 # interface.py
 
 # Built-in libraries
+import os
+import math
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from matplotlib.ticker import ScalarFormatter
 
+# External libraries
+import numpy as np
+
 # Custom libraries
 import simulation
 
+# Highest number of times per second the canvas is redrawn while an algorithm runs
+MAX_FRAME_RATE = 30
+
+# Most orders drawn one by one, views with more visible orders show density tiles instead
+MAX_DRAWN_ORDERS = 2000
+# Approximate side of a density tile, in pixels
+TILE_SIZE = 12
+
+# Written by every run, warm started runs start from it
+SOLUTION_FILE = "solution.txt"
+
+# Directory receiving the checkpoints of runs started with "Save checkpoints", so they can be resumed after the window is closed
+# (see cli.py's --resume)
+CHECKPOINT_DIR = "checkpoints"
+
 class App:
     def __init__(self, root):
         self.root = root
         self.root.title("Drone Delivery Optimization")
 
-        self.last_solution = None
-        self.last_score = None
         self.last_order_status = None
-        self.is_last_initial = False
+
+        # Problem being solved (loaded problems are read-only, so it is reused while the same one is selected)
+        self.problem = None
+
+        # Events posted by the solver thread, handled by poll_events on the interface thread
+        self.events = queue.Queue()
+        self.solver_thread = None
+        self.stop_event = threading.Event()
+        self.pause_event = threading.Event()
 
         # Set a minimum window size
         self.root.minsize(900, 700)
@@ -45,13 +73,21 @@ class App:
         self.algorithm_label.grid(row=0, column=2, padx=5)
 
         self.algorithm_var = tk.StringVar(value="Hill Climbing")
-        self.algorithm_menu = tk.OptionMenu(control_frame, self.algorithm_var, "Hill Climbing", "Simulated Annealing", "Tabu Search", "Genetic Algorithms")
+        self.algorithm_menu = tk.OptionMenu(control_frame, self.algorithm_var, "Hill Climbing", "Simulated Annealing", "Tabu Search", "Genetic Algorithms", "Portfolio")
         self.algorithm_menu.grid(row=0, column=3, padx=5)
 
         # Solve Button
         self.solve_button = tk.Button(control_frame, text="Solve", command=self.solve)
         self.solve_button.grid(row=0, column=4, padx=10)
 
+        # Stop Button (only enabled while an algorithm runs)
+        self.stop_button = tk.Button(control_frame, text="Stop", command=self.stop, state=tk.DISABLED)
+        self.stop_button.grid(row=0, column=5, padx=10)
+
+        # Pause Button (only enabled while an algorithm that can be paused runs)
+        self.pause_button = tk.Button(control_frame, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=0, column=6, padx=10)
+
         self.param_frame = tk.LabelFrame(main_frame, text="Algorithm Parameters")
         self.param_frame.pack(fill=tk.X, padx=10, pady=5)
 
@@ -61,6 +97,12 @@ class App:
         tk.Label(self.iter_frame, text="Maximum duration (in seconds):").pack(side=tk.LEFT, padx=5)
         self.max_duration_var = tk.StringVar(value="10")
         tk.Entry(self.iter_frame, textvariable=self.max_duration_var, width=10).pack(side=tk.LEFT, padx=5)
+        self.warm_start_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.iter_frame, text="Start from the last solution", variable=self.warm_start_var).pack(side=tk.LEFT, padx=15)
+
+        # Checkpoints are only saved when asked for (single process runs only)
+        self.save_checkpoints_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.iter_frame, text="Save checkpoints", variable=self.save_checkpoints_var).pack(side=tk.LEFT, padx=5)
 
         # Hill Climbing parameters (none additional)
         self.hc_frame = tk.Frame(self.param_frame)
@@ -71,18 +113,39 @@ class App:
         tk.Label(self.sa_frame, text="Starting Temperature Adjustment:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
         self.sa_temp_adjustment_var = tk.StringVar(value="Logarithmic")
         tk.OptionMenu(self.sa_frame, self.sa_temp_adjustment_var, "Constant", "Linear", "Logarithmic").grid(row=0, column=1, padx=5, pady=2)
+        tk.Label(self.sa_frame, text="Replicas (Parallel Tempering):").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.sa_replica_number_var = tk.StringVar(value="1")
+        tk.Entry(self.sa_frame, textvariable=self.sa_replica_number_var, width=10).grid(row=1, column=1, padx=5, pady=2)
 
         # Tabu Search parameters
         self.ts_frame = tk.Frame(self.param_frame)
         tk.Label(self.ts_frame, text="Tabu List Size:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
         self.ts_tabu_adjustment_var = tk.StringVar(value="Small")
         tk.OptionMenu(self.ts_frame, self.ts_tabu_adjustment_var, "Small", "Medium", "Large").grid(row=0, column=1, padx=5, pady=2)
+        tk.Label(self.ts_frame, text="Candidate List Size:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.ts_candidate_list_size_var = tk.StringVar(value="5")
+        tk.Entry(self.ts_frame, textvariable=self.ts_candidate_list_size_var, width=10).grid(row=1, column=1, padx=5, pady=2)
 
         # Genetic Algorithm parameters
         self.ga_frame = tk.Frame(self.param_frame)
         tk.Label(self.ga_frame, text="Population Size:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
         self.ga_pop_adjustment_var = tk.StringVar(value="Small")
         tk.OptionMenu(self.ga_frame, self.ga_pop_adjustment_var, "Small", "Medium", "Large").grid(row=0, column=1, padx=5, pady=2)
+        tk.Label(self.ga_frame, text="Islands:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.ga_island_number_var = tk.StringVar(value="1")
+        tk.Entry(self.ga_frame, textvariable=self.ga_island_number_var, width=10).grid(row=1, column=1, padx=5, pady=2)
+        tk.Label(self.ga_frame, text="Migration Interval:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.ga_migration_interval_var = tk.StringVar(value="50")
+        tk.Entry(self.ga_frame, textvariable=self.ga_migration_interval_var, width=10).grid(row=2, column=1, padx=5, pady=2)
+        tk.Label(self.ga_frame, text="Topology:").grid(row=3, column=0, padx=5, pady=2, sticky="w")
+        self.ga_topology_var = tk.StringVar(value="Ring")
+        tk.OptionMenu(self.ga_frame, self.ga_topology_var, "Ring", "Fully Connected", "Random").grid(row=3, column=1, padx=5, pady=2)
+
+        # Portfolio parameters (runs are simulation.DEFAULT_PORTFOLIO)
+        self.portfolio_frame = tk.Frame(self.param_frame)
+        tk.Label(self.portfolio_frame, text="Stop Runs Behind By (%):").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.portfolio_prune_margin_var = tk.StringVar(value="0")
+        tk.Entry(self.portfolio_frame, textvariable=self.portfolio_prune_margin_var, width=10).grid(row=0, column=1, padx=5, pady=2)
 
         # Register callback when algorithm changes to update parameter display
         self.algorithm_var.trace_add("write", self.update_param_display)
@@ -144,8 +207,14 @@ class App:
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var.set("Ready")
         
-        # Zoom factor
+        # Zoom factor and drawn orders (see init_visualization and redraw_viewport)
         self.zoom_factor = 1.0
+        self.order_rows = None
+        self.detail_level = "orders"
+        self.redraw_job = None
+
+        # Resizing the window changes the visible orders
+        self.canvas.bind("<Configure>", self.schedule_viewport_redraw)
 
     def solve(self):
         problem = self.problem_var.get()
@@ -167,105 +236,222 @@ class App:
             self.clear_graph()
 
             # Initialize problem
-            simulation.init_problem_info(problem)
+            if self.problem is None or self.problem.name != problem:
+                self.problem = simulation.load_problem(problem)
             
-            # Reset zoom for new problem
-            self.zoom_factor = 1.0
-            self.status_var.set(f"Grid size: {simulation.num_rows}x{simulation.num_col}")
-
-            # Initialize visualization
+            # Initialize visualization (zoom is reset for the new problem)
             self.init_visualization()
-
-            # Register update callback with simulation module
-            simulation.register_update_callback(self.update_visualization)
-
-            # Call the solve function with validated parameters
-            recorded_data = simulation.run_algorithm(algorithm, **params)
-            
-            self.result_area.insert(tk.END, f"\n\nOptimization complete!")
-
-            # Update the graph with the results
-            self.update_graph(recorded_data, algorithm)
+            self.update_status_bar()
+
+            # Every solve gets its own stop and pause events
+            self.stop_event = threading.Event()
+            self.pause_event = threading.Event()
+
+            # Single process runs can be paused and save checkpoints
+            can_pause = simulation.is_single_process(algorithm, params)
+            if can_pause and self.save_checkpoints_var.get():
+                os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+                checkpoint_name = f"{problem.lower().replace(' ', '_')}_{algorithm.lower().replace(' ', '_')}.ckpt"
+                params["checkpoint_file"] = os.path.join(CHECKPOINT_DIR, checkpoint_name)
+                self.result_area.insert(tk.END, f"Checkpoints are saved to {params['checkpoint_file']}\n\n")
             
         except ValueError as ve:
             self.result_area.insert(tk.END, f"\nParameter Error: {ve}")
             messagebox.showerror("Parameter Error", f"Please enter valid parameters: {ve}")
+            return
         except Exception as e:
             self.result_area.insert(tk.END, f"\nError: {e}")
             messagebox.showerror("Error", f"An error occurred: {e}")
+            return
+
+        # The algorithm runs on its own thread so the interface keeps responding
+        self.solve_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        self.pause_button.config(text="Pause", state=tk.NORMAL if can_pause else tk.DISABLED)
+        self.solver_thread = threading.Thread(target=self.run_solver, args=(self.problem, algorithm, params, self.stop_event, self.pause_event), daemon=True)
+        self.solver_thread.start()
+        self.root.after(int(1000 / MAX_FRAME_RATE), self.poll_events)
+
+    def run_solver(self, problem, algorithm, params, stop_event, pause_event):
+        """Runs on the solver thread, the interface is only updated through the events it posts"""
+        try:
+            recorded_data = simulation.run_algorithm(problem, algorithm, self.post_improvement, stop_event, pause_event, **params)
+        except Exception as e:
+            self.events.put(("error", algorithm, e))
+        else:
+            self.events.put(("done", algorithm, recorded_data))
+
+    def post_improvement(self, solution, score, order_status, is_initial=False):
+        """Update callback, called on the solver thread (the solution keeps changing, so only its order status is posted)"""
+        self.events.put(("improvement", score, order_status, is_initial))
+
+    def stop(self):
+        self.stop_event.set()
+        self.stop_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED)
+        self.result_area.insert(tk.END, "\nStopping...\n")
+        self.result_area.see(tk.END)
+
+    def toggle_pause(self):
+        """Pause or resume the running algorithm, paused time does not count towards its duration"""
+        if self.pause_event.is_set():
+            self.pause_event.clear()
+            self.pause_button.config(text="Pause")
+            self.result_area.insert(tk.END, "\nResumed\n")
+        else:
+            self.pause_event.set()
+            self.pause_button.config(text="Resume")
+            self.result_area.insert(tk.END, "\nPaused\n")
+        self.result_area.see(tk.END)
+
+    def poll_events(self):
+        """Handle the events posted by the solver thread, only the latest improvement is drawn"""
+        score_lines = []
+        latest_status = None
+        final_event = None
+
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event[0] == "improvement":
+                _event_type, score, order_status, is_initial = event
+                latest_status = order_status
+                if is_initial:
+                    # Special formatting for initial solution
+                    score_lines.append(f"INITIAL SOLUTION\nInitial score: {score}\n-----------------------------\n\n")
+                else:
+                    # Normal formatting for improvement solutions
+                    score_lines.append(f"Improved solution: {score}\n")
+            else:
+                final_event = event
+
+        if score_lines:
+            self.result_area.insert(tk.END, "".join(score_lines))
+            # Auto-scroll to show the latest score
+            self.result_area.see(tk.END)
+
+        if latest_status is not None:
+            self.update_visualization(latest_status)
+
+        if final_event is None:
+            self.root.after(int(1000 / MAX_FRAME_RATE), self.poll_events)
+        else:
+            self.finish_solve(final_event)
+
+    def finish_solve(self, event):
+        """Show the results of the finished solver thread"""
+        event_type, algorithm, result = event
+        self.solver_thread = None
+        self.solve_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.pause_button.config(text="Pause", state=tk.DISABLED)
+
+        if event_type == "error":
+            if isinstance(result, ValueError):
+                self.result_area.insert(tk.END, f"\nParameter Error: {result}")
+                messagebox.showerror("Parameter Error", f"Please enter valid parameters: {result}")
+            else:
+                self.result_area.insert(tk.END, f"\nError: {result}")
+                messagebox.showerror("Error", f"An error occurred: {result}")
+            return
+
+        if self.stop_event.is_set():
+            self.result_area.insert(tk.END, f"\n\nOptimization stopped!")
+        else:
+            self.result_area.insert(tk.END, f"\n\nOptimization complete!")
+        self.result_area.see(tk.END)
+
+        # Update the graph with the results
+        self.update_graph(result, algorithm)
     
     def zoom_in(self):
-        self.zoom_factor *= 1.2
-        self.update_visualization_with_zoom()
+        self.set_zoom(self.zoom_factor * 1.2)
         
     def zoom_out(self):
-        self.zoom_factor /= 1.2
-        self.update_visualization_with_zoom()
+        self.set_zoom(self.zoom_factor / 1.2)
         
     def reset_zoom(self):
-        self.zoom_factor = 1.0
-        self.update_visualization_with_zoom()
+        self.set_zoom(1.0)
     
-    def update_visualization_with_zoom(self):
-        """Redraw visualization with new zoom level using last known state"""
-        # Only redraw if we have a solution
-        if self.last_solution is not None:
-            self.update_visualization(
-                self.last_solution, 
-                self.last_score, 
-                self.last_order_status, 
-                self.is_last_initial,
-                update_text=False  # Don't update text area when just zooming
+    def set_zoom(self, zoom_factor):
+        """Zoom by scaling the grid and warehouses instead of drawing them again, the visible orders are redrawn"""
+        # Nothing to zoom before a problem is drawn
+        if self.order_rows is None:
+            return
+
+        scale = zoom_factor / self.zoom_factor
+        self.zoom_factor = zoom_factor
+        self.cell_size = self.base_cell_size * zoom_factor
+
+        self.canvas.delete("detail")
+        self.canvas.scale("all", 0, 0, scale, scale)
+        self.update_scroll_region()
+
+        # Only show labels if cells are large enough
+        self.canvas.itemconfigure("label", state=tk.NORMAL if self.cell_size >= 15 else tk.HIDDEN)
+        self.redraw_viewport()
+
+    def update_scroll_region(self):
+        canvas_width = self.canvas.winfo_width() or 800
+        canvas_height = self.canvas.winfo_height() or 600
+
+        # Calculate total grid size with current zoom (the margin is scaled along with the grid)
+        total_width = (self.problem.num_col * self.base_cell_size + 2 * self.margin) * self.zoom_factor
+        total_height = (self.problem.num_rows * self.base_cell_size + 2 * self.margin) * self.zoom_factor
+        
+        # Configure canvas scrollregion to accommodate zoomed content
+        self.canvas.config(scrollregion=(0, 0, total_width, total_height))
+        
+        # Create the scrollbars the first time they are needed, scrolling changes the visible orders
+        if not hasattr(self, 'h_scrollbar'):
+            self.v_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.scroll_y)
+            self.h_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.HORIZONTAL, command=self.scroll_x)
+            self.canvas.config(
+                xscrollcommand=self.h_scrollbar.set,
+                yscrollcommand=self.v_scrollbar.set
             )
-        else:
-            # Just redraw grid if no solution yet
-            self.init_visualization()
+
+        self.h_scrollbar.pack_forget()
+        self.v_scrollbar.pack_forget()
+        
+        # Show scrollbars if needed
+        if total_width > canvas_width or total_height > canvas_height:
+            # Vertical scrollbar first (right side), then horizontal scrollbar (bottom)
+            self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def scroll_x(self, *args):
+        self.canvas.xview(*args)
+        self.schedule_viewport_redraw()
+
+    def scroll_y(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_viewport_redraw()
 
     def init_visualization(self):
-        """Initialize the visualization canvas"""
+        """
+        Draw the grid and warehouses of the loaded problem, the orders are drawn by redraw_viewport.
+        Items are kept between frames: update_visualization only recolors orders and set_zoom scales the grid.
+        """
         self.canvas.delete("all")  # Clear canvas
+        self.zoom_factor = 1.0
         
         # Calculate cell size based on grid dimensions
         canvas_width = self.canvas.winfo_width() or 800
         canvas_height = self.canvas.winfo_height() or 600
 
-        grid_width = simulation.num_col
-        grid_height = simulation.num_rows
+        grid_width = self.problem.num_col
+        grid_height = self.problem.num_rows
         
-        base_cell_size = min(
+        self.base_cell_size = min(
             (canvas_width - 2 * self.margin) / grid_width,
             (canvas_height - 2 * self.margin) / grid_height
         )
-        self.cell_size = base_cell_size * self.zoom_factor
-        
-        # Calculate total grid size with current zoom
-        total_width = grid_width * self.cell_size + 2 * self.margin
-        total_height = grid_height * self.cell_size + 2 * self.margin
-        
-        # Configure canvas scrollregion to accommodate zoomed content
-        self.canvas.config(scrollregion=(0, 0, total_width, total_height))
-        
-        # Remove old scrollbars if they exist
-        if hasattr(self, 'h_scrollbar'):
-            self.h_scrollbar.pack_forget()
-            self.v_scrollbar.pack_forget()
-        
-        # Add scrollbars if needed
-        if total_width > canvas_width or total_height > canvas_height:
-            # Create vertical scrollbar first (right side)
-            self.v_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL)
-            self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            self.v_scrollbar.config(command=self.canvas.yview)
-            
-            # Then create horizontal scrollbar (bottom)
-            self.h_scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.HORIZONTAL)
-            self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-            self.h_scrollbar.config(command=self.canvas.xview)
-            
-            self.canvas.config(
-                xscrollcommand=self.h_scrollbar.set,
-                yscrollcommand=self.v_scrollbar.set
-            )
+        self.cell_size = self.base_cell_size
+        self.update_scroll_region()
         
         # Draw grid
         for i in range(grid_width + 1):
@@ -274,7 +460,8 @@ class App:
                 x, self.margin, 
                 x, self.margin + grid_height * self.cell_size, 
                 fill="lightgray" if i % 10 != 0 else "gray", 
-                width=1 if i % 10 != 0 else 2
+                width=1 if i % 10 != 0 else 2,
+                tags="grid"
             )
         
         for i in range(grid_height + 1):
@@ -283,81 +470,166 @@ class App:
                 self.margin, y,
                 self.margin + grid_width * self.cell_size, y,
                 fill="lightgray" if i % 10 != 0 else "gray", 
-                width=1 if i % 10 != 0 else 2
+                width=1 if i % 10 != 0 else 2,
+                tags="grid"
             )
-    
-    def update_visualization(self, solution, score=None, order_status=None, is_initial=False, update_text=True):
-        """Update the visualization with current solution state"""
-        # Save state for future redraws (e.g., when zooming)
-        self.last_solution = solution
-        self.last_score = score
-        self.last_order_status = order_status
-        self.is_last_initial = is_initial
 
-        self.canvas.delete("all")  # Clear canvas
-        self.init_visualization()  # Redraw grid
-        
-        # If order_status was provided, use it, otherwise calculate it
-        if order_status is None:
-            order_status = simulation.get_orders_status(solution)
-                
-        # If score was provided and update_text is True, update the score display
-        if score is not None and update_text:
-            if is_initial:
-                # Special formatting for initial solution
-                self.result_area.insert(tk.END, f"INITIAL SOLUTION\n")
-                self.result_area.insert(tk.END, f"Initial score: {score}\n")
-                self.result_area.insert(tk.END, f"-----------------------------\n\n")
-            else:
-                # Normal formatting for improvement solutions
-                self.result_area.insert(tk.END, f"Improved solution: {score}\n")
-            
-            # Auto-scroll to show the latest score
-            self.result_area.see(tk.END)
-        
-        # Draw warehouse
-        w_x = self.margin + simulation.warehouse_col * self.cell_size + self.cell_size/2
-        w_y = self.margin + simulation.warehouse_row * self.cell_size + self.cell_size/2
-        
+        # Draw warehouses
         warehouse_size = max(self.cell_size * 0.8, 8)  # Don't let it get too small
 
-        self.canvas.create_rectangle(
-            w_x - warehouse_size/2, w_y - warehouse_size/2,
-            w_x + warehouse_size/2, w_y + warehouse_size/2,
-            fill="blue", outline="black", tags="warehouse"
-        )
-        
-        # Only add text if cell is large enough
-        if self.cell_size >= 15:
-            self.canvas.create_text(w_x, w_y, text="W", fill="white")
-
-        # Draw orders based on provided completion status
-        for i, order in enumerate(simulation.orders):
-            o_x = self.margin + order.column * self.cell_size + self.cell_size/2
-            o_y = self.margin + order.row * self.cell_size + self.cell_size/2
-            
-            # Use the provided status
-            color = "green" if order_status[i] else "red"
-            
-            order_size = max(self.cell_size * 0.7, 6)  # Don't let it get too small
+        for warehouse_row, warehouse_col in self.problem.warehouse_positions.tolist():
+            w_x = self.margin + warehouse_col * self.cell_size + self.cell_size/2
+            w_y = self.margin + warehouse_row * self.cell_size + self.cell_size/2
+
+            self.canvas.create_rectangle(
+                w_x - warehouse_size/2, w_y - warehouse_size/2,
+                w_x + warehouse_size/2, w_y + warehouse_size/2,
+                fill="blue", outline="black", tags="warehouse"
+            )
+            # Labels are created hidden when cells are too small, set_zoom shows them
+            self.canvas.create_text(w_x, w_y, text="W", fill="white", tags=("warehouse", "label"),
+                                    state=tk.NORMAL if self.cell_size >= 15 else tk.HIDDEN)
+
+        # Order positions, used to find the visible orders
+        self.order_rows = np.array([order.row for order in self.problem.orders], dtype=np.int64)
+        self.order_cols = np.array([order.column for order in self.problem.orders], dtype=np.int64)
+
+        # Completion status currently shown, none of the orders is completed until a solution arrives
+        self.drawn_order_status = np.zeros(len(self.problem.orders), dtype=bool)
+        self.last_order_status = None
 
-            self.canvas.create_oval(
+        self.viewport = None
+        self.redraw_viewport()
+
+    def schedule_viewport_redraw(self, event=None):
+        """Redraw the visible orders once, after every pending scroll or resize event"""
+        if self.redraw_job is None:
+            self.redraw_job = self.root.after_idle(self.redraw_viewport)
+
+    def get_viewport(self):
+        """Visible part of the grid as (first column, first row, last column, last row), last ones excluded"""
+        offset = self.margin * self.zoom_factor
+        left = self.canvas.canvasx(0) - offset
+        top = self.canvas.canvasy(0) - offset
+        right = self.canvas.canvasx(self.canvas.winfo_width()) - offset
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) - offset
+
+        return (max(int(left // self.cell_size), 0), max(int(top // self.cell_size), 0),
+                min(int(right // self.cell_size) + 1, self.problem.num_col), min(int(bottom // self.cell_size) + 1, self.problem.num_rows))
+
+    def redraw_viewport(self):
+        """
+        Draw the orders inside the visible part of the grid, only when it changed since the last call.
+        Up to MAX_DRAWN_ORDERS orders are drawn one by one, more than that are aggregated into tiles.
+        """
+        self.redraw_job = None
+        if self.order_rows is None:
+            return
+
+        viewport = self.get_viewport() + (self.zoom_factor,)
+        if viewport == self.viewport:
+            return
+        self.viewport = viewport
+        first_col, first_row, last_col, last_row, _zoom_factor = viewport
+
+        self.canvas.delete("detail")
+        self.visible_orders = np.flatnonzero((self.order_cols >= first_col) & (self.order_cols < last_col) &
+                                             (self.order_rows >= first_row) & (self.order_rows < last_row))
+
+        if len(self.visible_orders) <= MAX_DRAWN_ORDERS:
+            self.draw_orders()
+        else:
+            self.draw_tiles(first_col, first_row, last_col, last_row)
+
+        # Keep the warehouses above the orders
+        self.canvas.tag_raise("warehouse")
+        self.update_status_bar()
+
+    def draw_orders(self):
+        self.detail_level = "orders"
+        self.order_items = {}
+
+        order_size = max(self.cell_size * 0.7, 6)  # Don't let it get too small
+        offset = self.margin * self.zoom_factor + self.cell_size/2
+
+        for i in self.visible_orders.tolist():
+            o_x = offset + self.order_cols[i] * self.cell_size
+            o_y = offset + self.order_rows[i] * self.cell_size
+
+            self.order_items[i] = self.canvas.create_oval(
                 o_x - order_size/2, o_y - order_size/2,
                 o_x + order_size/2, o_y + order_size/2,
-                fill=color, outline="black", tags=f"order_{i}"
+                fill="green" if self.drawn_order_status[i] else "red", outline="black", tags=("detail", f"order_{i}")
             )
 
             # Only add text if cell is large enough
             if self.cell_size >= 15:
-                self.canvas.create_text(o_x, o_y, text=f"{i}", fill="white")
-        
-        # Update status bar
-        completed = sum(1 for status in order_status if status)
-        total = len(order_status)
-        self.status_var.set(f"Grid: {simulation.num_rows}x{simulation.num_col} | Orders completed: {completed}/{total} | Zoom: {self.zoom_factor:.1f}x")
-        
-        # Force UI update
-        self.root.update()
+                self.canvas.create_text(o_x, o_y, text=f"{i}", fill="white", tags=("detail", "label"))
+
+    def draw_tiles(self, first_col, first_row, last_col, last_row):
+        """Square tiles of about TILE_SIZE pixels, colored by the completion ratio and the density of their orders"""
+        self.detail_level = "tiles"
+        self.tile_items = {}
+
+        tile_cells = max(math.ceil(TILE_SIZE / self.cell_size), 1)
+        tile_columns = max(math.ceil((last_col - first_col) / tile_cells), 1)
+
+        # Tile of every visible order and number of orders of every tile
+        tile_col = (self.order_cols[self.visible_orders] - first_col) // tile_cells
+        tile_row = (self.order_rows[self.visible_orders] - first_row) // tile_cells
+        self.tile_index = tile_row * tile_columns + tile_col
+        self.tile_counts = np.bincount(self.tile_index)
+        self.tile_completed_counts = self.get_tile_completed_counts()
+        max_count = self.tile_counts.max()
+
+        offset = self.margin * self.zoom_factor
+        tile_length = tile_cells * self.cell_size
+        for tile in np.flatnonzero(self.tile_counts).tolist():
+            t_x = offset + (first_col + tile % tile_columns * tile_cells) * self.cell_size
+            t_y = offset + (first_row + tile // tile_columns * tile_cells) * self.cell_size
+            self.tile_items[tile] = self.canvas.create_rectangle(
+                t_x, t_y, t_x + tile_length, t_y + tile_length, outline="", tags="detail",
+                fill=get_tile_color(self.tile_counts[tile], self.tile_completed_counts[tile], max_count)
+            )
+
+    def get_tile_completed_counts(self):
+        return np.bincount(self.tile_index, weights=self.drawn_order_status[self.visible_orders], minlength=len(self.tile_counts))
+
+    def recolor_tiles(self):
+        """Recolor the tiles whose number of completed orders changed"""
+        completed_counts = self.get_tile_completed_counts()
+        max_count = self.tile_counts.max()
+
+        for tile in np.flatnonzero(completed_counts != self.tile_completed_counts).tolist():
+            self.canvas.itemconfigure(self.tile_items[tile],
+                                      fill=get_tile_color(self.tile_counts[tile], completed_counts[tile], max_count))
+        self.tile_completed_counts = completed_counts
+    
+    def update_visualization(self, order_status):
+        """Recolor the visible orders (or tiles) whose completion status changed since the last frame"""
+        order_status = np.asarray(order_status, dtype=bool)
+
+        if self.detail_level == "orders":
+            visible_status = order_status[self.visible_orders]
+            changed_orders = self.visible_orders[visible_status != self.drawn_order_status[self.visible_orders]]
+            for i in changed_orders.tolist():
+                self.canvas.itemconfigure(self.order_items[i], fill="green" if order_status[i] else "red")
+            self.drawn_order_status = order_status
+        else:
+            self.drawn_order_status = order_status
+            self.recolor_tiles()
+
+        self.last_order_status = order_status
+        self.update_status_bar()
+
+    def update_status_bar(self):
+        status = f"Grid: {self.problem.num_rows}x{self.problem.num_col}"
+        if self.last_order_status is not None:
+            status += f" | Orders completed: {int(self.last_order_status.sum())}/{len(self.last_order_status)}"
+        status += f" | Zoom: {self.zoom_factor:.1f}x"
+        if self.detail_level == "tiles":
+            status += " | Showing order density (zoom in for single orders)"
+        self.status_var.set(status)
 
     def validate_and_get_params(self):
         """Validate parameters and return them as a dictionary"""
@@ -366,20 +638,42 @@ class App:
             params = {"max_time": int(self.max_duration_var.get())}
             if params["max_time"] <= 0:
                 raise ValueError("Max duration must be greater than 0")
+            if self.warm_start_var.get():
+                params["initial_solution"] = SOLUTION_FILE
             
             # Algorithm-specific parameters
             algorithm = self.algorithm_var.get()
             if algorithm == "Simulated Annealing":
                 adjustment_type = self.sa_temp_adjustment_var.get()
                 params["temp_adjustment"] = {"Constant": 0, "Linear": 1, "Logarithmic": 2}[adjustment_type]
+                params["replica_number"] = int(self.sa_replica_number_var.get())
+                if params["replica_number"] <= 0:
+                    raise ValueError("Number of replicas must be greater than 0")
                 
             elif algorithm == "Tabu Search":
                     adjustment_type = self.ts_tabu_adjustment_var.get()
                     params["tabu_adjustment"] = {"Small": 0, "Medium": 1, "Large": 2}[adjustment_type]
+                    params["candidate_list_size"] = int(self.ts_candidate_list_size_var.get())
+                    if params["candidate_list_size"] <= 0:
+                        raise ValueError("Candidate list size must be greater than 0")
 
             elif algorithm == "Genetic Algorithms":
                     adjustment_type = self.ga_pop_adjustment_var.get()
                     params["pop_adjustment"] = {"Small": 0, "Medium": 1, "Large": 2}[adjustment_type]
+                    params["island_number"] = int(self.ga_island_number_var.get())
+                    if params["island_number"] <= 0:
+                        raise ValueError("Number of islands must be greater than 0")
+                    params["migration_interval"] = int(self.ga_migration_interval_var.get())
+                    if params["migration_interval"] <= 0:
+                        raise ValueError("Migration interval must be greater than 0")
+                    params["topology"] = self.ga_topology_var.get()
+
+            elif algorithm == "Portfolio":
+                    prune_margin = float(self.portfolio_prune_margin_var.get())
+                    if prune_margin < 0:
+                        raise ValueError("Pruning margin must not be negative")
+                    # A margin of 0 keeps every run until the end
+                    params["prune_margin"] = prune_margin / 100 if prune_margin > 0 else None
                 
             return params
         
@@ -395,6 +689,7 @@ class App:
         self.sa_frame.pack_forget()
         self.ts_frame.pack_forget()
         self.ga_frame.pack_forget()
+        self.portfolio_frame.pack_forget()
         
         # Show the appropriate parameter frame
         if algorithm == "Hill Climbing":
@@ -405,6 +700,8 @@ class App:
             self.ts_frame.pack(fill=tk.X, padx=5, pady=5)
         elif algorithm == "Genetic Algorithms":
             self.ga_frame.pack(fill=tk.X, padx=5, pady=5)
+        elif algorithm == "Portfolio":
+            self.portfolio_frame.pack(fill=tk.X, padx=5, pady=5)
     
     def clear_graph(self):
         """Clear the graph."""
@@ -422,7 +719,7 @@ class App:
             self.ax2.remove()
             self.ax2 = None
 
-        if algorithm == "Hill Climbing":
+        if algorithm == "Hill Climbing" or algorithm == "Portfolio":
             # Retrive data
             x_data = data[0]
             y_data = data[1]
@@ -511,4 +808,13 @@ class App:
 
         # Add legend and redraw the graph
         self.ax.legend()
-        self.canvas_graph.draw()
\ No newline at end of file
+        self.canvas_graph.draw()
+
+def get_tile_color(order_count, completed_count, max_order_count):
+    """Red to green by the completion ratio of a tile, faded towards white the fewer orders it has"""
+    completion_ratio = completed_count / order_count
+    density = 0.25 + 0.75 * order_count / max_order_count
+
+    red, green, blue = 220 * (1 - completion_ratio), 180 * completion_ratio, 0
+    red, green, blue = (int(255 - (255 - channel) * density) for channel in (red, green, blue))
+    return f"#{red:02x}{green:02x}{blue:02x}"
@@ -1,8 +1,16 @@
 # main.py
-from interface import App
-import tkinter as tk
+import sys
 
 def main():
+    # Any argument runs the headless command line interface instead
+    if len(sys.argv) > 1:
+        import cli
+        sys.exit(cli.main(sys.argv[1:]))
+
+    # Interface libraries are only loaded when the interface is used
+    from interface import App
+    import tkinter as tk
+
     # Start Interface
     root = tk.Tk()
     
@@ -11,4 +19,4 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,50 +1,226 @@
 # parsing.py
+import gc
+import os
+
+import numpy as np
+
 from problem_model import Order, Product
 
+# Increased whenever the arrays stored in the cache change, older caches are then parsed again
+CACHE_VERSION = 2
+
+# Arrays of parse_instance, in the order they are stored in the cache
+CACHE_ARRAYS = ["header", "product_weights", "warehouse_positions", "warehouse_stock", "order_positions", "order_sizes",
+                "order_product_types", "product_warehouses"]
+
 def parse_input_file(input_file):
-    
-    with open(input_file, 'r') as file:
-        # General Info
-        values = list(map(int, file.readline().split()))
-        num_row = values[0]
-        num_col = values[1]
-        drone_number = values[2]
-        max_turns = values[3]
-        
-        file.readline()  # Ignore number of product types
-        file.readline()  # Ignore product weights
-        
-        # Read number of warehouses but ignore
-        line = int(file.readline().strip())
-        # Read first warehouse coordinates
-        warehouse_row, warehouse_col = list(map(int, file.readline().strip().split())) 
-        #ignore warehouse info if not the first one
-        for _ in range(line * 2 - 1):
-            file.readline()
-        
-        # Orders info
-        orders = parse_orders(file, warehouse_row, warehouse_col)
-    
-    return num_row, num_col, max_turns, warehouse_row, warehouse_col, drone_number, orders
-
-def parse_orders(file, warehouse_row, warehouse_col):
+    instance = load_instance(input_file)
+
+    num_row, num_col, drone_number, max_turns, _max_payload = instance["header"].tolist()
+
+    # Fly distance between every warehouse and every order
+    warehouse_positions = instance["warehouse_positions"]
+    warehouse_distances = get_distance_matrix(warehouse_positions, instance["order_positions"])
+
+    # Orders info
+    orders = build_orders(instance, warehouse_distances)
+
+    return num_row, num_col, max_turns, warehouse_positions, warehouse_distances, drone_number, orders
+
+def build_orders(instance, warehouse_distances):
+    order_positions = instance["order_positions"]
+    order_sizes = instance["order_sizes"]
+
+    # Every product is loaded from its assigned warehouse (see assign_warehouses)
+    product_orders = get_product_orders(order_sizes)
+    product_warehouses = instance["product_warehouses"]
+    product_costs = get_delivery_costs(warehouse_distances, product_warehouses, product_orders).tolist()
+    product_warehouses = product_warehouses.tolist()
+
     orders = []
-    num_orders = int(file.readline().strip())
     product_id_counter = 0
 
+    # Orders and products never form reference cycles, so garbage collections while creating them
+    # (triggered by the number of new objects) are wasted time
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i, (row, column, num_products) in enumerate(zip(order_positions[:, 0].tolist(), order_positions[:, 1].tolist(),
+                                                             order_sizes.tolist())):
+            product_list = [Product(product_id, i, product_warehouses[product_id], product_costs[product_id])
+                            for product_id in range(product_id_counter, product_id_counter + num_products)]
+
+            # Save order info (the types of its items are discarded)
+            orders.append(Order(i, row, column, product_list))
+            product_id_counter += num_products
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return orders
+
+def get_product_orders(order_sizes):
+    """Order of every product (product ids are sequential across orders)"""
+    return np.repeat(np.arange(len(order_sizes)), order_sizes)
+
+def get_distance_matrix(warehouse_positions, order_positions):
+    """Fly distance (rounded up) from every warehouse (rows) to every order (columns)"""
+    offsets = warehouse_positions[:, np.newaxis, :] - order_positions[np.newaxis, :, :]
+    return np.ceil(np.sqrt((offsets ** 2).sum(axis=2))).astype(np.int64)
+
+def get_delivery_costs(warehouse_distances, product_warehouses, product_orders):
+    """
+    Delivery cost of every product: loading it at its warehouse, flying to its order,
+    delivering it and flying back to the warehouse.
+    """
+    fly_distances = warehouse_distances[product_warehouses, product_orders]
+    return 1 + fly_distances + 1 + fly_distances
+
+def assign_warehouses(instance):
+    """
+    Warehouse every product is loaded from: the nearest one to its order that still has the product's item type
+    in stock, taking products in id order. If no warehouse has stock left, the nearest one is used.
+    """
+    order_sizes = instance["order_sizes"]
+    warehouse_distances = get_distance_matrix(instance["warehouse_positions"], instance["order_positions"])
+    if len(warehouse_distances) == 1:
+        return np.zeros(order_sizes.sum(), dtype=np.int64)
+
+    # Warehouses from nearest to farthest for every order
+    warehouse_rankings = np.argsort(warehouse_distances, axis=0, kind="stable").T.tolist()
+    stock = instance["warehouse_stock"].tolist()
+
+    product_warehouses = []
+    for order_id, product_type in zip(get_product_orders(order_sizes).tolist(), instance["order_product_types"].tolist()):
+        ranking = warehouse_rankings[order_id]
+        warehouse_id = next((warehouse_id for warehouse_id in ranking if stock[warehouse_id][product_type] > 0), ranking[0])
+        if stock[warehouse_id][product_type] > 0:
+            stock[warehouse_id][product_type] -= 1
+        product_warehouses.append(warehouse_id)
+
+    return np.array(product_warehouses, dtype=np.int64)
+
+"""-------------
+- Bulk parsing -
+-------------"""
+def parse_instance(input_file):
+    """
+    Reads every number of the input file at once and splits them into arrays:
+    header (rows, columns, drones, turns, max payload), product_weights, warehouse_positions, warehouse_stock,
+    order_positions, order_sizes and order_product_types (the item types of every order, one after the other).
+    product_warehouses is then derived from them (see assign_warehouses).
+    """
+    with open(input_file, 'rb') as file:
+        values = np.array(file.read().split(), dtype=np.int64)
+
+    header = values[:5]
+    num_product_types = int(values[5])
+    product_weights = values[6:6 + num_product_types]
+    position = 6 + num_product_types
+
+    # Warehouses: position followed by the stock of every product type
+    num_warehouses = int(values[position])
+    position += 1
+    warehouses = values[position:position + num_warehouses * (2 + num_product_types)].reshape(num_warehouses, 2 + num_product_types)
+    position += warehouses.size
+
+    # Orders: position, number of items and the type of every item
+    num_orders = int(values[position])
+    position += 1
+
+    # Orders have a variable length, so only their start is found one by one
+    order_starts = np.empty(num_orders, dtype=np.int64)
+    order_sizes = np.empty(num_orders, dtype=np.int64)
+    remaining_values = values[position:].tolist()
+    offset = 0
     for i in range(num_orders):
-        # Parse general info about order
-        row, column = map(int, file.readline().strip().split())
-        num_products = int(file.readline().strip())
-        product_list = [Product(product_id_counter + j, i) for j in range(num_products)]
-
-        # Parse info regarding order's items (Discarded)
-        product_types = list(map(int, file.readline().strip().split()))
-
-        # Save order info
-        order = Order(i, row, column, product_list)
-        order.calculate_delivery_cost(warehouse_row, warehouse_col)
-        orders.append(order)
-        product_id_counter += num_products
-    
-    return orders
\ No newline at end of file
+        order_starts[i] = offset
+        order_sizes[i] = remaining_values[offset + 2]
+        offset += 3 + remaining_values[offset + 2]
+
+    order_starts += position
+    order_positions = np.stack([values[order_starts], values[order_starts + 1]], axis=1)
+
+    # Index of every item type: the first type of its order plus its position in the order
+    first_item_offsets = np.cumsum(order_sizes) - order_sizes
+    item_indices = np.arange(order_sizes.sum()) + np.repeat(order_starts + 3 - first_item_offsets, order_sizes)
+
+    instance = {
+        "header": header,
+        "product_weights": product_weights,
+        "warehouse_positions": warehouses[:, :2],
+        "warehouse_stock": warehouses[:, 2:],
+        "order_positions": order_positions,
+        "order_sizes": order_sizes,
+        "order_product_types": values[item_indices]
+    }
+    instance["product_warehouses"] = assign_warehouses(instance)
+    return instance
+
+"""-----------------
+- Compiled caching -
+-----------------"""
+def get_cache_file(input_file):
+    return input_file + ".npy"
+
+def load_instance(input_file):
+    """
+    Arrays of the input file (see parse_instance), read from its compiled cache when the file did not change since
+    the cache was written (same size and modification time), otherwise parsed and cached again.
+    """
+    source_stat = os.stat(input_file)
+    source_key = np.array([CACHE_VERSION, source_stat.st_size, source_stat.st_mtime_ns], dtype=np.int64)
+    cache_file = get_cache_file(input_file)
+
+    instance = read_cache(cache_file, source_key)
+    if instance is None:
+        instance = parse_instance(input_file)
+        save_cache(cache_file, instance, source_key)
+    return instance
+
+def read_cache(cache_file, source_key):
+    """
+    Arrays stored in the cache, as read-only views of the memory mapped file, or None when the cache is missing,
+    outdated or damaged.
+    The cache is a single int64 .npy array: the source key, then for every array of CACHE_ARRAYS its number of
+    dimensions, its shape and its values.
+    """
+    try:
+        cache = np.load(cache_file, mmap_mode="r")
+    except (OSError, EOFError, ValueError):
+        return None
+    if cache.dtype != np.int64 or cache.ndim != 1 or not np.array_equal(cache[:len(source_key)], source_key):
+        return None
+
+    instance = {}
+    position = len(source_key)
+    for name in CACHE_ARRAYS:
+        if position >= len(cache):
+            return None
+        ndim = int(cache[position])
+        shape = tuple(cache[position + 1:position + 1 + ndim].tolist())
+        position += 1 + ndim
+        size = int(np.prod(shape))
+        if len(shape) != ndim or min(shape, default=0) < 0 or position + size > len(cache):
+            return None
+        instance[name] = cache[position:position + size].reshape(shape)
+        position += size
+
+    return instance if position == len(cache) else None
+
+def save_cache(cache_file, instance, source_key):
+    arrays = [source_key]
+    for name in CACHE_ARRAYS:
+        array = instance[name]
+        arrays += [np.array([array.ndim, *array.shape], dtype=np.int64), array.ravel()]
+
+    # Written to a temporary file first, so other processes never load a partial cache
+    temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_file, 'wb') as file:
+            np.save(file, np.concatenate(arrays).astype(np.int64, copy=False))
+        os.replace(temporary_file, cache_file)
+    except OSError:
+        # The input directory may be read-only, the instance is simply parsed every time
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
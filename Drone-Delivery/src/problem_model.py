@@ -1,5 +1,5 @@
 # problem_model.py
-import math
+import numpy as np
 
 class Order:
     def __init__(self, id, row, column, product_list):
@@ -8,63 +8,17 @@ class Order:
         self.column = column
         self.product_list = product_list
 
-    def calculate_fly_distance(self, x_coord, y_coord):
-        # Cost of flying to target
-        distance = math.sqrt((self.row - x_coord)**2 + (self.column - y_coord)**2)
-        distance = math.ceil(distance)
-        
-        self.fly_cost = distance
-
-        return distance
-
-    def calculate_delivery_cost(self, warehouse_row, warehouse_col):
-        delivery_cost = 0
-
-        # Cost of loading item
-        delivery_cost += 1
-
-        # Cost of flying to target
-        distance = self.calculate_fly_distance(warehouse_row, warehouse_col)
-        delivery_cost += distance
-
-        # Cost of delivering item
-        delivery_cost += 1
-
-        # Cost of flying back to warehouse
-        delivery_cost += distance
-
-        self.delivery_cost = delivery_cost
-    
-    def clear_deliveries(self):
-        for product in self.product_list:
-            product.delivered = False
-    
-    def clear_assignements(self):
-        for product in self.product_list:
-            product.assigned = False
-    
-    def is_completed(self) -> bool:
-        return all(product.delivered for product in self.product_list)
-    
-    def get_unassigned_products(self):
-        return [product for product in self.product_list if not product.assigned]
-
     def __repr__(self):
         return (f"Order {self.id} (delivery_location=({self.row}, {self.column}), "
-                f"number_of_items={len(self.product_list)}, item_delivery_cost={self.delivery_cost})")
+                f"number_of_items={len(self.product_list)}, item_delivery_costs={[product.delivery_cost for product in self.product_list]})")
 
 class Product:
-    def __init__(self, id, order_id):
+    def __init__(self, id, order_id, warehouse_id = 0, delivery_cost = 0):
         self.id = id
         self.order_id = order_id
-        self.delivered = False
-        self.assigned = False
-    
-    def set_delivered(self):
-        self.delivered = True
-    
-    def set_assigned(self):
-        self.assigned = True
+        # Warehouse the product is loaded from and cost of delivering it from there
+        self.warehouse_id = warehouse_id
+        self.delivery_cost = delivery_cost
 
     def __lt__(self, other):
         if self.id == other.id:
@@ -73,4 +27,200 @@ class Product:
 
     def __repr__(self):
         return (f"Product {self.id} (Belongs to Order: {self.order_id})")
-    
\ No newline at end of file
+
+class ProblemInstance:
+    """
+    Read-only description of a problem (see simulation.load_problem), passed explicitly to every solution function.
+    Nothing about a solution is stored in it, so one instance can be shared by any number of solves at the same time.
+    Besides the parsed input it holds precomputed arrays:
+    - product_order: order of every product
+    - product_warehouse: warehouse every product is loaded from
+    - product_cost: delivery cost of every product
+    - order_sizes: number of products of every order
+    """
+    def __init__(self, name, num_rows, num_col, max_turns, warehouse_positions, warehouse_distances, drone_number, orders):
+        set_attribute = super().__setattr__
+        set_attribute("name", name)
+        set_attribute("num_rows", num_rows)
+        set_attribute("num_col", num_col)
+        set_attribute("max_turns", max_turns)
+        set_attribute("drone_number", drone_number)
+        set_attribute("orders", tuple(orders))
+
+        # Index products by id (ids are sequential across orders)
+        set_attribute("products", tuple(product for order in orders for product in order.product_list))
+
+        # Position (row, column) of every warehouse and fly distance from every warehouse to every order
+        set_attribute("warehouse_positions", get_read_only(warehouse_positions))
+        set_attribute("warehouse_distances", get_read_only(warehouse_distances))
+
+        # Precompute the problem's arrays
+        set_attribute("product_order", get_read_only(np.array([product.order_id for product in self.products], dtype=np.int32)))
+        set_attribute("product_warehouse", get_read_only(np.array([product.warehouse_id for product in self.products], dtype=np.int64)))
+        set_attribute("product_cost", get_read_only(np.array([product.delivery_cost for product in self.products], dtype=np.int64)))
+        set_attribute("order_sizes", get_read_only(np.bincount(self.product_order, minlength=len(self.orders))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ProblemInstance is read-only, {name} cannot be changed")
+
+    def __reduce__(self):
+        # Sent to other processes as its parsed input, the arrays are computed again there
+        return (ProblemInstance, (self.name, self.num_rows, self.num_col, self.max_turns, self.warehouse_positions,
+                                  self.warehouse_distances, self.drone_number, self.orders))
+
+    def get_score(self, completed_orders: int, turns_taken: int) -> int:
+        if completed_orders == 0:
+            return 0
+        return completed_orders * self.max_turns - turns_taken
+
+def get_read_only(array):
+    array = np.array(array)
+    array.setflags(write=False)
+    return array
+
+class MoveJournal:
+    """
+    In-place application of neighbor moves (see AddMove, RemoveMove and SwapMove).
+    Every move applied through apply_move is recorded in the journal, so it can later be undone.
+    Classes using it must initialize an empty journal list and implement add_product and remove_product.
+    """
+    def apply_move(self, move):
+        move.apply(self)
+        self.journal.append(move)
+
+    def undo_move(self):
+        self.journal.pop().undo(self)
+
+    def rollback(self):
+        """Undo every move in the journal"""
+        while self.journal:
+            self.undo_move()
+
+    def clear_journal(self):
+        self.journal.clear()
+
+    def copy_before_journal(self):
+        """Copy of the solution as it was before the moves in the journal, the solution itself is left unchanged"""
+        moves = self.journal.copy()
+        self.rollback()
+        snapshot = self.copy()
+
+        # Redo the moves (which records them again)
+        for move in moves:
+            self.apply_move(move)
+
+        return snapshot
+
+class Solution(MoveJournal, list):
+    """
+    List of drone workloads (one product list per drone) that keeps a running delivery cost total for each drone
+    and an index of the products that are not assigned to any drone.
+    Products should be added and removed through add_product and remove_product so both stay in sync.
+    """
+    def __init__(self, drone_products, all_products):
+        super().__init__(drone_products)
+
+        # Running cost total of every drone
+        self.drone_costs = [sum(product.delivery_cost for product in products) for products in self]
+
+        # Unassigned products (removed by swapping with the last one) and their positions in that list
+        assigned_ids = {product.id for products in self for product in products}
+        self.unassigned_products = [product for product in all_products if product.id not in assigned_ids]
+        self.unassigned_positions = {product.id: i for i, product in enumerate(self.unassigned_products)}
+
+        # Moves applied in place
+        self.journal = []
+
+    def copy(self):
+        new_solution = Solution.__new__(Solution)
+        new_solution.extend(drone_products.copy() for drone_products in self)
+        new_solution.drone_costs = self.drone_costs.copy()
+        new_solution.unassigned_products = self.unassigned_products.copy()
+        new_solution.unassigned_positions = self.unassigned_positions.copy()
+        new_solution.journal = []
+        return new_solution
+
+    def add_product(self, drone_index, product):
+        self[drone_index].append(product)
+        self.drone_costs[drone_index] += product.delivery_cost
+
+        # Swap-remove product from the unassigned products
+        position = self.unassigned_positions.pop(product.id)
+        last_product = self.unassigned_products.pop()
+        if last_product is not product:
+            self.unassigned_products[position] = last_product
+            self.unassigned_positions[last_product.id] = position
+
+    def remove_product(self, drone_index, product):
+        # Undoing an addition removes the last product, avoid searching for it
+        if self[drone_index][-1] is product:
+            self[drone_index].pop()
+        else:
+            self[drone_index].remove(product)
+        self.drone_costs[drone_index] -= product.delivery_cost
+
+        # Append product to the unassigned products
+        self.unassigned_positions[product.id] = len(self.unassigned_products)
+        self.unassigned_products.append(product)
+
+    def get_unassigned_order(self):
+        """Ids of the unassigned products in the order random add moves pick them from"""
+        return [product.id for product in self.unassigned_products]
+
+    def set_unassigned_order(self, product_ids):
+        products = {product.id: product for product in self.unassigned_products}
+        self.unassigned_products = [products[product_id] for product_id in product_ids]
+        self.unassigned_positions = {product_id: i for i, product_id in enumerate(product_ids)}
+
+class AddMove:
+    """Assign an unassigned product to a drone"""
+    def __init__(self, product, drone_index):
+        self.product = product
+        self.drone_index = drone_index
+
+    def apply(self, solution):
+        solution.add_product(self.drone_index, self.product)
+
+    def undo(self, solution):
+        solution.remove_product(self.drone_index, self.product)
+
+    def describe(self):
+        return ("add", self.product.id, self.drone_index)
+
+class RemoveMove:
+    """Unassign a product from the drone delivering it"""
+    def __init__(self, product, drone_index):
+        self.product = product
+        self.drone_index = drone_index
+
+    def apply(self, solution):
+        solution.remove_product(self.drone_index, self.product)
+
+    def undo(self, solution):
+        solution.add_product(self.drone_index, self.product)
+
+    def describe(self):
+        return ("remove", self.product.id, self.drone_index)
+
+class SwapMove:
+    """Exchange two products between two drones, product_1 goes from drone 1 to drone 2 and vice-versa"""
+    def __init__(self, product_1, drone_index_1, product_2, drone_index_2):
+        self.product_1 = product_1
+        self.drone_index_1 = drone_index_1
+        self.product_2 = product_2
+        self.drone_index_2 = drone_index_2
+
+    def apply(self, solution):
+        solution.remove_product(self.drone_index_1, self.product_1)
+        solution.remove_product(self.drone_index_2, self.product_2)
+        solution.add_product(self.drone_index_1, self.product_2)
+        solution.add_product(self.drone_index_2, self.product_1)
+
+    def undo(self, solution):
+        solution.remove_product(self.drone_index_1, self.product_2)
+        solution.remove_product(self.drone_index_2, self.product_1)
+        solution.add_product(self.drone_index_1, self.product_1)
+        solution.add_product(self.drone_index_2, self.product_2)
+
+    def describe(self):
+        return ("swap", self.product_1.id, self.drone_index_1, self.product_2.id, self.drone_index_2)
@@ -1,69 +1,267 @@
 # simulation.py
 
 # Built-in libraries
+import os
 import random
+import threading
+from functools import partial
 from typing import List, Union
 
+# External libraries
+import numpy as np
+
 # Custom libraries
 from parsing import parse_input_file
-from problem_model import Order, Product
+from solution_file import load_solution, SolutionWriter
+from problem_model import ProblemInstance, Product, Solution, AddMove, RemoveMove, SwapMove
 from algorithms.hill_climbing import get_hc_solution
 from algorithms.simulated_anealing import get_sa_solution
 from algorithms.genetic_algorithms import get_ga_solution
 from algorithms.tabu_search import get_ts_solution
+from algorithms.run_stats import RunStats
+from algorithms.termination import Termination
+from algorithms.progress_logger import ProgressLogger
 
 ##########################
-#    Global Variables    #
-# - Problem Parameters - #
+#        Constants       #
 ##########################
 
-num_rows: int = 0
-num_col: int = 0
-max_turns: int = 0
-warehouse_row: int = 0
-warehouse_col: int = 0
-drone_number: int = 0
-orders: List[Order] = []
-update_callback = None
+ALGORITHMS = ["Hill Climbing", "Simulated Annealing", "Tabu Search", "Genetic Algorithms", "Portfolio"]
+
+# Runs of the "Portfolio" mode, as (algorithm, parameters) pairs
+DEFAULT_PORTFOLIO = [
+    ("Hill Climbing", {}),
+    ("Simulated Annealing", {"temp_adjustment": 2}),
+    ("Tabu Search", {"tabu_adjustment": 1}),
+    ("Genetic Algorithms", {"pop_adjustment": 0})
+]
+
+# Smallest candidate batch scored with NumPy by EvaluationState.evaluate_moves, measured on busy_day and redundancy:
+# NumPy's fixed overhead makes smaller batches slower than scoring moves one by one
+BATCH_EVALUATION_THRESHOLD: int = 100
 
 
 ###########################
 # Interface's entry point #
 ###########################
 
-def run_algorithm(algorithm: str, **params):
+def run_algorithm(problem: ProblemInstance, algorithm: str, update_callback=None, stop_event=None, pause_event=None, **params):
     """
-    Run selected algorithm with customizable parameters
+    Run selected algorithm on a problem (see load_problem) with customizable parameters.
+    update_callback is called whenever a new best solution is found and setting stop_event (a threading.Event)
+    makes the algorithm return as soon as possible, it still returns its data and saves its best solution.
+    Every call only uses its own arguments, so several runs can share the same problem at the same time.
+    Hill Climbing, Simulated Annealing, Tabu Search and Genetic Algorithms can also stop before max_time
+    (see Termination): after max_evaluations scored solutions, after max_stagnation iterations without improvement
+    or once target_score is reached. With restart_on_stagnation=True, Hill Climbing restarts from a random solution
+    instead of stopping when it stagnates.
+    With an initial_solution (a solution file, see solution_file.load_solution), algorithms start from that solution
+    instead of a random one, and Genetic Algorithms seed their population with it and copies perturbed by
+    perturbation_moves random moves (see WarmStartGenerator).
+    Those four algorithms also pause while pause_event (a threading.Event) is set and, with a checkpoint_file, save their state
+    to it every save_interval seconds and when they end, so the run can be continued later (see resume_algorithm).
+    The best solution is written to solution_file (solution.txt, or solution.npy for the "binary" format) in solution_format
+    ("pretty", "compact" or "binary", see SolutionWriter) and, with a snapshot_interval, also every snapshot_interval seconds while
+    the algorithm runs.
+    With profile=True, counters and timers of the main loop (Hill Climbing, Simulated Annealing, Tabu Search
+    and Genetic Algorithms) are collected and a (data, summary) pair is returned instead of data (see RunStats).
     """
     # Get maximum duration parameter
     max_time = params.get("max_time", 10)
 
-    # Run algorithm with provided parameters
-    if algorithm == "Hill Climbing":
-        print(f"Running Hill Climbing with a maximum time of {max_time} seconds")
-        return get_hc_solution(max_time, generate_random_solution, evaluate_solution, 
-                              get_random_neighbor_function, update_callback)
+    # Runs without a stop event are never stopped early
+    if stop_event is None:
+        stop_event = threading.Event()
+
+    # Stopping criteria of the single process algorithms
+    termination = Termination(max_time, params.get("max_evaluations"), params.get("max_stagnation"),
+                              params.get("target_score"), stop_event, pause_event)
+
+    # Counters and timers, only collected when profiling
+    stats = RunStats() if params.get("profile", False) else None
+
+    # Get the functions matching the chosen solution representation
+    representation = params.get("representation", "lists")
+    functions = get_solution_functions(problem, representation)
+    solution_generator = functions["solution_generator"]
+    solution_evaluator = functions["solution_evaluator"]
+    state_generator = functions["state_generator"]
+    move_generator = functions["move_generator"]
+    move_info_generator = functions["move_info_generator"]
+    move_builder = functions["move_builder"]
+    crossover_generator = functions["crossover_generator"]
+    solution_encoder = functions["solution_encoder"]
+    solution_decoder = functions["solution_decoder"]
+
+    # Warm start from the solution of an earlier run
+    # Resumed runs already hold their whole search state, so the solution file may be gone by then
+    # (Hill Climbing restarts of a resumed run start from random solutions)
+    if params.get("initial_solution") is not None and params.get("resume_checkpoint") is None:
+        initial_solution = load_solution(problem, params["initial_solution"], representation)
+        solution_generator = WarmStartGenerator(initial_solution, solution_decoder, move_generator, params.get("perturbation_moves", 20))
+
+    if algorithm not in ALGORITHMS:
+        return f"Unknown algorithm: {algorithm}"
+
+    # Checkpoints of the single process algorithms, the run's parameters are saved so it can be resumed with them
+    resume_checkpoint = params.get("resume_checkpoint")
+    checkpointer = None
+    if params.get("checkpoint_file") is not None or resume_checkpoint is not None:
+        if not is_single_process(algorithm, params):
+            raise ValueError(f"Error: Checkpoints are not supported by {algorithm} with several processes")
+
+        # Imported here since most runs never use checkpoints
+        from algorithms.checkpoint import Checkpointer
+
+        run_info = {"algorithm": algorithm, "problem": problem.name, "product_number": len(problem.products),
+                    "params": {name: value for name, value in params.items() if name != "resume_checkpoint"}}
+        resume_state = None
+        if resume_checkpoint is not None:
+            resume_state = resume_checkpoint["state"]
+            termination.restore(resume_checkpoint["termination"])
+            random.setstate(resume_checkpoint["random_state"])
+        checkpointer = Checkpointer(params.get("checkpoint_file"), params.get("save_interval", 60), run_info,
+                                    solution_encoder, solution_decoder, resume_state)
+
+    # Best solution file (solution.txt by default), also snapshotted during the run with a snapshot_interval
+    result_writer = SolutionWriter(problem, solution_encoder, params.get("solution_file"), params.get("solution_format", "pretty"),
+                                   params.get("snapshot_interval"))
+
+    # Progress log (output.txt), written in the background while the algorithm runs
+    logger = ProgressLogger("output.txt", params.get("log_verbosity", "all"), params.get("log_format", "pretty"))
+    logger.open()
+    result_writer.open()
+
+    try:
+        # Run algorithm with provided parameters
+        if algorithm == "Hill Climbing":
+            print(f"Running Hill Climbing with a maximum time of {max_time} seconds")
+            data = get_hc_solution(max_time, solution_generator, solution_evaluator, state_generator,
+                                  move_generator, update_callback, logger, result_writer, termination, params.get("restart_on_stagnation", False), checkpointer, stats)
     
-    elif algorithm == "Simulated Annealing":
-        temp_adjustment = params.get("temp_adjustment", 0)
-        print(f"Running Simulated Annealing with max time {max_time} and temp adjustment {temp_adjustment}")
-        return get_sa_solution(max_time, temp_adjustment, generate_random_solution, evaluate_solution, 
-                                get_random_neighbor_function, update_callback)
+        elif algorithm == "Simulated Annealing" and params.get("replica_number", 1) > 1:
+            replica_number = params["replica_number"]
+            min_temperature = params.get("min_temperature", 1)
+            max_temperature = params.get("max_temperature", 1000)
+            exchange_interval = params.get("exchange_interval", 1000)
+            print(f"Running Simulated Annealing with max time {max_time} and {replica_number} replicas (parallel tempering)")
+
+            # Multi-process modes (and multiprocessing itself) are only imported when they are used, for a faster start
+            from algorithms.parallel_tempering import get_pt_solution
+
+            data = get_pt_solution(max_time, replica_number, min_temperature, max_temperature, exchange_interval,
+                                   solution_generator, solution_evaluator, state_generator,
+                                   move_generator, solution_encoder, solution_decoder, update_callback, logger, result_writer, stop_event)
+
+        elif algorithm == "Simulated Annealing":
+            temp_adjustment = params.get("temp_adjustment", 0)
+            print(f"Running Simulated Annealing with max time {max_time} and temp adjustment {temp_adjustment}")
+            data = get_sa_solution(max_time, temp_adjustment, solution_generator, solution_evaluator, state_generator,
+                                    move_generator, update_callback, logger, result_writer, termination, checkpointer, stats)
     
-    elif algorithm == "Tabu Search":
-        tabu_adjustment = params.get("tabu_adjustment", 0)
-        print(f"Running Tabu Search with max time {max_time} and tabu adjustment {tabu_adjustment}")
-        return get_ts_solution(max_time, tabu_adjustment, generate_random_solution, evaluate_solution, 
-                                get_random_neighbor_function, update_callback, drone_number, orders)
+        elif algorithm == "Tabu Search":
+            tabu_adjustment = params.get("tabu_adjustment", 0)
+            candidate_list_size = params.get("candidate_list_size", 5)
+            print(f"Running Tabu Search with max time {max_time}, tabu adjustment {tabu_adjustment} and {candidate_list_size} candidates")
+            data = get_ts_solution(max_time, tabu_adjustment, solution_generator, solution_evaluator, state_generator,
+                                    move_info_generator, move_builder, update_callback, logger, result_writer, termination, problem.drone_number, problem.orders, candidate_list_size, checkpointer, stats)
     
-    elif algorithm == "Genetic Algorithms":
-        pop_adjustment = params.get("pop_adjustment", 0)
-        print(f"Running Genetic Algorithms with max time {max_time} and population adjustment {pop_adjustment}")
-        return get_ga_solution(max_time, pop_adjustment, generate_random_solution, evaluate_solution, 
-                                order_based_crossover, get_random_neighbor_function, update_callback)
+        elif algorithm == "Genetic Algorithms" and params.get("island_number", 1) > 1:
+            pop_adjustment = params.get("pop_adjustment", 0)
+            island_number = params["island_number"]
+            migration_interval = params.get("migration_interval", 50)
+            migration_size = params.get("migration_size", 2)
+            topology = params.get("topology", "Ring")
+            print(f"Running Genetic Algorithms with max time {max_time}, population adjustment {pop_adjustment} and {island_number} islands")
+
+            from algorithms.island_model import get_island_ga_solution
+
+            data = get_island_ga_solution(max_time, pop_adjustment, island_number, migration_interval, migration_size, topology,
+                                          solution_generator, solution_evaluator, crossover_generator,
+                                          move_generator, solution_encoder, solution_decoder, update_callback, logger, result_writer, stop_event)
+
+        elif algorithm == "Genetic Algorithms":
+            pop_adjustment = params.get("pop_adjustment", 0)
+            print(f"Running Genetic Algorithms with max time {max_time} and population adjustment {pop_adjustment}")
+            data = get_ga_solution(max_time, pop_adjustment, solution_generator, solution_evaluator, 
+                                    crossover_generator, move_generator, update_callback, logger, result_writer, termination, checkpointer, stats)
     
-    else:
-        return f"Unknown algorithm: {algorithm}"
+        elif algorithm == "Portfolio":
+            variants = params.get("variants", DEFAULT_PORTFOLIO)
+            prune_margin = params.get("prune_margin", None)
+            checkpoint_interval = params.get("checkpoint_interval", max_time / 10)
+            print(f"Running a portfolio of {len(variants)} runs with max time {max_time}")
+
+            # Runs share the portfolio's representation and warm start unless they choose their own
+            shared_params = {name: params[name] for name in ("representation", "initial_solution", "perturbation_moves") if name in params}
+            if shared_params.get("initial_solution") is not None:
+                # Runs work in their own directories
+                shared_params["initial_solution"] = os.path.abspath(shared_params["initial_solution"])
+            if shared_params:
+                variants = [(variant_algorithm, dict(shared_params, **variant_params))
+                            for variant_algorithm, variant_params in variants]
+            if any(variant_algorithm == "Portfolio" for variant_algorithm, _variant_params in variants):
+                raise ValueError("A portfolio cannot contain another portfolio")
+            # Runs are daemonic processes, which are not allowed to start the processes of replicas or islands
+            for variant_algorithm, variant_params in variants:
+                if not is_single_process(variant_algorithm, variant_params):
+                    raise ValueError(f"Error: Portfolio runs must use a single process, {variant_algorithm} "
+                                     f"cannot have replicas or islands (replica_number and island_number must be 1)")
+
+            from algorithms.portfolio import get_portfolio_solution
+
+            # Every run solves this same problem
+            algorithm_runner = partial(run_algorithm, problem)
+            data = get_portfolio_solution(max_time, variants, prune_margin, checkpoint_interval, algorithm_runner,
+                                          solution_evaluator, solution_encoder, solution_decoder, update_callback, logger, result_writer, stop_event)
+    finally:
+        logger.close()
+        result_writer.close()
+
+    if stats:
+        return data, stats.get_summary()
+    return data
+
+def resume_algorithm(problem: ProblemInstance, checkpoint_file: str, update_callback=None, stop_event=None, pause_event=None, **params):
+    """
+    Continue the run saved in checkpoint_file (see run_algorithm) from where it was saved, with the same random state.
+    Its saved parameters are used unless given in params: max_time includes the time already run, so a larger one extends it.
+    """
+    from algorithms.checkpoint import load_checkpoint
+    checkpoint = load_checkpoint(checkpoint_file)
+    run_info = checkpoint["run"]
+    if run_info["product_number"] != len(problem.products):
+        raise ValueError(f"Error: Checkpoint {checkpoint_file} was saved for problem {run_info['problem']}, not {problem.name}")
+
+    return run_algorithm(problem, run_info["algorithm"], update_callback, stop_event, pause_event,
+                         **dict(run_info["params"], **params), resume_checkpoint=checkpoint)
+
+def is_single_process(algorithm: str, params: dict) -> bool:
+    """Whether a run happens in this process, only those can be paused and checkpointed"""
+    return (algorithm != "Portfolio" and params.get("replica_number", 1) <= 1 and params.get("island_number", 1) <= 1)
+
+def get_solution_functions(problem: ProblemInstance, representation: str = "lists") -> dict:
+    """
+    Functions handed to the algorithms for the given solution representation, bound to the problem:
+    - "lists": one list of Product objects per drone (default)
+    - "array": flat array mapping every product to its drone (see array_simulation.py)
+    """
+    if representation == "array":
+        # Imported here since array_simulation builds on this module
+        import array_simulation
+        return array_simulation.get_solution_functions(problem)
+
+    return {
+        "solution_generator": partial(generate_random_solution, problem),
+        "solution_evaluator": partial(evaluate_solution, problem),
+        "state_generator": partial(EvaluationState, problem),
+        "move_generator": partial(get_random_move, problem),
+        "move_info_generator": partial(get_random_move_info, problem),
+        "move_builder": partial(get_move, problem),
+        "crossover_generator": partial(order_based_crossover, problem),
+        "solution_encoder": encode_solution,
+        "solution_decoder": partial(decode_solution, problem)
+    }
 
 ############################
 #        Simulation        #
@@ -72,27 +270,26 @@ def run_algorithm(algorithm: str, **params):
 """---------------------
 - Initializing Problem -
 ---------------------"""
-def init_problem_info(problem: str):
-    # Prepare to change problem's parameters
-    global num_rows, num_col, max_turns, warehouse_row, warehouse_col, drone_number, orders
-    
-    # Transform problem string to match file
-    problem = problem.lower().replace(" ", "_")
+def load_problem(problem: str) -> ProblemInstance:
+    """Problems are either a path to an input file or the name of one of the files in input/"""
+    if problem.endswith(".in"):
+        input_file = problem
+    else:
+        # Transform problem string to match file
+        input_file = f"input/{problem.lower().replace(' ', '_')}.in"
 
     # Parse input
-    num_rows, num_col, max_turns, warehouse_row, warehouse_col, drone_number, orders = parse_input_file(f"input/{problem}.in")
+    return ProblemInstance(problem, *parse_input_file(input_file))
 
 """--------------------
 - Solution Generation -
 --------------------"""
-def generate_random_solution() -> List[List[Product]]:
+def generate_random_solution(problem: ProblemInstance) -> Solution:
     # Initialize empty solution
-    solution: List[List[Product]] = [[] for _ in range(drone_number)]
+    solution: Solution = Solution([[] for _ in range(problem.drone_number)], problem.products)
     
     # Gather all produtcs to be delivered
-    all_needed_products: List[Product] = []
-    for order in orders:
-        all_needed_products.extend(order.product_list)
+    all_needed_products: List[Product] = list(problem.products)
     
     # Randomize product listing
     random.shuffle(all_needed_products)
@@ -102,50 +299,224 @@ def generate_random_solution() -> List[List[Product]]:
     
     for product in all_needed_products:
         # Add item to drone if it is feasible otherwise skip item
-        if (get_drone_cost(solution[drone_index]) + orders[product.order_id].delivery_cost <= max_turns):
-            solution[drone_index].append(product)
-            drone_index = (drone_index + 1) % drone_number
+        if (solution.drone_costs[drone_index] + product.delivery_cost <= problem.max_turns):
+            solution.add_product(drone_index, product)
+            drone_index = (drone_index + 1) % problem.drone_number
         else:
             continue
     
     return solution
 
+class WarmStartGenerator:
+    """
+    Solution generator of warm started runs, used instead of generate_random_solution.
+    The first solution it returns is the initial one (encoded like the representation's encode_solution), every later one
+    (rest of a Genetic Algorithm's population, Hill Climbing restarts) is a copy changed by perturbation_moves random moves.
+    It only holds picklable values, so every replica or island starts from the initial solution too.
+    """
+    def __init__(self, encoded_solution, solution_decoder, move_generator, perturbation_moves: int = 20):
+        self.encoded_solution = encoded_solution
+        self.solution_decoder = solution_decoder
+        self.move_generator = move_generator
+        self.perturbation_moves = perturbation_moves
+        self.generated = 0
+
+    def __call__(self):
+        solution = self.solution_decoder(self.encoded_solution)
+
+        if self.generated > 0:
+            for _ in range(self.perturbation_moves):
+                # Moves that are not possible (-1) are skipped
+                move = self.move_generator(solution)
+                if move != -1:
+                    move.apply(solution)
+
+        self.generated += 1
+        return solution
+
 """--------------------
 - Evaluation function -
 --------------------"""
-def evaluate_solution(solution: List[List[Product]], return_status: bool = False) -> int:
-    # Set every product to "not delivered"
-    for order in orders:
-        order.clear_deliveries()
-    
-    # Mark every delivered product and check turns taken
-    turns_taken = 0
-    for drone_products in solution:
-        # Checking turns taken
-        drone_cost = get_drone_cost(drone_products)
-        turns_taken = max(turns_taken, drone_cost)
-
-        # Marking delivered products
-        for product in drone_products:
-            product.set_delivered()
+def evaluate_solution(problem: ProblemInstance, solution: List[List[Product]], return_status: bool = False) -> int:
+    # Check turns taken
+    turns_taken = max((get_drone_cost(drone_products) for drone_products in solution), default=0)
 
     # Check the number of completed orders
-    completed_orders = 0
-    for order in orders:
-        if order.is_completed():
-            completed_orders += 1
+    order_status = get_orders_status(problem, solution)
+    completed_orders = sum(order_status)
     
     # Calculate solution score
-    if completed_orders == 0:
-        solution_value = 0
-    else:
-        solution_value = completed_orders * max_turns - turns_taken
+    solution_value = problem.get_score(completed_orders, turns_taken)
 
     if return_status:
-        order_status = [order.is_completed() for order in orders]
         return solution_value, order_status
     return solution_value
 
+def get_delivered_counts(problem: ProblemInstance, solution: List[List[Product]]) -> List[int]:
+    """Number of delivered products of every order"""
+    delivered_counts = [0] * len(problem.orders)
+    for drone_products in solution:
+        for product in drone_products:
+            delivered_counts[product.order_id] += 1
+    return delivered_counts
+
+"""------------------------
+- Incremental Evaluation -
+------------------------"""
+class EvaluationState:
+    """
+    Cached evaluation of a solution, used to score neighbor moves without running evaluate_solution.
+    Moves are given by their move_info tuples (see AddMove, RemoveMove and SwapMove describe methods):
+    - ("add", product_id, drone_index)
+    - ("remove", product_id, drone_index)
+    - ("swap", product_1_id, drone_index_1, product_2_id, drone_index_2), product_1 leaves drone 1 for drone 2 and vice-versa
+    Scoring a move only touches the affected drones and orders.
+    """
+    def __init__(self, problem: ProblemInstance, solution: Solution):
+        self.problem = problem
+
+        # Workload of every drone
+        self.drone_costs: List[int] = solution.drone_costs.copy()
+        self.turns_taken: int = max(self.drone_costs, default=0)
+
+        # Number of delivered products of every order
+        self.delivered_counts: List[int] = get_delivered_counts(problem, solution)
+
+        self.completed_orders: int = sum(1 for order in problem.orders if self.is_order_completed(order.id))
+        self.score: int = problem.get_score(self.completed_orders, self.turns_taken)
+
+    def is_order_completed(self, order_id: int) -> bool:
+        return self.delivered_counts[order_id] == len(self.problem.orders[order_id].product_list)
+
+    def evaluate_move(self, move_info: tuple) -> int:
+        """Score of the solution obtained by applying the move, the state itself is left untouched"""
+        new_drone_costs, completed_change, _order_changes = self.get_move_changes(move_info)
+        turns_taken = self.get_turns_taken(new_drone_costs)
+
+        return self.problem.get_score(self.completed_orders + completed_change, turns_taken)
+
+    def evaluate_moves(self, moves_info: List[tuple]) -> np.ndarray:
+        """Scores of the solutions obtained by applying each of the moves, computed in one batched pass"""
+        problem = self.problem
+
+        # NumPy's overhead is only worth it for larger batches
+        if len(moves_info) < BATCH_EVALUATION_THRESHOLD:
+            return np.array([self.evaluate_move(move_info) for move_info in moves_info], dtype=np.int64)
+
+        # Encode moves as a cost change on up to two drones and a delivered count change on one order
+        drones_1, drones_2, products_1, products_2, order_changes = [], [], [], [], []
+
+        for move_info in moves_info:
+            if move_info[0] == "swap":
+                _move_type, product_1, drone_index_1, product_2, drone_index_2 = move_info
+                order_change = 0
+            else:
+                _move_type, product_1, drone_index_1 = move_info
+                product_2, drone_index_2 = product_1, drone_index_1
+                order_change = 1 if move_info[0] == "add" else -1
+
+            drones_1.append(drone_index_1)
+            drones_2.append(drone_index_2)
+            products_1.append(product_1)
+            products_2.append(product_2)
+            order_changes.append(order_change)
+
+        drones_1, drones_2 = np.array(drones_1), np.array(drones_2)
+        products_1, products_2 = np.array(products_1), np.array(products_2)
+        order_changes = np.array(order_changes)
+
+        # New costs of the affected drones (for add and remove both drones are the same one)
+        drone_costs = np.array(self.drone_costs)
+        cost_changes = problem.product_cost[products_2] - problem.product_cost[products_1]
+        is_swap = order_changes == 0
+        new_costs_1 = drone_costs[drones_1] + np.where(is_swap, cost_changes, order_changes * problem.product_cost[products_1])
+        new_costs_2 = np.where(is_swap, drone_costs[drones_2] - cost_changes, new_costs_1)
+
+        # Busiest drone not affected by each move, taken from the 3 busiest drones (a move affects at most 2)
+        busiest_drones = sorted(range(len(self.drone_costs)), key=self.drone_costs.__getitem__, reverse=True)[:3]
+        busiest_drones += busiest_drones[-1:] * (3 - len(busiest_drones))
+        unaffected_costs = np.zeros(len(moves_info), dtype=np.int64)
+        for drone_index in reversed(busiest_drones):
+            unaffected = (drones_1 != drone_index) & (drones_2 != drone_index)
+            unaffected_costs[unaffected] = self.drone_costs[drone_index]
+        turns_taken = np.maximum(unaffected_costs, np.maximum(new_costs_1, new_costs_2))
+
+        # Orders that become completed or stop being completed
+        affected_orders = problem.product_order[products_1]
+        delivered_counts = np.array([self.delivered_counts[order_id] for order_id in affected_orders.tolist()])
+        completed_changes = ((order_changes == 1) & (delivered_counts + 1 == problem.order_sizes[affected_orders])).astype(np.int64)
+        completed_changes -= (order_changes == -1) & (delivered_counts == problem.order_sizes[affected_orders])
+
+        completed_orders = self.completed_orders + completed_changes
+        return np.where(completed_orders == 0, 0, completed_orders * problem.max_turns - turns_taken)
+
+    def apply_move(self, move_info: tuple):
+        """Update the state to match the solution obtained by applying the move"""
+        new_drone_costs, completed_change, order_changes = self.get_move_changes(move_info)
+        self.turns_taken = self.get_turns_taken(new_drone_costs)
+
+        for drone_index, drone_cost in new_drone_costs.items():
+            self.drone_costs[drone_index] = drone_cost
+        for order_id, change in order_changes:
+            self.delivered_counts[order_id] += change
+
+        self.completed_orders += completed_change
+        self.score = self.problem.get_score(self.completed_orders, self.turns_taken)
+
+    def get_move_changes(self, move_info: tuple):
+        """Returns the new costs of the affected drones, the change in completed orders and the changes in delivered counts"""
+        move_type = move_info[0]
+        products = self.problem.products
+
+        if move_type == "swap":
+            _move_type, product_1_id, drone_index_1, product_2_id, drone_index_2 = move_info
+            cost_1 = products[product_1_id].delivery_cost
+            cost_2 = products[product_2_id].delivery_cost
+
+            # Products are still delivered, only the workloads change
+            new_drone_costs = {
+                drone_index_1: self.drone_costs[drone_index_1] - cost_1 + cost_2,
+                drone_index_2: self.drone_costs[drone_index_2] - cost_2 + cost_1
+            }
+            return new_drone_costs, 0, ()
+
+        _move_type, product_id, drone_index = move_info
+        order_id = products[product_id].order_id
+        cost = products[product_id].delivery_cost
+        order_size = len(self.problem.orders[order_id].product_list)
+
+        if move_type == "add":
+            new_drone_costs = {drone_index: self.drone_costs[drone_index] + cost}
+            completed_change = 1 if self.delivered_counts[order_id] + 1 == order_size else 0
+            return new_drone_costs, completed_change, ((order_id, 1),)
+
+        if move_type == "remove":
+            new_drone_costs = {drone_index: self.drone_costs[drone_index] - cost}
+            completed_change = -1 if self.delivered_counts[order_id] == order_size else 0
+            return new_drone_costs, completed_change, ((order_id, -1),)
+
+        raise ValueError(f"Unknown move type: {move_type}")
+
+    def get_turns_taken(self, new_drone_costs: dict) -> int:
+        """Maximum drone workload after replacing the costs of the affected drones"""
+        turns_taken = self.turns_taken
+        lowered_busiest_drone = False
+
+        for drone_index, drone_cost in new_drone_costs.items():
+            if drone_cost >= turns_taken:
+                turns_taken = drone_cost
+            elif self.drone_costs[drone_index] == self.turns_taken:
+                lowered_busiest_drone = True
+
+        # Only rescan every drone if the busiest one got lighter and nothing replaced it
+        if lowered_busiest_drone and turns_taken == self.turns_taken:
+            turns_taken = max(new_drone_costs.get(drone_index, drone_cost) for drone_index, drone_cost in enumerate(self.drone_costs))
+
+        return turns_taken
+
+    def get_orders_status(self) -> List[bool]:
+        return [self.is_order_completed(order.id) for order in self.problem.orders]
+
 """--------------------
 - Constraint checking -
 --------------------"""
@@ -153,15 +524,14 @@ def get_drone_cost(drone_products: List[Product]) -> int:
     drone_cost: int = 0
 
     for product in drone_products:
-        drone_cost += orders[product.order_id].delivery_cost
+        drone_cost += product.delivery_cost
 
     return drone_cost
 
-def check_if_feasible(solution: List[List[Product]]) -> bool:
+def check_if_feasible(problem: ProblemInstance, solution: Solution) -> bool:
     # Check drone cost and ensure its smaller than max turns
-    for drone_products in solution:
-        cost: int = get_drone_cost(drone_products)
-        if cost > max_turns:
+    for cost in solution.drone_costs:
+        if cost > problem.max_turns:
             return False
     
     return True
@@ -170,65 +540,37 @@ def check_if_feasible(solution: List[List[Product]]) -> bool:
 - Neighboorhood/Mutation -
 -       Functions        -
 -----------------------"""
-def add_product_to_solution(solution: List[List[Product]], get_move_info: bool = False) -> List[List[Product]]:
+def get_add_move_info(problem: ProblemInstance, solution: Solution) -> Union[tuple, int]:
     """
-    This neighboor function picks a random drone from a solution, checks which items are not being delivered and randomly assings one of them to the drone.
-    This function returns a new solution with the added product or it returns -1 if:
+    This neighboor function picks a random drone from a solution and one of the products not being delivered, and returns the move_info assigning that product to the drone.
+    The solution itself is not changed. It returns -1 if:
     - There are no products not being delivered
     - Picked product can not be added to the picked drone's workload (adding it would make the solution unfeasible)
     """
-    # Make a shallow copy of the given solution
-    new_solution = [drone_products.copy() for drone_products in solution]
-
     # Choose a random drone index
-    drone_index = random.randrange(drone_number)
-
-    # Set every product to "not assigned"
-    for order in orders:
-        order.clear_assignements()
-
-    # Mark every assigned product
-    for drone_products in new_solution:
-        # Marking assigned products
-        for product in drone_products:
-            product.set_assigned()
-    
-    # Get all unassigned products
-    unassigned_products = []
-    for order in orders:
-        unassigned_products.extend(order.get_unassigned_products())
+    drone_index = random.randrange(problem.drone_number)
 
     # Check if there are unassigned items
-    if not unassigned_products:
+    if not solution.unassigned_products:
         return -1
 
     # Pick a random unassigned product
-    product = random.choice(unassigned_products)
+    product = random.choice(solution.unassigned_products)
 
     # Check if product can be added to drone
-    if (get_drone_cost(new_solution[drone_index]) + orders[product.order_id].delivery_cost > max_turns):
+    if (solution.drone_costs[drone_index] + product.delivery_cost > problem.max_turns):
         return -1
 
-    # Add product to drone
-    new_solution[drone_index].append(product)
+    return ("add", product.id, drone_index)
 
-    # Return info about chosen move (Tabu Search related)
-    if get_move_info:
-        return (new_solution, ("add", product.id, drone_index))
-
-    return new_solution
-
-def remove_product_from_solution(solution: List[List[Product]], get_move_info: bool = False) -> Union[List[List[Product]], int]:
+def get_remove_move_info(problem: ProblemInstance, solution: Solution) -> Union[tuple, int]:
     """
-    This neighboor function picks a random drone from a solution and removes one of the products it is responsible for delivering.
-    This function returns a new solution with the removed product or it returns -1 if:
-    - The picked drone has no products to remove
+    This neighboor function picks a random drone from a solution and one of the products it is responsible for delivering, and returns the move_info removing it.
+    The solution itself is not changed. It returns -1 if:
+    - No drone has products to remove
     """
-    # Make a shallow copy of the given solution
-    new_solution = [drone_products.copy() for drone_products in solution]
-
     # Find drones that have at least one product assigned
-    non_empty_drones = [i for i, products in enumerate(new_solution) if products]  
+    non_empty_drones = [i for i, drone_products in enumerate(solution) if drone_products]
     if not non_empty_drones:
         # No items to remove
         return -1
@@ -236,76 +578,81 @@ def remove_product_from_solution(solution: List[List[Product]], get_move_info: b
     # Pick a random drone that is not empty
     drone_index = random.choice(non_empty_drones)
 
-    # Pick a random product from that drone and remove it
-    product = random.choice(new_solution[drone_index])
-    new_solution[drone_index].remove(product)
-
-    # Return info about chosen move (Tabu Search related)
-    if get_move_info:
-        return (new_solution, ("remove", product.id, drone_index))
+    # Pick a random product from that drone
+    product = random.choice(solution[drone_index])
 
-    return new_solution
+    return ("remove", product.id, drone_index)
 
-def swap_products_in_solution(solution: List[List[Product]], get_move_info: bool = False) -> List[List[Product]]:
+def get_swap_move_info(problem: ProblemInstance, solution: Solution) -> Union[tuple, int]:
     """
-    This neighboor function picks two random drone from a solution and swaps two randomly picked items between them.
-    This function returns a new solution with the swapped products or it returns -1 if:
+    This neighboor function picks two random drones from a solution and two random products, one from each, and returns the move_info swapping them.
+    The solution itself is not changed. It returns -1 if:
     - The problem instance doens't have more than one drone
     - If any of the randomly picked drones doesn't have products
     - If the swap would make any drone's workload be infeasible
     """
     # Check if there are more than 1 drone
-    if drone_number <= 1:
+    if problem.drone_number <= 1:
         return -1
-    
-    # Make a shallow copy of the given solution
-    new_solution = [drone_products.copy() for drone_products in solution]
 
     # Pick two random drones
-    drone_products_1, drone_products_2  = random.sample(new_solution, 2)
+    drone_index_1, drone_index_2 = random.sample(range(problem.drone_number), 2)
 
     # Check if both drones have products assigned
-    if len(drone_products_1) == 0 or len(drone_products_2) == 0:
+    if len(solution[drone_index_1]) == 0 or len(solution[drone_index_2]) == 0:
         return -1
 
     # Pick two random products
-    product_1 = random.choice(drone_products_1)
-    product_2 = random.choice(drone_products_2)
+    product_1 = random.choice(solution[drone_index_1])
+    product_2 = random.choice(solution[drone_index_2])
 
-    # Remove original products
-    drone_products_1.remove(product_1)
-    drone_products_2.remove(product_2)
-    
     # Check if new products can be added
-    if (get_drone_cost(drone_products_1) + orders[product_2.order_id].delivery_cost > max_turns):
+    if (solution.drone_costs[drone_index_1] - product_1.delivery_cost + product_2.delivery_cost > problem.max_turns):
         return -1
-    if (get_drone_cost(drone_products_2) + orders[product_1.order_id].delivery_cost > max_turns):
+    if (solution.drone_costs[drone_index_2] - product_2.delivery_cost + product_1.delivery_cost > problem.max_turns):
         return -1
 
-    # Add new products
-    drone_products_1.append(product_2)
-    drone_products_2.append(product_1)
-    
-    # Return info about chosen move (Tabu Search related)
-    if get_move_info:
-        return (new_solution, ("swap", product_1.id, new_solution.index(drone_products_1), product_2.id, new_solution.index(drone_products_2)))
+    return ("swap", product_1.id, drone_index_1, product_2.id, drone_index_2)
 
-    return new_solution
+def get_random_move(problem: ProblemInstance, solution, stats = None):
+    """
+    Returns a random neighbor move (or -1 if the picked one is not possible).
+    Moves are applied in place with solution.apply_move (which allows undoing them) or move.apply, 
+    and move.describe returns the move_info tuple used by the evaluation state and Tabu Search.
+    If stats (a RunStats) is given, the picked operator and whether it failed are counted.
+    """
+    move_info = get_random_move_info(problem, solution, stats)
+    if move_info == -1:
+        return -1
+    return get_move(problem, move_info)
 
-def get_random_neighbor_function(solution, get_move_info = False):
-    function_list = [add_product_to_solution, remove_product_from_solution, swap_products_in_solution]
-    choosen_function = random.choice(function_list)
+def get_random_move_info(problem: ProblemInstance, solution, stats = None):
+    """
+    Same as get_random_move, but only returns the move_info tuple (see EvaluationState), no move object is built.
+    Used to generate candidate lists that are mostly discarded after being scored (see get_move).
+    """
+    function_list = [("add", get_add_move_info), ("remove", get_remove_move_info), ("swap", get_swap_move_info)]
+    operator, choosen_function = random.choice(function_list)
+
+    move_info = choosen_function(problem, solution)
+    if stats:
+        stats.count_generated(operator, move_info != -1)
 
-    # Return info about chosen move (Tabu Search related)
-    if get_move_info:
-        return choosen_function(solution, True)
+    return move_info
 
-    return choosen_function(solution)
+def get_move(problem: ProblemInstance, move_info: tuple) -> Union[AddMove, RemoveMove, SwapMove]:
+    """Move described by a move_info tuple, works with both representations"""
+    products = problem.products
+    if move_info[0] == "add":
+        return AddMove(products[move_info[1]], move_info[2])
+    if move_info[0] == "remove":
+        return RemoveMove(products[move_info[1]], move_info[2])
+    return SwapMove(products[move_info[1]], move_info[2], products[move_info[3]], move_info[4])
 
 """--------------------
 - Crossover Functions -
 --------------------"""
-def order_based_crossover(parent1, parent2):
+def order_based_crossover(problem: ProblemInstance, parent1, parent2):
     """
     Crossover Logic: Start with empty children, child1 will pick a drone from parent 1, then a drone from parent 2 and so on, until it has picked all the drones.
     However, with this approach dupplicated products are a problem. Therefore, after picking a parent's drone, the child will remove all the items from it that are duplicated.
@@ -314,99 +661,92 @@ def order_based_crossover(parent1, parent2):
     This ensures that child solutions have all the products from the parents and that no child solution has duplicated products.
     """
     # Make shallow copy of solution 1 and shuffle it
-    parent1_aux = parent1.copy()
+    parent1_aux = list(parent1)
     random.shuffle(parent1_aux)
 
     # Make shallow copy of solution 2 and shuffle it
-    parent2_aux = parent2.copy()
+    parent2_aux = list(parent2)
     random.shuffle(parent2_aux)
 
     # Create child 1
-    child1, excluded_products_1 = make_child(parent1_aux, parent2_aux)
+    child1, excluded_products_1 = make_child(problem, parent1_aux, parent2_aux)
 
     # Create child 2
-    child2, excluded_products_2 = make_child(parent2_aux, parent1_aux)
+    child2, excluded_products_2 = make_child(problem, parent2_aux, parent1_aux)
 
     # Apply Excluded products
-    child1 = apply_excluded(child1, excluded_products_2)
+    child1 = apply_excluded(problem, child1, excluded_products_2)
 
-    child2 = apply_excluded(child2, excluded_products_1)
+    child2 = apply_excluded(problem, child2, excluded_products_1)
 
     return child1, child2
 
-def make_child(parent1, parent2):
+def make_child(problem: ProblemInstance, parent1, parent2):
     # Initialize Child
     child = []
 
-    # Mark all pertinent products as "non assigned"
-    for parent in [parent1, parent2]:
-        for drone_products in parent:
-            for product in drone_products:
-                product.assigned = False
+    # Mark all products as "non assigned" (the flags belong to this child, the parents' products are shared)
+    assigned = [False] * len(problem.products)
 
     # Create child
     excluded_products = []
-    for i in range(drone_number):
+    for i in range(problem.drone_number):
         # Determine from which parent to pick
         parent = parent2 if i % 2 == 0 else parent1
         # Get the drone from parent
         drone_products = parent.pop()
         # Make child inherit valid products
-        assignable_products = [product for product in drone_products if not product.assigned]
-        excluded_products.extend([product for product in drone_products if product.assigned])
+        assignable_products = [product for product in drone_products if not assigned[product.id]]
+        excluded_products.extend([product for product in drone_products if assigned[product.id]])
         child.append(assignable_products)
         # Mark products as assigned
         for product in assignable_products:
-            product.assigned = True
+            assigned[product.id] = True
     
-    return child, excluded_products
-
-def apply_excluded(child, excluded_products):
-    # Get drone cost
-    drones_cost = list(map(get_drone_cost, child))
+    return Solution(child, problem.products), excluded_products
 
+def apply_excluded(problem: ProblemInstance, child, excluded_products):
     for product in excluded_products:
         # Get drone with least cost
-        drone_cost = min(drones_cost)
-        drone_index = drones_cost.index(drone_cost)
+        drone_cost = min(child.drone_costs)
+        drone_index = child.drone_costs.index(drone_cost)
         # If possible, assign current product to it
-        if (drone_cost + orders[product.order_id].delivery_cost <= max_turns):
-            child[drone_index].append(product)
-            drones_cost[drone_index] += orders[product.order_id].delivery_cost
+        if (drone_cost + product.delivery_cost <= problem.max_turns):
+            child.add_product(drone_index, product)
 
     return child
 
+"""--------------------------
+- Solution Encoding -
+- (Compact and picklable) -
+--------------------------"""
+def encode_solution(solution: Solution) -> List[List[int]]:
+    """Product ids of every drone, used to send solutions to other processes"""
+    return [[product.id for product in drone_products] for drone_products in solution]
+
+def decode_solution(problem: ProblemInstance, encoded_solution: List[List[int]]) -> Solution:
+    """Rebuild a solution from encode_solution's output using the problem's products"""
+    products = problem.products
+    return Solution([[products[product_id] for product_id in drone_products] for drone_products in encoded_solution], products)
+
 """------------------
 - Interface related -
 ------------------"""
-def get_orders_status(solution: List[List[Product]]) -> List[int]:
-    # Set every product to "not delivered"
-    for order in orders:
-        order.clear_deliveries()
-
-    # Mark every delivered product
-    for drone_products in solution:
-        # Marking delivered products
-        for product in drone_products:
-            product.set_delivered()
-
-    return [order.is_completed() for order in orders]
-
-def register_update_callback(callback):
-    """Register a callback function to be called whenever a new best solution is found"""
-    global update_callback
-    update_callback = callback
+def get_orders_status(problem: ProblemInstance, solution: List[List[Product]]) -> List[bool]:
+    delivered_counts = get_delivered_counts(problem, solution)
+    return [delivered_count == len(order.product_list) for delivered_count, order in zip(delivered_counts, problem.orders)]
 
 """-----------------------
 - Problem representation -
 -----------------------"""
-def print_problem_info():
+def print_problem_info(problem: ProblemInstance):
     print(f"Problem Information:")
-    print(f"    Number of drones:    {drone_number}")
-    print(f"    Max number of turns: {max_turns}")
+    print(f"    Number of drones:    {problem.drone_number}")
+    print(f"    Max number of turns: {problem.max_turns}")
     
-    print("\nWarehouse:")
-    print(f"    Coordinates: ({warehouse_row}, {warehouse_col})")
+    print("\nWarehouses:")
+    for warehouse_id, (row, column) in enumerate(problem.warehouse_positions.tolist()):
+        print(f"    Warehouse {warehouse_id} coordinates: ({row}, {column})")
     
     print("\nOrders:")
-    print(f"    {orders}\n")
+    print(f"    {list(problem.orders)}\n")
@@ -0,0 +1,231 @@
+# solution_file.py
+
+# Built-in libraries
+import os
+import re
+import time
+import threading
+from typing import List, Union
+
+# External libraries
+import numpy as np
+
+# Custom libraries
+from problem_model import ProblemInstance
+
+# Formats of solution files (see SolutionWriter) and the file each one is written to by default
+SOLUTION_FORMATS = {"pretty": "solution.txt", "compact": "solution.txt", "binary": "solution.npy"}
+
+# Product entries of pretty solution files, e.g. "Product 12 (Belongs to Order: 3)"
+PRODUCT_PATTERN = re.compile(r"Product (\d+)")
+
+# First bytes of NumPy's .npy files, used to recognize binary solutions
+NPY_MAGIC = b"\x93NUMPY"
+
+"""------------------
+- Writing solutions -
+------------------"""
+class SolutionWriter:
+    """
+    Writes the best solution of a run (solution.txt), shared by every algorithm. Formats:
+    - "pretty": the original human-readable layout, one product per line
+    - "compact": one line per drone with the ids of its products
+    - "binary": NumPy array (.npy) with the drone of every product, -1 if unassigned
+    Solutions are turned into product ids with solution_encoder (any representation) and files are written to a temporary
+    file first and then renamed, so readers never see a partial solution.
+    With a snapshot_interval, algorithms also hand it their best solution every snapshot_interval seconds (see is_due and
+    snapshot) and a background thread writes the latest one, so the search never waits for the file system.
+    """
+    def __init__(self, problem, solution_encoder, path=None, solution_format="pretty", snapshot_interval=None):
+        if solution_format not in SOLUTION_FORMATS:
+            raise ValueError(f"Error: Unknown solution format {solution_format}")
+
+        self.problem = problem
+        self.solution_encoder = solution_encoder
+        self.path = path if path is not None else SOLUTION_FORMATS[solution_format]
+        self.solution_format = solution_format
+        self.snapshot_interval = snapshot_interval
+        self.next_snapshot = float("inf")
+
+        # Latest snapshot waiting to be written (encoded), only the snapshot thread writes it
+        self.pending_solution = None
+        self.file_lock = threading.Lock()
+        self.snapshot_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.snapshot_thread = None
+
+    def open(self):
+        """Starts the background snapshots, if there is a snapshot_interval"""
+        if self.snapshot_interval is None:
+            return
+        self.next_snapshot = time.time() + self.snapshot_interval
+        self.stop_event.clear()
+        self.snapshot_thread = threading.Thread(target=self.write_snapshots, daemon=True)
+        self.snapshot_thread.start()
+
+    def close(self):
+        """Stops the background snapshots, a pending one is dropped since the final solution is written by write"""
+        self.next_snapshot = float("inf")
+        if self.snapshot_thread is None:
+            return
+        self.stop_event.set()
+        self.snapshot_event.set()
+        self.snapshot_thread.join()
+        self.snapshot_thread = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def is_due(self, curr_time):
+        return curr_time >= self.next_snapshot
+
+    def snapshot(self, solution):
+        """Hands a copy of the solution to the background thread, which writes it unless a newer one arrives first"""
+        self.pending_solution = self.solution_encoder(solution)
+        self.next_snapshot = time.time() + self.snapshot_interval
+        self.snapshot_event.set()
+
+    def write(self, solution):
+        """Writes the solution right away, snapshots waiting to be written are dropped"""
+        encoded_solution = self.solution_encoder(solution)
+        with self.file_lock:
+            self.pending_solution = None
+            write_solution(self.problem, encoded_solution, self.path, self.solution_format)
+
+    def write_snapshots(self):
+        while True:
+            self.snapshot_event.wait()
+            self.snapshot_event.clear()
+            if self.stop_event.is_set():
+                return
+
+            with self.file_lock:
+                encoded_solution, self.pending_solution = self.pending_solution, None
+                if encoded_solution is not None:
+                    write_solution(self.problem, encoded_solution, self.path, self.solution_format)
+
+def write_solution(problem: ProblemInstance, encoded_solution: Union[List[List[int]], np.ndarray], path: str, solution_format: str = "pretty"):
+    """Writes a solution encoded by either representation, through a temporary file renamed into place"""
+    temporary_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if solution_format == "binary":
+            with open(temporary_file, "wb") as file:
+                np.save(file, get_assignment(problem, encoded_solution).astype(np.int32))
+        else:
+            drone_products = get_drone_products(problem, encoded_solution)
+            text = format_pretty(problem, drone_products) if solution_format == "pretty" else format_compact(drone_products)
+            with open(temporary_file, "w") as file:
+                file.write(text)
+        os.replace(temporary_file, path)
+    finally:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+
+def format_pretty(problem: ProblemInstance, drone_products: List[List[int]]) -> str:
+    """Solution in the original layout of solution.txt, built as a single string"""
+    products = problem.products
+    product_separator = "\n" + " " * 15
+
+    parts = ["=" * 60 + "\n", f"{'SOLUTION DETAILS':^60}\n", "=" * 60 + "\n\n"]
+    for drone_id, product_ids in enumerate(drone_products):
+        parts.append(f"Drone {drone_id + 1}:\n{'Products:':<15}")
+        if product_ids:
+            parts.append(product_separator.join(str(products[product_id]) for product_id in product_ids) + "\n")
+        parts.append("-" * 60 + "\n")
+    parts.append("\n" + "=" * 60 + "\n" + f"{'END OF SOLUTION':^60}\n" + "=" * 60 + "\n")
+    return "".join(parts)
+
+def format_compact(drone_products: List[List[int]]) -> str:
+    """One line per drone with the ids of its products"""
+    return "".join(" ".join(map(str, product_ids)) + "\n" for product_ids in drone_products)
+
+"""------------------
+- Reading solutions -
+------------------"""
+def load_solution(problem: ProblemInstance, path: str, representation: str = "lists") -> Union[List[List[int]], np.ndarray]:
+    """
+    Solution saved by an earlier run on the same problem (in any format of SolutionWriter), encoded like the
+    representation's encode_solution (product ids of every drone for "lists", the drone of every product for "array").
+    Raises ValueError if the solution does not belong to the problem or is not feasible.
+    """
+    with open(path, "rb") as file:
+        is_binary = file.read(len(NPY_MAGIC)) == NPY_MAGIC
+
+    if is_binary:
+        assignment = np.load(path, allow_pickle=False)
+    else:
+        assignment = get_assignment(problem, read_solution_text(path))
+
+    check_assignment(problem, assignment, path)
+
+    if representation == "array":
+        return assignment.astype(np.int32)
+    return get_drone_products(problem, assignment)
+
+def read_solution_text(path: str) -> List[List[int]]:
+    """
+    Product ids of every drone in a pretty or compact solution file.
+    In pretty files every "Drone N:" line starts the products of a new drone, compact files have a line per drone.
+    """
+    with open(path, "r") as file:
+        lines = file.read().splitlines()
+
+    if not any(line.startswith("Drone ") for line in lines):
+        return [[int(product_id) for product_id in line.split()] for line in lines]
+
+    drone_products = []
+    for line in lines:
+        if line.startswith("Drone "):
+            drone_products.append([])
+
+        product_ids = PRODUCT_PATTERN.findall(line)
+        if product_ids:
+            if not drone_products:
+                raise ValueError(f"Error: Solution file {path} lists products before its first drone")
+            drone_products[-1].extend(int(product_id) for product_id in product_ids)
+
+    return drone_products
+
+"""---------------------
+- Auxiliary  Functions -
+---------------------"""
+def get_drone_products(problem: ProblemInstance, encoded_solution: Union[List[List[int]], np.ndarray]) -> List[List[int]]:
+    """Product ids of every drone from a solution encoded by either representation"""
+    if isinstance(encoded_solution, np.ndarray):
+        return [np.flatnonzero(encoded_solution == drone_index).tolist() for drone_index in range(problem.drone_number)]
+    return encoded_solution
+
+def get_assignment(problem: ProblemInstance, encoded_solution: Union[List[List[int]], np.ndarray]) -> np.ndarray:
+    """Drone of every product (-1 if unassigned) from a solution encoded by either representation"""
+    if isinstance(encoded_solution, np.ndarray):
+        return encoded_solution
+
+    if len(encoded_solution) != problem.drone_number:
+        raise ValueError(f"Error: Solution has {len(encoded_solution)} drones, problem {problem.name} has {problem.drone_number}")
+
+    assignment = np.full(len(problem.products), -1, dtype=np.int64)
+    for drone_index, product_ids in enumerate(encoded_solution):
+        product_ids = np.array(product_ids, dtype=np.int64)
+        if product_ids.size and (product_ids.min() < 0 or product_ids.max() >= len(problem.products)):
+            raise ValueError(f"Error: Solution has products that do not exist in problem {problem.name}")
+        if (assignment[product_ids] != -1).any() or np.unique(product_ids).size != product_ids.size:
+            raise ValueError("Error: Solution delivers a product more than once")
+        assignment[product_ids] = drone_index
+
+    return assignment
+
+def check_assignment(problem: ProblemInstance, assignment: np.ndarray, path: str):
+    if assignment.shape != (len(problem.products),):
+        raise ValueError(f"Error: Solution {path} does not have the {len(problem.products)} products of problem {problem.name}")
+    if ((assignment < -1) | (assignment >= problem.drone_number)).any():
+        raise ValueError(f"Error: Solution {path} uses drones that do not exist in problem {problem.name}")
+
+    # Every drone must finish its deliveries in time
+    assigned = assignment >= 0
+    drone_costs = np.bincount(assignment[assigned], weights=problem.product_cost[assigned], minlength=problem.drone_number)
+    if (drone_costs > problem.max_turns).any():
+        raise ValueError(f"Error: Solution {path} is not feasible, some drone needs more than {problem.max_turns} turns")
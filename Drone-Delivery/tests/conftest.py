@@ -0,0 +1,55 @@
+# conftest.py
+import os
+import random
+import sys
+
+import pytest
+
+# Modules in src/ import each other by name, the same way they do when run from there
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import simulation
+
+# Solution representations accepted by simulation.get_solution_functions
+REPRESENTATIONS = ["lists", "array"]
+
+def write_input_file(path, drone_number=6, max_turns=500, order_number=40, seed=0):
+    """
+    Random input file in the format of the files in input/ (see parsing.parse_input_file).
+    Drones can only deliver part of the products in max_turns, so solutions have unassigned products too.
+    """
+    generator = random.Random(seed)
+    num_rows = num_col = 50
+    product_types = 5
+
+    lines = [f"{num_rows} {num_col} {drone_number} {max_turns} 200", str(product_types),
+             " ".join(str(generator.randint(1, 50)) for _ in range(product_types)), "3"]
+    for _ in range(3):
+        lines.append(f"{generator.randrange(num_rows)} {generator.randrange(num_col)}")
+        lines.append(" ".join(str(generator.randint(0, 10)) for _ in range(product_types)))
+
+    lines.append(str(order_number))
+    for _ in range(order_number):
+        item_number = generator.randint(1, 4)
+        lines.append(f"{generator.randrange(num_rows)} {generator.randrange(num_col)}")
+        lines.append(str(item_number))
+        lines.append(" ".join(str(generator.randrange(product_types)) for _ in range(item_number)))
+
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+    return path
+
+@pytest.fixture(scope="session")
+def problem(tmp_path_factory):
+    input_file = write_input_file(str(tmp_path_factory.mktemp("input") / "random.in"))
+    return simulation.load_problem(input_file)
+
+@pytest.fixture(scope="session")
+def two_drone_problem(tmp_path_factory):
+    """Fewer drones than the busiest drones tracked by EvaluationState.evaluate_moves"""
+    input_file = write_input_file(str(tmp_path_factory.mktemp("input") / "two_drones.in"), drone_number=2, max_turns=1500)
+    return simulation.load_problem(input_file)
+
+@pytest.fixture(autouse=True)
+def seed_random():
+    random.seed(0)
@@ -0,0 +1,56 @@
+# test_checkpoint.py
+import pickle
+import random
+
+import pytest
+
+import simulation
+from algorithms.checkpoint import CHECKPOINT_HEADER, CHECKPOINT_VERSION, load_checkpoint
+from conftest import REPRESENTATIONS, write_input_file
+
+ALGORITHMS = ["Hill Climbing", "Simulated Annealing", "Tabu Search", "Genetic Algorithms"]
+
+@pytest.fixture
+def run_directory(tmp_path, monkeypatch):
+    """Runs write output.txt and solution.txt to the working directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_resumed_run_matches_uninterrupted_run(problem, run_directory, algorithm, representation):
+    params = {"max_time": 60, "representation": representation}
+
+    random.seed(1)
+    uninterrupted_data = simulation.run_algorithm(problem, algorithm, max_evaluations=400, **params)
+
+    # Stopped halfway by its evaluation budget, then resumed with a larger one
+    checkpoint_file = str(run_directory / "run.ckpt")
+    random.seed(1)
+    simulation.run_algorithm(problem, algorithm, max_evaluations=200, checkpoint_file=checkpoint_file, **params)
+    resumed_data = simulation.resume_algorithm(problem, checkpoint_file, max_evaluations=400)
+
+    assert resumed_data[1] == uninterrupted_data[1]
+    assert load_checkpoint(checkpoint_file)["run"]["algorithm"] == algorithm
+
+def test_other_files_are_rejected_before_unpickling(run_directory):
+    path = run_directory / "run.ckpt"
+    path.write_bytes(pickle.dumps({"run": None}))
+    with pytest.raises(ValueError, match="not a checkpoint file"):
+        load_checkpoint(str(path))
+
+    path.write_bytes(CHECKPOINT_HEADER + (CHECKPOINT_VERSION + 1).to_bytes(4, "little") + b"not a pickle")
+    with pytest.raises(ValueError, match="incompatible version"):
+        load_checkpoint(str(path))
+
+def test_checkpoints_of_other_problems_are_rejected(problem, run_directory):
+    checkpoint_file = str(run_directory / "run.ckpt")
+    simulation.run_algorithm(problem, "Hill Climbing", max_time=60, max_evaluations=50, checkpoint_file=checkpoint_file)
+
+    other_problem = simulation.load_problem(write_input_file(str(run_directory / "other.in"), order_number=10))
+    with pytest.raises(ValueError, match="was saved for problem"):
+        simulation.resume_algorithm(other_problem, checkpoint_file)
+
+def test_multi_process_runs_cannot_be_checkpointed(problem, run_directory):
+    with pytest.raises(ValueError, match="not supported"):
+        simulation.run_algorithm(problem, "Simulated Annealing", replica_number=2, checkpoint_file=str(run_directory / "run.ckpt"))
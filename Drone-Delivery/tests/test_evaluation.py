@@ -0,0 +1,81 @@
+# test_evaluation.py
+import pytest
+
+import simulation
+from conftest import REPRESENTATIONS
+
+def generate_moves_info(functions, solution, move_number):
+    moves_info = [functions["move_info_generator"](solution) for _ in range(move_number)]
+    return [move_info for move_info in moves_info if move_info != -1]
+
+def get_move_score(functions, solution, move_info):
+    """Score of the move computed by a full evaluation of the changed solution"""
+    solution.apply_move(functions["move_builder"](move_info))
+    score = functions["solution_evaluator"](solution)
+    solution.undo_move()
+    return score
+
+@pytest.mark.parametrize("problem_fixture", ["problem", "two_drone_problem"])
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+@pytest.mark.parametrize("batch_threshold", [1, simulation.BATCH_EVALUATION_THRESHOLD, float("inf")])
+def test_evaluate_moves_matches_full_evaluation(request, monkeypatch, problem_fixture, representation, batch_threshold):
+    # Candidate lists are scored in one batched pass (threshold 1), move by move (infinite threshold) or as configured
+    monkeypatch.setattr(simulation, "BATCH_EVALUATION_THRESHOLD", batch_threshold)
+    problem = request.getfixturevalue(problem_fixture)
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    state = functions["state_generator"](solution)
+
+    for _ in range(30):
+        moves_info = generate_moves_info(functions, solution, 150)
+        scores = state.evaluate_moves(moves_info)
+
+        assert scores.tolist() == [get_move_score(functions, solution, move_info) for move_info in moves_info]
+        assert scores.tolist() == [state.evaluate_move(move_info) for move_info in moves_info]
+
+        # Move on to a neighbor, so the state is checked after every kind of move
+        state.apply_move(moves_info[0])
+        solution.apply_move(functions["move_builder"](moves_info[0]))
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_apply_move_matches_full_evaluation(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    state = functions["state_generator"](solution)
+    assert state.score == functions["solution_evaluator"](solution)
+
+    for _ in range(300):
+        moves_info = generate_moves_info(functions, solution, 1)
+        if not moves_info:
+            continue
+        state.apply_move(moves_info[0])
+        solution.apply_move(functions["move_builder"](moves_info[0]))
+
+        score, order_status = functions["solution_evaluator"](solution, return_status=True)
+        assert state.score == score
+        assert state.get_orders_status() == list(order_status)
+        assert list(state.drone_costs) == list(solution.drone_costs)
+
+    # Undoing every move gives back the initial solution, whose state is computed from scratch
+    solution.rollback()
+    assert functions["state_generator"](solution).score == functions["solution_evaluator"](solution)
+
+def test_move_info_round_trip(problem):
+    functions = simulation.get_solution_functions(problem)
+    solution = functions["solution_generator"]()
+
+    for move_info in generate_moves_info(functions, solution, 200):
+        assert functions["move_builder"](move_info).describe() == move_info
+
+def test_empty_solution_scores_zero(problem):
+    # Scores are 0 until an order is completed, whatever the drone workloads
+    solution = simulation.decode_solution(problem, [[] for _ in range(problem.drone_number)])
+    state = simulation.EvaluationState(problem, solution)
+    assert state.score == 0 == simulation.evaluate_solution(problem, solution)
+
+    single_product_orders = [order for order in problem.orders if len(order.product_list) == 1]
+    larger_orders = [order for order in problem.orders if len(order.product_list) > 1]
+    moves_info = [("add", larger_orders[0].product_list[0].id, 0), ("add", single_product_orders[0].product_list[0].id, 1)]
+
+    product_cost = single_product_orders[0].product_list[0].delivery_cost
+    assert state.evaluate_moves(moves_info).tolist() == [0, problem.max_turns - product_cost]
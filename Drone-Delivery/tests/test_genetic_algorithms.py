@@ -0,0 +1,90 @@
+# test_genetic_algorithms.py
+import random
+from itertools import accumulate
+
+import pytest
+
+import simulation
+from algorithms.genetic_algorithms import (Population, generate_population, roulette_select, tournament_select,
+                                           get_greatest_fit, get_average)
+from conftest import REPRESENTATIONS
+
+def check_population(population):
+    """Cached fitness values must match the individuals, whatever changed the population"""
+    scores = [individual[0] for individual in population.individuals]
+    assert population.individuals[0][0] == min(scores)
+    assert all(population.individuals[(index - 1) // 2] <= individual for index, individual in enumerate(population.individuals) if index > 0)
+
+    assert population.total_fitness == sum(scores)
+    assert population.best_individual[0] == max(scores)
+    assert population.best_individual in population.individuals
+    assert population.get_cumulative_fitness() == list(accumulate(scores))
+
+def make_population(scores):
+    population = Population()
+    for index, score in enumerate(scores):
+        population.add(f"solution {index}", score, [False])
+    return population
+
+def test_replacements_keep_population_consistent():
+    population = make_population([random.randint(0, 1000) for _ in range(30)])
+    check_population(population)
+
+    for index in range(500):
+        # The least fit individual is always the one replaced, even by a less fit child
+        scores = sorted(individual[0] for individual in population.individuals)
+        child_score = random.randint(0, 1200)
+        population.replace_least_fit(f"child {index}", child_score, [True])
+        assert sorted(individual[0] for individual in population.individuals) == sorted(scores[1:] + [child_score])
+        check_population(population)
+
+def test_replacing_the_best_individual():
+    # Every individual is as fit as the removed one (the oldest, which is also the best), so the best one has to be found again
+    population = make_population([5, 5, 5])
+    assert population.best_individual is population.individuals[0]
+    population.replace_least_fit("child", 1, [True])
+    check_population(population)
+    assert get_greatest_fit(population)[1] == 5
+
+def test_state_round_trip():
+    population = make_population([random.randint(0, 1000) for _ in range(20)])
+    for index in range(50):
+        population.replace_least_fit(f"child {index}", random.randint(0, 1000), [True])
+
+    restored_population = Population()
+    restored_population.set_state(population.get_state(str.upper), str.lower)
+    check_population(restored_population)
+    assert restored_population.individuals == population.individuals
+
+    # Insertion numbers continue after the restored ones, ties keep being broken by age
+    population.replace_least_fit("next child", 2000, [True])
+    restored_population.replace_least_fit("next child", 2000, [True])
+    assert restored_population.individuals == population.individuals
+
+def test_selection_picks_population_members():
+    population = make_population([random.randint(1, 1000) for _ in range(20)])
+    solutions = [individual[2] for individual in population.individuals]
+
+    for _ in range(200):
+        assert roulette_select(population) in solutions
+        assert tournament_select(population, 4) in solutions
+
+    # The tournament of the whole population is always won by the fittest individual
+    assert tournament_select(population, len(population)) == get_greatest_fit(population)[0]
+    with pytest.raises(ValueError):
+        tournament_select(population, len(population) + 1)
+
+def test_roulette_never_picks_unfit_individuals():
+    population = make_population([0, 0, 10, 0, 30])
+    picked = {roulette_select(population) for _ in range(500)}
+    assert picked == {"solution 2", "solution 4"}
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_generated_population_stores_its_fitness(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    population = generate_population(20, functions["solution_generator"], functions["solution_evaluator"])
+    check_population(population)
+
+    for score, _insertion_number, solution, order_status in population.individuals:
+        assert functions["solution_evaluator"](solution, return_status=True) == (score, order_status)
+    assert get_average(population) == population.total_fitness / 20
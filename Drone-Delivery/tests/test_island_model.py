@@ -0,0 +1,21 @@
+# test_island_model.py
+import pytest
+
+from algorithms.island_model import TOPOLOGIES, get_migration_targets
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_single_island_never_migrates(topology):
+    assert get_migration_targets(0, 1, topology) == []
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_islands_never_migrate_to_themselves(topology):
+    for island_index in range(5):
+        for _ in range(20):
+            targets = get_migration_targets(island_index, 5, topology)
+            assert targets
+            assert all(0 <= target < 5 and target != island_index for target in targets)
+
+def test_topology_targets():
+    assert [get_migration_targets(island_index, 4, "Ring") for island_index in range(4)] == [[1], [2], [3], [0]]
+    assert get_migration_targets(2, 4, "Fully Connected") == [0, 1, 3]
+    assert len(get_migration_targets(2, 4, "Random")) == 1
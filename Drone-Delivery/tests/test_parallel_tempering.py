@@ -0,0 +1,34 @@
+# test_parallel_tempering.py
+import math
+
+import pytest
+
+from algorithms.parallel_tempering import get_temperature_ladder, accept_exchange
+
+def test_single_replica_runs_at_min_temperature():
+    assert get_temperature_ladder(1, 10, 1000) == [10]
+
+@pytest.mark.parametrize("replica_number", [2, 3, 8])
+def test_ladder_is_geometric(replica_number):
+    ladder = get_temperature_ladder(replica_number, 10, 1000)
+
+    assert len(ladder) == replica_number
+    assert ladder[0] == pytest.approx(10)
+    assert ladder[-1] == pytest.approx(1000)
+
+    ratios = [hotter / colder for colder, hotter in zip(ladder, ladder[1:])]
+    assert ratios == pytest.approx([ratios[0]] * len(ratios))
+    assert ratios[0] > 1
+
+def test_better_hotter_state_is_always_exchanged():
+    for _ in range(100):
+        assert accept_exchange(10, 500, 100, 600)
+        assert accept_exchange(10, 500, 100, 500)
+
+def test_worse_hotter_state_is_exchanged_with_metropolis_probability():
+    # Swapping in a worse state for the colder replica is accepted with probability exp(-(1/T_cold - 1/T_hot) * difference)
+    probability = math.exp((1 / 10 - 1 / 100) * (480 - 500))
+    accepted = sum(accept_exchange(10, 500, 100, 480) for _ in range(20000))
+    assert accepted / 20000 == pytest.approx(probability, abs=0.02)
+
+    assert not any(accept_exchange(10, 5000, 100, 0) for _ in range(1000))
@@ -0,0 +1,87 @@
+# test_parsing.py
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import parsing
+import simulation
+from conftest import write_input_file
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input", "example.in")
+
+@pytest.fixture
+def input_file(tmp_path):
+    """Random input file in a temporary folder, its cache is written next to it"""
+    return write_input_file(str(tmp_path / "random.in"))
+
+def check_same_instance(instance, expected_instance):
+    assert instance.keys() == expected_instance.keys()
+    for name, array in expected_instance.items():
+        np.testing.assert_array_equal(instance[name], array)
+        assert instance[name].dtype == array.dtype
+
+def test_example_file(tmp_path):
+    input_file = shutil.copy(EXAMPLE_FILE, tmp_path / "example.in")
+    num_row, num_col, max_turns, warehouse_positions, _warehouse_distances, drone_number, orders = parsing.parse_input_file(str(input_file))
+
+    assert (num_row, num_col, max_turns, drone_number) == (10, 10, 20, 3)
+    np.testing.assert_array_equal(warehouse_positions, [[0, 0], [5, 5], [6, 6]])
+    assert [(order.row, order.column, len(order.product_list)) for order in orders] == [(1, 1, 2), (3, 3, 1), (5, 6, 1)]
+    assert [product.id for order in orders for product in order.product_list] == [0, 1, 2, 3]
+
+    # Item type 2 of the first order is not in stock at the nearest warehouse, the next one is used
+    assert [product.warehouse_id for product in orders[0].product_list] == [1, 0]
+    assert orders[0].product_list[0].delivery_cost == 2 + 2 * 6
+
+def test_cache_round_trip(input_file, monkeypatch):
+    instance = parsing.load_instance(input_file)
+    assert os.path.exists(parsing.get_cache_file(input_file))
+    check_same_instance(instance, parsing.parse_instance(input_file))
+
+    # Unchanged files are loaded from the cache without parsing them
+    def parse_instance(input_file):
+        raise AssertionError("Cached input file was parsed again")
+    monkeypatch.setattr(parsing, "parse_instance", parse_instance)
+
+    cached_instance = parsing.load_instance(input_file)
+    check_same_instance(cached_instance, instance)
+    assert all(isinstance(array, np.memmap) and not array.flags.writeable for array in cached_instance.values())
+
+def test_changed_file_is_parsed_again(input_file):
+    parsing.load_instance(input_file)
+    write_input_file(input_file, drone_number=4, seed=1)
+
+    instance = parsing.load_instance(input_file)
+    assert instance["header"][2] == 4
+    check_same_instance(instance, parsing.parse_instance(input_file))
+    check_same_instance(parsing.load_instance(input_file), instance)
+
+@pytest.mark.parametrize("cache_contents", [b"", b"not a cache", "truncated", "older version"])
+def test_damaged_cache_is_replaced(input_file, cache_contents):
+    cache_file = parsing.get_cache_file(input_file)
+    if cache_contents == "truncated":
+        parsing.load_instance(input_file)
+        cache = np.load(cache_file)
+        np.save(cache_file, cache[:-1])
+    elif cache_contents == "older version":
+        instance = parsing.parse_instance(input_file)
+        source_stat = os.stat(input_file)
+        source_key = np.array([parsing.CACHE_VERSION - 1, source_stat.st_size, source_stat.st_mtime_ns], dtype=np.int64)
+        parsing.save_cache(cache_file, {name: array + 1 for name, array in instance.items()}, source_key)
+    else:
+        with open(cache_file, "wb") as file:
+            file.write(cache_contents)
+
+    check_same_instance(parsing.load_instance(input_file), parsing.parse_instance(input_file))
+    assert np.load(cache_file)[0] == parsing.CACHE_VERSION
+    assert not any(name.endswith(".tmp") for name in os.listdir(os.path.dirname(input_file)))
+
+def test_cached_problem_matches_parsed_problem(input_file):
+    parsed_problem = simulation.load_problem(input_file)
+    cached_problem = simulation.load_problem(input_file)
+
+    for name in ["product_order", "product_warehouse", "product_cost", "order_sizes", "warehouse_distances"]:
+        np.testing.assert_array_equal(getattr(cached_problem, name), getattr(parsed_problem, name))
+    assert [product.delivery_cost for product in cached_problem.products] == [product.delivery_cost for product in parsed_problem.products]
@@ -0,0 +1,118 @@
+# test_problem_model.py
+import pytest
+
+import simulation
+from conftest import REPRESENTATIONS
+
+def apply_random_moves(functions, solution, move_number):
+    """Applies move_number random moves through the journal, returns how many were applied"""
+    applied = 0
+    for _ in range(move_number):
+        move = functions["move_generator"](solution)
+        if move != -1:
+            solution.apply_move(move)
+            applied += 1
+    return applied
+
+def get_drone_product_ids(solution):
+    """Product ids of every drone, sorted since undoing a move may change the order of a drone's products"""
+    return [sorted(product.id for product in products) for products in solution]
+
+def check_bookkeeping(problem, solution):
+    """Running drone costs and unassigned products must match the drone workloads"""
+    drone_products = [list(products) for products in solution]
+    assert list(solution.drone_costs) == [sum(product.delivery_cost for product in products) for products in drone_products]
+    assert all(drone_cost <= problem.max_turns for drone_cost in solution.drone_costs)
+
+    assigned_ids = [product.id for products in drone_products for product in products]
+    assert len(assigned_ids) == len(set(assigned_ids))
+
+    if hasattr(solution, "unassigned_products"):
+        unassigned_ids = [product.id for product in solution.unassigned_products]
+        assert sorted(assigned_ids + unassigned_ids) == list(range(len(problem.products)))
+        assert solution.unassigned_positions == {product_id: i for i, product_id in enumerate(unassigned_ids)}
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_bookkeeping_follows_moves(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    check_bookkeeping(problem, solution)
+
+    for _ in range(20):
+        apply_random_moves(functions, solution, 25)
+        check_bookkeeping(problem, solution)
+
+def test_solution_copy_is_independent(problem):
+    functions = simulation.get_solution_functions(problem)
+    solution = functions["solution_generator"]()
+    product_ids = get_drone_product_ids(solution)
+
+    solution_copy = solution.copy()
+    apply_random_moves(functions, solution_copy, 50)
+    check_bookkeeping(problem, solution_copy)
+
+    assert get_drone_product_ids(solution) == product_ids
+    check_bookkeeping(problem, solution)
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_undo_move_reverts_last_move(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    apply_random_moves(functions, solution, 50)
+
+    saved_product_ids = []
+    for _ in range(50):
+        saved_product_ids.append(get_drone_product_ids(solution))
+        while apply_random_moves(functions, solution, 1) == 0:
+            pass
+
+    for product_ids in reversed(saved_product_ids):
+        solution.undo_move()
+        assert get_drone_product_ids(solution) == product_ids
+        check_bookkeeping(problem, solution)
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_rollback_restores_initial_solution(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    product_ids = get_drone_product_ids(solution)
+    score = functions["solution_evaluator"](solution)
+
+    assert apply_random_moves(functions, solution, 200) == len(solution.journal) > 0
+    solution.rollback()
+
+    assert solution.journal == []
+    assert get_drone_product_ids(solution) == product_ids
+    assert functions["solution_evaluator"](solution) == score
+    check_bookkeeping(problem, solution)
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_copy_before_journal_leaves_solution_unchanged(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    initial_solution = get_drone_product_ids(solution)
+
+    applied = apply_random_moves(functions, solution, 100)
+    current_solution = get_drone_product_ids(solution)
+
+    snapshot = solution.copy_before_journal()
+
+    assert snapshot.journal == []
+    assert get_drone_product_ids(snapshot) == initial_solution
+    check_bookkeeping(problem, snapshot)
+
+    # The moves are still recorded, so the solution can keep rolling back to the snapshot
+    assert len(solution.journal) == applied
+    assert get_drone_product_ids(solution) == current_solution
+    solution.clear_journal()
+    assert solution.journal == []
+    assert get_drone_product_ids(solution) == current_solution
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_crossover_children_keep_drone_costs(problem, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    for _ in range(20):
+        parent_1 = functions["solution_generator"]()
+        parent_2 = functions["solution_generator"]()
+        for child in functions["crossover_generator"](parent_1, parent_2):
+            check_bookkeeping(problem, child)
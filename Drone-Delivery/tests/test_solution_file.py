@@ -0,0 +1,180 @@
+# test_solution_file.py
+import os
+import time
+
+import numpy as np
+import pytest
+
+import simulation
+from solution_file import SOLUTION_FORMATS, SolutionWriter, write_solution, load_solution, read_solution_text
+from conftest import REPRESENTATIONS
+from test_problem_model import get_drone_product_ids
+
+@pytest.fixture
+def drone_products(problem):
+    """Product ids of every drone of a feasible solution"""
+    return simulation.encode_solution(simulation.generate_random_solution(problem))
+
+def get_assignment(problem, drone_products):
+    assignment = np.full(len(problem.products), -1, dtype=np.int64)
+    for drone_index, product_ids in enumerate(drone_products):
+        assignment[product_ids] = drone_index
+    return assignment
+
+def write_pretty(problem, drone_products, path):
+    """Layout of the solution.txt files written by earlier versions"""
+    with open(path, "w") as file:
+        file.write("=" * 60 + "\n" + f"{'SOLUTION DETAILS':^60}\n" + "=" * 60 + "\n\n")
+        for drone_id, product_ids in enumerate(drone_products):
+            file.write(f"Drone {drone_id + 1}:\n")
+            file.write(f"{'Products:':<15}")
+            for i, product_id in enumerate(product_ids):
+                file.write(f"{'' if i == 0 else ' ' * 15}{problem.products[product_id]}\n")
+            file.write("-" * 60 + "\n")
+        file.write("\n" + "=" * 60 + "\n" + f"{'END OF SOLUTION':^60}\n" + "=" * 60 + "\n")
+    return path
+
+def write_compact(drone_products, path):
+    with open(path, "w") as file:
+        file.write("".join(" ".join(map(str, product_ids)) + "\n" for product_ids in drone_products))
+    return path
+
+def write_solution_files(problem, drone_products, tmp_path):
+    binary_file = str(tmp_path / "solution.npy")
+    np.save(binary_file, get_assignment(problem, drone_products).astype(np.int32))
+    return [write_pretty(problem, drone_products, str(tmp_path / "pretty.txt")),
+            write_compact(drone_products, str(tmp_path / "compact.txt")), binary_file]
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_every_format_loads_the_same_solution(problem, drone_products, tmp_path, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+
+    for path in write_solution_files(problem, drone_products, tmp_path):
+        encoded_solution = load_solution(problem, path, representation)
+        if representation == "array":
+            assert encoded_solution.dtype == np.int32
+            np.testing.assert_array_equal(encoded_solution, get_assignment(problem, drone_products))
+        else:
+            assert [sorted(product_ids) for product_ids in encoded_solution] == [sorted(product_ids) for product_ids in drone_products]
+
+        # Loaded solutions are decoded like checkpoints
+        solution = functions["solution_decoder"](encoded_solution)
+        assert functions["solution_evaluator"](solution) == simulation.evaluate_solution(problem, simulation.decode_solution(problem, drone_products))
+
+def test_text_formats_keep_empty_drones(problem, drone_products, tmp_path):
+    drone_products = [product_ids if drone_index % 2 else [] for drone_index, product_ids in enumerate(drone_products)]
+    pretty_file, compact_file, _binary_file = write_solution_files(problem, drone_products, tmp_path)
+
+    assert read_solution_text(pretty_file) == drone_products
+    assert read_solution_text(compact_file) == drone_products
+
+def test_infeasible_solutions_are_rejected(problem, tmp_path):
+    # Every product on one drone takes longer than the turns of the problem
+    drone_products = [list(range(len(problem.products)))] + [[] for _ in range(problem.drone_number - 1)]
+    for path in write_solution_files(problem, drone_products, tmp_path):
+        with pytest.raises(ValueError, match="not feasible"):
+            load_solution(problem, path)
+
+@pytest.mark.parametrize("change, message", [
+    (lambda drone_products: drone_products[:-1], "drones"),
+    (lambda drone_products: drone_products[:-1] + [drone_products[-1] + [10 ** 6]], "do not exist"),
+    (lambda drone_products: drone_products[:-1] + [drone_products[-1] + drone_products[0][:1]], "more than once")
+])
+def test_text_solutions_of_other_problems_are_rejected(problem, drone_products, tmp_path, change, message):
+    path = write_compact(change(drone_products), str(tmp_path / "compact.txt"))
+    with pytest.raises(ValueError, match=message):
+        load_solution(problem, path)
+
+@pytest.mark.parametrize("assignment_change, message", [
+    (lambda assignment: assignment[:-1], "does not have"),
+    (lambda assignment: np.where(assignment == 0, 10 ** 3, assignment), "drones that do not exist")
+])
+def test_binary_solutions_of_other_problems_are_rejected(problem, drone_products, tmp_path, assignment_change, message):
+    path = str(tmp_path / "solution.npy")
+    np.save(path, assignment_change(get_assignment(problem, drone_products)))
+    with pytest.raises(ValueError, match=message):
+        load_solution(problem, path)
+
+def test_products_before_the_first_drone_are_rejected(tmp_path):
+    path = tmp_path / "solution.txt"
+    path.write_text("Products: Product 3 (Belongs to Order: 1)\nDrone 1:\n")
+    with pytest.raises(ValueError, match="before its first drone"):
+        read_solution_text(str(path))
+
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_warm_start_generator(problem, drone_products, tmp_path, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    _pretty_file, compact_file, _binary_file = write_solution_files(problem, drone_products, tmp_path)
+    solution_generator = simulation.WarmStartGenerator(load_solution(problem, compact_file, representation),
+                                                       functions["solution_decoder"], functions["move_generator"])
+
+    # The first solution is the loaded one, later ones are feasible perturbations of it
+    initial_score = simulation.evaluate_solution(problem, simulation.decode_solution(problem, drone_products))
+    assert functions["solution_evaluator"](solution_generator()) == initial_score
+    for _ in range(10):
+        solution = solution_generator()
+        assert all(drone_cost <= problem.max_turns for drone_cost in solution.drone_costs)
+        assert [sorted(product.id for product in products) for products in solution] != [sorted(product_ids) for product_ids in drone_products]
+
+@pytest.mark.parametrize("solution_format", SOLUTION_FORMATS)
+@pytest.mark.parametrize("representation", REPRESENTATIONS)
+def test_written_solutions_load_back(problem, tmp_path, solution_format, representation):
+    functions = simulation.get_solution_functions(problem, representation)
+    solution = functions["solution_generator"]()
+    path = str(tmp_path / SOLUTION_FORMATS[solution_format])
+
+    SolutionWriter(problem, functions["solution_encoder"], path, solution_format).write(solution)
+
+    assert os.listdir(tmp_path) == [SOLUTION_FORMATS[solution_format]]
+    loaded_solution = functions["solution_decoder"](load_solution(problem, path, representation))
+    assert get_drone_product_ids(loaded_solution) == get_drone_product_ids(solution)
+
+@pytest.mark.parametrize("solution_format", ["pretty", "compact"])
+def test_text_formats_match_the_original_layout(problem, drone_products, tmp_path, solution_format):
+    path = str(tmp_path / "solution.txt")
+    write_solution(problem, drone_products, path, solution_format)
+
+    expected_file = (write_pretty(problem, drone_products, str(tmp_path / "expected.txt")) if solution_format == "pretty"
+                     else write_compact(drone_products, str(tmp_path / "expected.txt")))
+    with open(path) as file, open(expected_file) as expected:
+        assert file.read() == expected.read()
+
+def test_both_representations_write_the_same_file(problem, drone_products, tmp_path):
+    # Array solutions list the products of every drone by id
+    drone_products = [sorted(product_ids) for product_ids in drone_products]
+    for solution_format in SOLUTION_FORMATS:
+        lists_file = str(tmp_path / f"lists_{solution_format}")
+        array_file = str(tmp_path / f"array_{solution_format}")
+        write_solution(problem, drone_products, lists_file, solution_format)
+        write_solution(problem, get_assignment(problem, drone_products).astype(np.int32), array_file, solution_format)
+
+        with open(lists_file, "rb") as lists, open(array_file, "rb") as array:
+            assert lists.read() == array.read()
+
+def test_snapshots_write_the_latest_solution(problem, tmp_path):
+    functions = simulation.get_solution_functions(problem)
+    path = str(tmp_path / "solution.txt")
+    solutions = [functions["solution_generator"]() for _ in range(3)]
+
+    with SolutionWriter(problem, functions["solution_encoder"], path, "compact", snapshot_interval=0) as writer:
+        assert writer.is_due(time.time())
+        for solution in solutions:
+            writer.snapshot(solution)
+
+        # The background thread writes the pending snapshot (older ones may be skipped)
+        deadline = time.time() + 5
+        while writer.pending_solution is not None and time.time() < deadline:
+            time.sleep(0.01)
+        with writer.file_lock:
+            assert read_solution_text(path) == simulation.encode_solution(solutions[-1])
+
+        # The final solution is written right away and replaces the snapshots
+        writer.write(solutions[0])
+        assert read_solution_text(path) == simulation.encode_solution(solutions[0])
+
+    assert not writer.is_due(time.time())
+    assert os.listdir(tmp_path) == ["solution.txt"]
+
+def test_unknown_format_is_rejected(problem):
+    with pytest.raises(ValueError, match="Unknown solution format"):
+        SolutionWriter(problem, simulation.encode_solution, solution_format="xml")
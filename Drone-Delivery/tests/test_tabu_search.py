@@ -0,0 +1,49 @@
+# test_tabu_search.py
+from algorithms.tabu_search import TabuMemory
+
+def test_added_move_expires_after_tenures():
+    tabu_memory = TabuMemory(product_number=10, drone_number=3, tabu_tenure=5, product_tenure=2)
+    tabu_memory.add(("add", 4, 1), iteration=10)
+    assert tabu_memory.recorded_moves == 1
+
+    # The product can't be moved at all for product_tenure iterations
+    assert tabu_memory.is_tabu(("add", 4, 2), 11)
+    assert not tabu_memory.is_tabu(("add", 4, 2), 12)
+
+    # Undoing the move is forbidden for tabu_tenure iterations
+    assert tabu_memory.is_tabu(("remove", 4, 1), 14)
+    assert not tabu_memory.is_tabu(("remove", 4, 1), 15)
+
+    # Other products and assignments are never tabu
+    assert not tabu_memory.is_tabu(("add", 5, 1), 11)
+    assert not tabu_memory.is_tabu(("swap", 3, 1, 5, 2), 11)
+
+def test_swap_makes_every_changed_assignment_tabu():
+    tabu_memory = TabuMemory(product_number=10, drone_number=3, tabu_tenure=5, product_tenure=1)
+    tabu_memory.add(("swap", 2, 0, 7, 1), iteration=1)
+
+    assert tabu_memory.is_tabu(("swap", 2, 1, 7, 0), 5)
+    for move_info in [("remove", 2, 0), ("add", 2, 1), ("remove", 7, 1), ("add", 7, 0)]:
+        assert tabu_memory.is_tabu(move_info, 5)
+        assert not tabu_memory.is_tabu(move_info, 6)
+
+def test_adding_again_extends_expiry():
+    tabu_memory = TabuMemory(product_number=10, drone_number=3, tabu_tenure=5, product_tenure=1)
+    tabu_memory.add(("add", 0, 0), iteration=1)
+    tabu_memory.add(("remove", 0, 0), iteration=4)
+
+    assert tabu_memory.is_tabu(("add", 0, 0), 8)
+    assert not tabu_memory.is_tabu(("add", 0, 0), 9)
+
+def test_state_round_trip():
+    tabu_memory = TabuMemory(product_number=10, drone_number=3, tabu_tenure=5, product_tenure=2)
+    tabu_memory.add(("add", 4, 1), iteration=10)
+    tabu_memory.add(("swap", 2, 0, 7, 1), iteration=11)
+
+    restored_memory = TabuMemory(product_number=10, drone_number=3, tabu_tenure=5, product_tenure=2)
+    restored_memory.set_state(tabu_memory.get_state())
+
+    assert restored_memory.recorded_moves == 2
+    for iteration in range(10, 18):
+        for move_info in [("add", 4, 2), ("remove", 4, 1), ("swap", 2, 1, 7, 0), ("add", 5, 0)]:
+            assert restored_memory.is_tabu(move_info, iteration) == tabu_memory.is_tabu(move_info, iteration)
@@ -0,0 +1,125 @@
+# test_termination.py
+import threading
+import time
+
+import pytest
+
+from algorithms.termination import Termination
+
+def test_unset_criteria_never_stop():
+    termination = Termination(max_time=1000)
+    start_time = termination.start()
+    termination.count_iteration(10 ** 9)
+    termination.record_improvement(10 ** 9)
+
+    assert not termination.should_stop(start_time + 999)
+    assert termination.reason is None
+    assert termination.should_stop(start_time + 1000)
+    assert termination.reason == "Time limit"
+
+def test_evaluation_budget():
+    termination = Termination(max_time=1000, max_evaluations=100)
+    start_time = termination.start(evaluations=30)
+
+    termination.count_iteration(69)
+    assert not termination.should_stop(start_time)
+    termination.count_iteration(1)
+    assert termination.should_stop(start_time)
+    assert termination.reason == "Evaluation budget"
+    assert termination.get_progress(start_time) == 1.0
+
+def test_stagnation_is_reset_by_improvements():
+    termination = Termination(max_time=1000, max_stagnation=3)
+    start_time = termination.start()
+
+    for _ in range(10):
+        termination.count_iteration()
+        termination.count_iteration()
+        termination.record_improvement(0)
+        assert not termination.should_stop(start_time)
+
+    termination.count_iteration()
+    termination.count_iteration()
+    assert not termination.is_stagnated()
+    termination.count_iteration()
+    assert termination.is_stagnated()
+    assert termination.should_stop(start_time)
+    assert termination.reason == "No improvement"
+
+    termination.restart()
+    assert not termination.should_stop(start_time)
+
+def test_target_score_uses_best_score():
+    termination = Termination(max_time=1000, target_score=500)
+    start_time = termination.start()
+
+    termination.record_improvement(499)
+    assert not termination.should_stop(start_time)
+
+    # Scores below the best one (e.g. after a restart) never lower it
+    termination.record_improvement(500)
+    termination.record_improvement(10)
+    assert termination.best_score == 500
+    assert termination.should_stop(start_time)
+    assert termination.reason == "Target score"
+
+def test_stop_event():
+    stop_event = threading.Event()
+    termination = Termination(max_time=1000, stop_event=stop_event)
+    start_time = termination.start()
+
+    assert not termination.should_stop(start_time)
+    stop_event.set()
+    assert termination.should_stop(start_time)
+    assert termination.reason == "Stop requested"
+
+def test_time_limit_is_checked_first():
+    stop_event = threading.Event()
+    stop_event.set()
+    termination = Termination(max_time=10, max_evaluations=1, stop_event=stop_event)
+    start_time = termination.start()
+
+    assert termination.should_stop(start_time + 10)
+    assert termination.reason == "Time limit"
+
+def test_progress_uses_furthest_budget():
+    termination = Termination(max_time=100, max_evaluations=1000)
+    start_time = termination.start(evaluations=0)
+
+    termination.count_iteration(100)
+    assert termination.get_progress(start_time + 50) == pytest.approx(0.5)
+    termination.count_iteration(700)
+    assert termination.get_progress(start_time + 50) == pytest.approx(0.8)
+    assert termination.get_progress(start_time + 500) == 1.0
+
+def test_restored_counters_continue():
+    termination = Termination(max_time=100, max_evaluations=1000, max_stagnation=50)
+    start_time = termination.start()
+    termination.count_iteration(400)
+    termination.record_improvement(42)
+    termination.count_iteration(100)
+    state = termination.get_state(start_time + 30)
+
+    resumed_termination = Termination(max_time=100, max_evaluations=1000, max_stagnation=50)
+    resumed_termination.restore(state)
+    resumed_termination.start()
+
+    # Only the rest of the time limit is left
+    curr_time = time.time()
+    assert not resumed_termination.should_stop(curr_time + 69)
+    assert resumed_termination.should_stop(curr_time + 71)
+    assert (resumed_termination.evaluations, resumed_termination.stagnation, resumed_termination.best_score) == (501, 1, 42)
+
+    # Counters of the restored run are only used once, starting again resets them
+    resumed_termination.start()
+    assert (resumed_termination.evaluations, resumed_termination.stagnation, resumed_termination.best_score) == (1, 0, None)
+
+def test_paused_time_does_not_count():
+    pause_event = threading.Event()
+    pause_event.set()
+    termination = Termination(max_time=1000, pause_event=pause_event)
+    start_time = termination.start()
+
+    threading.Timer(0.2, pause_event.clear).start()
+    assert not termination.should_stop(start_time)
+    assert termination.start_time >= start_time + 0.15